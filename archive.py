@@ -0,0 +1,328 @@
+"""
+WeCare Inventory Management System - Invoice Archive Module
+
+This module files invoices away in an archive instead of the working
+directory. Each invoice goes into a directory for the day it was issued,
+    invoices/2024/01/11/sell_20240111-000042.txt
+so no single directory grows past one day's invoices, and old months can be
+backed up or moved as whole directories.
+
+Every invoice is also recorded in a small SQLite index, invoices/index.db,
+with its number, kind, customer or vendor, time of issue, total and file
+location. Questions such as "all invoices for a customer last month" are
+answered from the index without listing any directories.
+
+Invoices older than a given number of days can be gzip-compressed; the
+index is updated with the new location and read_invoice() reads either form.
+
+    python archive.py find [--kind K] [--party NAME] [--from DATE] [--to DATE]
+    python archive.py compress DAYS     (gzip invoices older than DAYS days)
+    python archive.py import            (file loose invoices from the working
+                                         directory into the archive)
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+ARCHIVE_DIR = 'invoices'
+INDEX_FILE = 'index.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    kind TEXT NOT NULL,
+    number TEXT NOT NULL,
+    party TEXT NOT NULL,
+    issued TEXT NOT NULL,
+    total REAL NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (kind, number)
+);
+CREATE INDEX IF NOT EXISTS idx_invoices_party ON invoices (party COLLATE NOCASE, issued);
+CREATE INDEX IF NOT EXISTS idx_invoices_issued ON invoices (issued);
+"""
+
+# File name prefix of each kind of invoice
+FILE_PREFIXES = {'purchase': 'purchase_', 'sell': 'sell_'}
+
+# Lines of an invoice that name the vendor or customer, used when importing old files
+PARTY_PATTERN = re.compile(r'(?:Vendor|Customer): (.*?)\s*║?\s*$', re.MULTILINE)
+TOTAL_PATTERNS = {
+    'purchase': re.compile(r'TOTAL COST:\s*\$([0-9.]+)'),
+    'sell': re.compile(r'TOTAL Amount:\s*\$([0-9.]+)'),
+}
+
+class InvoiceArchive:
+    """
+    Date-sharded invoice directories with an SQLite index.
+
+    The index connection is shared by every thread of the program, such as
+    the background invoice writer and the HTTP service's request threads.
+    It is only used with the archive's lock held, so one thread's
+    transaction never takes in another thread's statements.
+
+    Attributes:
+        root (str): Top directory of the archive
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """
+        Opens the index on first use and creates the schema if needed.
+
+        Must be called with the lock held.
+
+        Returns:
+            sqlite3.Connection: The open connection
+        """
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            # Other terminals may be adding invoices at the same time
+            self._conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=10,
+                                         isolation_level=None, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def path_for(self, file_name, issued):
+        """
+        Returns where an invoice file belongs, creating its day directory.
+
+        Parameters:
+            file_name (str): File name of the invoice, e.g. "sell_20240111-000042.txt"
+            issued (datetime): Time the invoice was issued
+
+        Returns:
+            str: Path of the invoice inside the archive
+        """
+        directory = os.path.join(self.root, issued.strftime('%Y'), issued.strftime('%m'), issued.strftime('%d'))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, file_name)
+
+    def record(self, entries):
+        """
+        Adds invoices to the index in one transaction.
+
+        Parameters:
+            entries (list): (kind, number, party, issued datetime, total, path) tuples
+        """
+        if not entries:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO invoices (kind, number, party, issued, total, path) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(kind, number, party, issued.strftime('%Y-%m-%d %H:%M:%S'), total, path)
+                     for kind, number, party, issued, total, path in entries])
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+
+    def find(self, kind=None, party=None, start=None, end=None, number=None):
+        """
+        Looks invoices up in the index.
+
+        Every argument given narrows the search; the party name is matched
+        without regard to case.
+
+        Parameters:
+            kind (str): "purchase" or "sell"
+            party (str): Customer or vendor name
+            start (str): First day to include, as YYYY-MM-DD
+            end (str): Last day to include, as YYYY-MM-DD
+            number (str): Invoice number
+
+        Returns:
+            list: (kind, number, party, issued, total, path) tuples, oldest first
+        """
+        conditions = []
+        values = []
+        if kind is not None:
+            conditions.append("kind = ?")
+            values.append(kind)
+        if party is not None:
+            conditions.append("party = ? COLLATE NOCASE")
+            values.append(party)
+        if start is not None:
+            conditions.append("issued >= ?")
+            values.append(start)
+        if end is not None:
+            # Any time on the last day sorts before the day after it
+            conditions.append("issued < ?")
+            values.append((datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d'))
+        if number is not None:
+            conditions.append("number = ?")
+            values.append(number)
+        query = "SELECT kind, number, party, issued, total, path FROM invoices"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return self._connect().execute(query + " ORDER BY issued, number", values).fetchall()
+
+    def compress(self, older_than_days):
+        """
+        Gzips the invoices issued more than a number of days ago.
+
+        Parameters:
+            older_than_days (int): Age in days past which invoices are compressed
+
+        Returns:
+            int: Number of invoices compressed
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT kind, number, path FROM invoices WHERE issued < ? AND path NOT LIKE '%.gz'",
+                (cutoff,)).fetchall()
+        count = 0
+        for kind, number, path in rows:
+            try:
+                with open(path, 'rb') as source, gzip.open(path + '.gz', 'wb') as target:
+                    shutil.copyfileobj(source, target)
+            except OSError as e:
+                print("❌ Error compressing " + path + ": " + str(e))
+                continue
+            with self._lock:
+                self._connect().execute("UPDATE invoices SET path = ? WHERE kind = ? AND number = ?",
+                                        (path + '.gz', kind, number))
+            os.remove(path)
+            count += 1
+        return count
+
+    def import_loose(self, directory='.'):
+        """
+        Moves invoice files from a directory into the archive and indexes them.
+
+        The party and total are read back from the invoice text, and the
+        time of issue is taken from the file's modification time. An invoice
+        whose file is already in the archive is never overwritten: the loose
+        file is left where it is and reported.
+
+        Parameters:
+            directory (str): Directory holding the loose invoices
+
+        Returns:
+            int: Number of invoices imported
+        """
+        entries = []
+        for file_name in sorted(os.listdir(directory)):
+            for kind, prefix in FILE_PREFIXES.items():
+                if file_name.startswith(prefix) and file_name.endswith('.txt'):
+                    break
+            else:
+                continue
+            source = os.path.join(directory, file_name)
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read()
+            party = PARTY_PATTERN.search(text)
+            total = TOTAL_PATTERNS[kind].search(text)
+            issued = datetime.fromtimestamp(os.path.getmtime(source))
+            path = self.path_for(file_name, issued)
+            try:
+                _move_new(source, path)
+            except FileExistsError:
+                print("⚠️ " + path + " is already in the archive; " + source + " was left in place")
+                continue
+            entries.append((kind, file_name[len(prefix):-len('.txt')], party.group(1) if party else '',
+                            issued, float(total.group(1)) if total else 0.0, path))
+        self.record(entries)
+        return len(entries)
+
+    def close(self):
+        """
+        Closes the index if it is open.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def _move_new(source, path):
+    """
+    Moves a file to a path that must not exist yet.
+
+    The file is hard-linked to its new name, which fails if the name is
+    taken, and only then removed from the old one. Where hard links cannot
+    be made, such as across file systems, it is copied into a file created
+    with exclusive access instead.
+
+    Parameters:
+        source (str): File to move
+        path (str): New location
+
+    Raises:
+        FileExistsError: If something is already at the new location
+    """
+    try:
+        os.link(source, path)
+    except FileExistsError:
+        raise
+    except OSError:
+        with open(source, 'rb') as src, open(path, 'xb') as dst:
+            shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def read_invoice(path):
+    """
+    Reads an archived invoice, compressed or not.
+
+    Parameters:
+        path (str): Location from the index
+
+    Returns:
+        str: The invoice text
+    """
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _option(args, name):
+    """
+    Returns the value following a command-line option, or None.
+
+    Parameters:
+        args (list): Command-line arguments
+        name (str): Option name, e.g. "--party"
+
+    Returns:
+        str: The option's value, or None if it was not given
+    """
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return None
+
+# The archive all invoices are written to
+invoice_archive = InvoiceArchive()
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['find']:
+        for kind, number, party, issued, total, path in invoice_archive.find(
+                _option(args, '--kind'), _option(args, '--party'), _option(args, '--from'), _option(args, '--to')):
+            print(issued + "  " + kind.ljust(8) + " " + number + "  " + party.ljust(20) +
+                  " $" + format(total, '.2f').rjust(10) + "  " + path)
+    elif len(args) == 2 and args[0] == 'compress' and args[1].isdigit():
+        print("✅ Compressed " + str(invoice_archive.compress(int(args[1]))) + " invoices")
+    elif args == ['import']:
+        print("✅ Imported " + str(invoice_archive.import_loose()) + " invoices")
+    else:
+        print("Usage: python archive.py find [--kind K] [--party NAME] [--from YYYY-MM-DD] [--to YYYY-MM-DD]\n"
+              "       python archive.py compress DAYS\n"
+              "       python archive.py import")
@@ -0,0 +1,19 @@
+"""
+WeCare Inventory Management System - Benchmarks Package
+
+Reproducible timings of the inventory's busy paths on seeded synthetic
+data. synthetic.py makes up catalogs and order streams; suite.py times
+the real code on them and stores the results as JSON; compare two result
+files to spot regressions between versions.
+
+    python -m benchmarks run [--sizes 1000,10000,100000] [--orders N] [--invoices N]
+                             [--repeat N] [--seed N] [--output FILE]
+    python -m benchmarks compare OLD.json NEW.json [--threshold PERCENT]
+    python -m benchmarks generate SIZE CATALOG_FILE [--orders N ORDER_FILE] [--seed N]
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+from benchmarks.suite import compare, load_results, run_suite, save_results
+from benchmarks.synthetic import restock_orders, sales_orders, write_catalog, write_orders
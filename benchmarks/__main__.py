@@ -0,0 +1,117 @@
+"""
+WeCare Inventory Management System - Benchmarks Command Line
+
+Runs the benchmark suite, compares two result files or writes synthetic
+data; see the benchmarks package for the commands.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import sys
+from datetime import datetime
+
+from benchmarks.suite import (DEFAULT_INVOICE_LINES, DEFAULT_INVOICES, DEFAULT_MEMORY_SIZE, DEFAULT_ORDERS,
+                              DEFAULT_REPEAT, DEFAULT_SEED, DEFAULT_SIZES, DEFAULT_THRESHOLD, compare, load_results,
+                              run_suite, save_results)
+from benchmarks.synthetic import sales_orders, write_catalog, write_orders
+
+USAGE = ("Usage: python -m benchmarks run [--sizes 1000,10000,100000] [--orders N] [--invoices N]\n"
+         "                                [--invoice-lines N] [--memory-size N] [--repeat N] [--seed N]\n"
+         "                                [--output FILE]\n"
+         "       python -m benchmarks compare OLD.json NEW.json [--threshold PERCENT]\n"
+         "       python -m benchmarks generate SIZE CATALOG_FILE [--orders N ORDER_FILE] [--seed N]")
+
+def _options(args, names):
+    """
+    Splits "--name value" pairs off the command line.
+
+    Parameters:
+        args (list): Command-line arguments
+        names (tuple): Option names allowed
+
+    Returns:
+        tuple: (dict of option values, list of remaining arguments)
+
+    Raises:
+        ValueError: If an option is unknown or has no value
+    """
+    options = {}
+    rest = []
+    index = 0
+    while index < len(args):
+        if args[index].startswith('--'):
+            if args[index] not in names or index + 1 >= len(args):
+                raise ValueError(args[index])
+            options[args[index]] = args[index + 1]
+            index += 2
+        else:
+            rest.append(args[index])
+            index += 1
+    return options, rest
+
+def main(args):
+    """
+    Runs one benchmarks command.
+
+    Parameters:
+        args (list): Command-line arguments after "python -m benchmarks"
+
+    Returns:
+        int: Exit status; 1 from compare when a case got slower
+    """
+    try:
+        if args[:1] == ['run']:
+            options, rest = _options(args[1:], ('--sizes', '--orders', '--invoices', '--invoice-lines', '--memory-size',
+                                                '--repeat', '--seed', '--output'))
+            if rest:
+                raise ValueError(rest[0])
+            sizes = [int(size) for size in options.get('--sizes', ','.join(map(str, DEFAULT_SIZES))).split(',')]
+            results = run_suite(sizes, int(options.get('--orders', DEFAULT_ORDERS)),
+                                int(options.get('--invoices', DEFAULT_INVOICES)),
+                                int(options.get('--repeat', DEFAULT_REPEAT)), int(options.get('--seed', DEFAULT_SEED)),
+                                invoice_lines=int(options.get('--invoice-lines', DEFAULT_INVOICE_LINES)),
+                                memory_size=int(options.get('--memory-size', DEFAULT_MEMORY_SIZE)))
+            path = options.get('--output', 'benchmark-' + datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+            save_results(results, path)
+            print("✅ Results saved to " + path)
+            return 0
+        if args[:1] == ['compare']:
+            options, rest = _options(args[1:], ('--threshold',))
+            if len(rest) != 2:
+                raise ValueError("compare needs two result files")
+            threshold = float(options['--threshold']) / 100 if '--threshold' in options else DEFAULT_THRESHOLD
+            regressions = compare(load_results(rest[0]), load_results(rest[1]), threshold)
+            if regressions:
+                print("⚠️ " + str(len(regressions)) + " cases are more than " + format(threshold * 100, 'g') +
+                      "% slower")
+                return 1
+            print("✅ No case is more than " + format(threshold * 100, 'g') + "% slower")
+            return 0
+        if args[:1] == ['generate']:
+            options, rest = _options(args[1:], ('--orders', '--seed'))
+            seed = int(options.get('--seed', DEFAULT_SEED))
+            if len(rest) == 3 and '--orders' in options:
+                # "--orders N ORDER_FILE": the order file is left among the positional arguments
+                order_path = rest.pop()
+            elif len(rest) == 2 and '--orders' not in options:
+                order_path = None
+            else:
+                raise ValueError("generate needs SIZE and CATALOG_FILE")
+            size = int(rest[0])
+            write_catalog(rest[1], size, seed)
+            print("✅ Wrote " + str(size) + " products to " + rest[1])
+            if order_path is not None:
+                write_orders(order_path, sales_orders(size, int(options['--orders']), seed))
+                print("✅ Wrote " + options['--orders'] + " sales order lines to " + order_path)
+            return 0
+    except ValueError as e:
+        print("❌ Invalid arguments: " + str(e))
+    except OSError as e:
+        print("❌ " + str(e))
+        return 1
+    print(USAGE)
+    return 2
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
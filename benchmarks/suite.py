@@ -0,0 +1,574 @@
+"""
+WeCare Inventory Management System - Benchmark Suite Module
+
+This module times the real code paths on synthetic data and stores the
+results as JSON, so runs of two versions can be compared.
+
+Cases, each timed for every catalog size:
+    read_from_file      parse the catalog from products.txt, with no cache yet
+    read_cached         load the catalog from its products.cache
+    save_to_inventory   write the whole catalog back out
+    sell_batch          main.py sell ORDERS --no-invoices: load the inventory,
+                        check and price every line, save, add to the ledger
+    restock_batch       the same for main.py restock
+    parse_split         split the catalog's lines into fields with
+                        str.split(','), as read.py did before the codec
+    parse_codec         decode the same lines with codec.decode_rows(),
+                        which also checks and converts every field
+    line_append         sell a customer's items one line at a time, each line
+                        saved by appending to the transaction log
+    line_rewrite        the same, each line saved by rewriting the whole
+                        products.txt as before the log existed
+and once per run:
+    write_invoices      render and file a batch of sales invoices
+    invoice_sync        write the invoices of a run of customers one by one,
+                        as the till did before they were written in the background
+    invoice_submit      queue the same invoices with the background writer;
+                        only the time until submit() returns is counted
+    invoice_legacy      render the items of one large sales invoice by
+                        growing a string item by item, as write.py used to
+    invoice_template    render the same invoice with the invoice templates
+    table_legacy        list 100,000 products in the product table as the old
+                        code did, one print() per row
+    table_full          the same with display_all_products()
+    table_pages         show 100 pages of the product table from the same
+                        catalog, with the row cache empty at the start
+    parse_workers_N     parse a catalog of at least PARALLEL_MIN_BYTES from
+                        products.txt with N worker processes, for 1, 2, 4
+                        and the number of CPUs; 1 is the serial parser
+    memory_rows         build the inventory of a 1M-product catalog as the old
+                        code did, a list of six strings per product
+    memory_products     build the same inventory as Product records
+The two memory cases are timed under tracemalloc, and their results also
+give the peak memory of the build and the memory kept per product.
+
+Every case runs in a scratch directory that gets a fresh copy of the
+catalog before each repeat, so the working directory's inventory is
+never touched and every repeat starts from the same state. Only the
+call itself is timed; the program's messages are discarded while it
+runs.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic import restock_orders, sales_orders, write_catalog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_ORDERS = 1000
+DEFAULT_INVOICES = 200
+DEFAULT_REPEAT = 3
+DEFAULT_SEED = 42
+
+# Lines of the sale in the line_append and line_rewrite cases; rows per second
+# is the number of lines saved per second
+SALE_LINES = 20
+
+# Lines on each invoice of the write_invoices case
+INVOICE_LINES = 5
+
+# Customers served one after another in the invoice_sync and invoice_submit
+# cases; fewer than the writer's queue holds, so submit() never waits for room
+TILL_CUSTOMERS = 20
+
+# Lines on the large invoice of the invoice_legacy and invoice_template cases.
+# The old code is quadratic: 2,000 lines take seconds, 10,000 take minutes.
+DEFAULT_INVOICE_LINES = 2000
+
+# Products in the table cases
+TABLE_ROWS = 100000
+
+# Pages shown in the table_pages case
+TABLE_PAGES = 100
+
+# Products in the parse_workers cases: about 18 MB, above the size at which
+# read.py starts parsing in parallel
+PARSE_ROWS = 400000
+
+# Products in the catalog of the memory cases
+DEFAULT_MEMORY_SIZE = 1000000
+
+# A case counts as slower when its best time grows by more than this fraction
+DEFAULT_THRESHOLD = 0.10
+
+# Files the application keeps in its working directory; removed between repeats
+STATE_FILES = ('products.txt', 'products.cache', 'products.log', 'products.seq', 'products.lock', 'ledger.bin',
+               'ledger_parties.txt', 'ledger.lock')
+
+def _reset(catalog):
+    """
+    Puts a fresh copy of the catalog in the scratch directory and drops the
+    inventory store's cached copy.
+
+    Parameters:
+        catalog (str): Path of the pristine catalog
+    """
+    from inventory import inventory
+    for name in STATE_FILES:
+        if os.path.exists(name):
+            os.remove(name)
+    shutil.copyfile(catalog, 'products.txt')
+    inventory.invalidate()
+
+def _time(setup, call, repeat):
+    """
+    Times a call after running its setup, a number of times.
+
+    Parameters:
+        setup (callable): Run untimed before each call; its result is passed to the call
+        call (callable): The code being timed
+        repeat (int): Number of timed calls
+
+    Returns:
+        list: Seconds taken by each call
+    """
+    seconds = []
+    for n in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = setup()
+            started = time.perf_counter()
+            call(state)
+            seconds.append(time.perf_counter() - started)
+    return seconds
+
+def _result(case, size, rows, seconds):
+    """
+    Summarises the timings of one case.
+
+    Parameters:
+        case (str): Case name
+        size (int): Catalog size, or None for cases that do not depend on it
+        rows (int): Rows handled per call
+        seconds (list): Time of each call
+
+    Returns:
+        dict: The case, its timings, best and median time and rows per second
+    """
+    best = min(seconds)
+    return {
+        'case': case,
+        'size': size,
+        'rows': rows,
+        'seconds': seconds,
+        'min': best,
+        'median': statistics.median(seconds),
+        'rows_per_second': rows / best if best else None,
+    }
+
+def _traced(build):
+    """
+    Runs a call under tracemalloc.
+
+    Parameters:
+        build (callable): Makes the data being measured and returns it
+
+    Returns:
+        tuple: (seconds taken, peak bytes allocated during the call,
+                bytes still allocated for the result afterwards)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = build()
+        seconds = time.perf_counter() - started
+        kept, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return seconds, peak, kept
+
+def _legacy_rows(lines):
+    """
+    Builds an inventory the way read.py used to, a list of six strings per product.
+
+    Parameters:
+        lines (list): Data file rows
+
+    Returns:
+        dict: Product ID -> [ID, name, brand, quantity, price, country] as strings
+    """
+    data = {}
+    for line in lines:
+        fields = line.strip().split(',')
+        data[int(fields[0])] = fields
+    return data
+
+def _legacy_product_table(data):
+    """
+    Prints the product table the way operation.py used to, one print() per row.
+
+    Parameters:
+        data (dict): Product ID -> [ID, name, brand, quantity, price, country] as strings
+    """
+    print("╔" + "═" * 79 + "╗")
+    print("║" + "                                  Product List                                 " + "║")
+    print("╠" + "═" * 79 + "╣")
+    print("║ID ║       Name         ║    Brand     ║   Qty    ║  Cost    ║     Origin      ║")
+    print("╠" + "═" * 79 + "╣")
+
+    for key in data:
+        id_val, name, brand, qty, cost, origin = data[key]
+
+        id_space = " "
+        id_display = id_space + id_val + id_space if (len(id_val) <= 4) else id_space + id_val[:3] + ".. "
+
+        if len(name) > 18:
+            name_display = name[:16] + ".."
+        else:
+            name_display = name + " " * (18 - len(name))
+
+        if len(brand) > 12:
+            brand_display = brand[:10] + ".."
+        else:
+            brand_display = brand + " " * (12 - len(brand))
+
+        qty_str = str(qty)
+        if len(qty_str) > 8:
+            qty_display = qty_str[:6] + ".."
+        else:
+            qty_display = qty_str + " " * (8 - len(qty_str))
+
+        cost_doubled = str(float(cost) * 2)
+        if len(cost_doubled) > 8:
+            cost_display = cost_doubled[:6] + ".."
+        else:
+            cost_display = cost_doubled + " " * (8 - len(cost_doubled))
+
+        if len(origin) > 15:
+            origin_display = origin[:13] + ".."
+        else:
+            origin_display = origin + " " * (15 - len(origin))
+
+        print(
+            "║" + id_display +
+            "║ " + name_display +
+            " ║ " + brand_display +
+            " ║ " + qty_display +
+            " ║ " + cost_display +
+            " ║ " + origin_display + " ║"
+        )
+    print("╚" + "═" * 79 + "╝")
+
+def _invoice_rows(lines):
+    """
+    Makes the line items of a sales invoice.
+
+    Parameters:
+        lines (int): Number of line items
+
+    Returns:
+        list: Rows in the layout taken by invoice.sales_fields()
+    """
+    return [[n, 'Product ' + str(n), 3, 1, 300.0, 100.0, 'Brand', 39.0, 'Buy 3 Get 1 Free']
+            for n in range(1, lines + 1)]
+
+def _legacy_sales_items(items_for_invoice, separator):
+    """
+    Renders the item blocks of a sales invoice the way write.py used to,
+    adding one f-string per item to a growing string.
+
+    Parameters:
+        items_for_invoice (list): Rows in the layout taken by invoice.sales_fields()
+        separator (str): Text placed between two item blocks
+
+    Returns:
+        str: The item blocks
+    """
+    invoice_content = ""
+    index = 0
+    length = len(items_for_invoice)
+    while index < length:
+        item = items_for_invoice[index]
+        invoice_content += f"""║                                                                             ║
+║  Item {index + 1}                                                                     ║
+║  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━║
+║  Product ID: #{item[0]}                                                                     
+║  Product Name: {item[1]}                                         
+║  Brand Name: {item[6]}                                         
+║                                                                              
+║  Quantity: {item[2]} units    ×    Unit Cost: ${item[5]:.2f}      
+║                                                Subtotal: ${item[4]:.2f}     
+║  🎁 Free Products: {item[3]} units (Buy 3 Get 1 Free)             
+║                                                                              
+"""
+        if index < length - 1:
+            invoice_content += separator
+        index += 1
+    return invoice_content
+
+def _commit():
+    """
+    Returns the git commit being benchmarked, if the code is in a git checkout.
+
+    Returns:
+        str: Short commit hash, or None
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes=DEFAULT_SIZES, orders=DEFAULT_ORDERS, invoices=DEFAULT_INVOICES, repeat=DEFAULT_REPEAT,
+              seed=DEFAULT_SEED, report=print, invoice_lines=DEFAULT_INVOICE_LINES,
+              memory_size=DEFAULT_MEMORY_SIZE):
+    """
+    Runs every case and returns the results.
+
+    Parameters:
+        sizes (iterable): Catalog sizes to time the catalog cases at
+        orders (int): Order lines in each sell and restock batch
+        invoices (int): Invoices in the write_invoices case
+        repeat (int): Timed calls per case
+        seed (int): Seed for the synthetic data
+        report (function): Called with a line of progress per case
+        invoice_lines (int): Line items on the large invoice of the invoice_legacy
+                             and invoice_template cases
+        memory_size (int): Products in the catalog of the memory cases; 0 skips them
+
+    Returns:
+        dict: The run's environment and settings, and one entry per case in 'results'
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    started = datetime.now()
+    results = []
+    scratch = tempfile.mkdtemp(prefix='wecare-bench-')
+    previous = os.getcwd()
+    os.chdir(scratch)
+    try:
+        # Imported only now, inside the scratch directory, so a pricing.json
+        # in the working directory cannot change what is timed
+        from codec import decode_rows
+        from inventory import inventory
+        from invoice import SALES_INVOICE, render_invoice, write_invoices
+        from invoice_queue import BackgroundInvoiceWriter
+        import operation
+        from operation import PAGE_SIZE, display_all_products, display_product_page, process_restock, process_sales
+        from read import PARALLEL_MIN_BYTES, read_from_file, read_snapshot
+        from write import save_to_inventory
+
+        from product import products_from_columns
+
+        def record(result):
+            results.append(result)
+            line = (result['case'].ljust(18) + ' size ' + str(result['size']).rjust(9) + '  best ' +
+                    format(result['min'] * 1000, '.1f').rjust(10) + ' ms  ' +
+                    format(result['rows_per_second'] or 0, ',.0f').rjust(12) + ' rows/s')
+            if 'peak_bytes' in result:
+                line += ('  peak ' + format(result['peak_bytes'] / 1048576, ',.0f') + ' MB, ' +
+                         format(result['bytes_per_row'], '.0f') + ' bytes/product')
+            report(line)
+
+        for size in sizes:
+            catalog = os.path.join(scratch, 'catalog-' + str(size) + '.txt')
+            write_catalog(catalog, size, seed)
+            sales = sales_orders(size, orders, seed)
+            restocks = restock_orders(size, orders, seed)
+
+            record(_result('read_from_file', size, size, _time(
+                lambda: _reset(catalog), lambda state: read_from_file(), repeat)))
+
+            def cached():
+                _reset(catalog)
+                read_from_file()
+            record(_result('read_cached', size, size, _time(
+                cached, lambda state: read_from_file(), repeat)))
+
+            def loaded():
+                _reset(catalog)
+                return read_from_file()
+            record(_result('save_to_inventory', size, size, _time(
+                loaded, lambda data: save_to_inventory(data), repeat)))
+
+            record(_result('sell_batch', size, len(sales), _time(
+                lambda: _reset(catalog), lambda state: process_sales(sales, generate_invoices=False), repeat)))
+            record(_result('restock_batch', size, len(restocks), _time(
+                lambda: _reset(catalog), lambda state: process_restock(restocks, generate_invoices=False),
+                repeat)))
+
+            with open(catalog, 'r') as f:
+                lines = f.readlines()
+            record(_result('parse_split', size, size, _time(
+                lambda: None, lambda state: _legacy_rows(lines), repeat)))
+            record(_result('parse_codec', size, size, _time(
+                lambda: None, lambda state: decode_rows(lines), repeat)))
+            del lines
+
+            sale = range(1, min(SALE_LINES, size) + 1)
+            def sell_by_log(state):
+                for product_id in sale:
+                    inventory.adjust_stock(product_id, -1)
+            def sell_by_rewrite(data):
+                for product_id in sale:
+                    data[product_id].qty -= 1
+                    save_to_inventory(data)
+            def store_loaded():
+                _reset(catalog)
+                inventory.get_data()
+            record(_result('line_append', size, len(sale), _time(store_loaded, sell_by_log, repeat)))
+            record(_result('line_rewrite', size, len(sale), _time(loaded, sell_by_rewrite, repeat)))
+            os.remove(catalog)
+
+        rows = _invoice_rows(INVOICE_LINES)
+        batch = [('Customer ' + str(n), rows, None) for n in range(invoices)]
+        record(_result('write_invoices', None, invoices, _time(
+            lambda: None, lambda state: write_invoices('sell', batch), repeat)))
+
+        customers = ['Customer ' + str(n) for n in range(TILL_CUSTOMERS)]
+        def write_each(state):
+            for customer in customers:
+                write_invoices('sell', [(customer, rows, None)])
+        record(_result('invoice_sync', None, len(customers), _time(lambda: None, write_each, repeat)))
+        writer = BackgroundInvoiceWriter()
+        def submit_each(state):
+            for customer in customers:
+                writer.submit('sell', customer, rows)
+        # Each repeat starts once the invoices of the one before are written
+        record(_result('invoice_submit', None, len(customers), _time(writer.drain, submit_each, repeat)))
+        writer.drain()
+
+        rows = _invoice_rows(invoice_lines)
+        separator = SALES_INVOICE.separator
+        if _legacy_sales_items(rows[:100], separator) != SALES_INVOICE._items(rows[:100], separator):
+            raise RuntimeError("Invoice template output differs from the old layout")
+        record(_result('invoice_legacy', invoice_lines, invoice_lines, _time(
+            lambda: None, lambda state: _legacy_sales_items(rows, separator), repeat)))
+        record(_result('invoice_template', invoice_lines, invoice_lines, _time(
+            lambda: None, lambda state: render_invoice('sell', 'Benchmark', rows, 'BENCH'), repeat)))
+
+        catalog = os.path.join(scratch, 'catalog-' + str(TABLE_ROWS) + '.txt')
+        write_catalog(catalog, TABLE_ROWS, seed)
+        with open(catalog, 'r') as f:
+            products = list(products_from_columns(*decode_rows(f)[1:7]).values())
+        os.remove(catalog)
+        legacy = {product.product_id: product.to_row().split(',') for product in products}
+        record(_result('table_legacy', TABLE_ROWS, TABLE_ROWS, _time(
+            lambda: None, lambda state: _legacy_product_table(legacy), repeat)))
+        record(_result('table_full', TABLE_ROWS, TABLE_ROWS, _time(
+            lambda: None, lambda state: display_all_products(products), repeat)))
+
+        def show_pages(state):
+            for page in range(TABLE_PAGES):
+                display_product_page(products, page)
+        record(_result('table_pages', TABLE_ROWS, TABLE_PAGES * PAGE_SIZE, _time(
+            operation._row_cache.clear, show_pages, repeat)))
+        del products, legacy
+
+        catalog = os.path.join(scratch, 'catalog-' + str(PARSE_ROWS) + '.txt')
+        write_catalog(catalog, PARSE_ROWS, seed)
+        if os.path.getsize(catalog) < PARALLEL_MIN_BYTES:
+            raise RuntimeError("The parse_workers catalog is too small to be parsed in parallel")
+        for workers in sorted(set((1, 2, 4, os.cpu_count() or 1))):
+            record(_result('parse_workers_' + str(workers), PARSE_ROWS, PARSE_ROWS, _time(
+                lambda: _reset(catalog), lambda state: read_snapshot(workers), repeat)))
+        os.remove(catalog)
+
+        if memory_size:
+            catalog = os.path.join(scratch, 'catalog-' + str(memory_size) + '.txt')
+            write_catalog(catalog, memory_size, seed)
+            with open(catalog, 'r') as f:
+                lines = f.readlines()
+            os.remove(catalog)
+            builds = (
+                ('memory_rows', lambda: _legacy_rows(lines)),
+                ('memory_products', lambda: products_from_columns(*decode_rows(lines)[1:7])),
+            )
+            for case, build in builds:
+                seconds, peak, kept = _traced(build)
+                result = _result(case, memory_size, memory_size, [seconds])
+                result['peak_bytes'] = peak
+                result['bytes_per_row'] = kept / memory_size
+                record(result)
+            del lines
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        'suite': 'wecare',
+        'created': started.isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': {'sizes': list(sizes), 'orders': orders, 'invoices': invoices, 'repeat': repeat, 'seed': seed,
+                     'invoice_lines': invoice_lines, 'memory_size': memory_size},
+        'results': results,
+    }
+
+def save_results(results, path):
+    """
+    Writes a run's results as JSON.
+
+    Parameters:
+        results (dict): As returned by run_suite()
+        path (str): File to write
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+def load_results(path):
+    """
+    Reads results written by save_results().
+
+    Parameters:
+        path (str): Results file
+
+    Returns:
+        dict: The run's results
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD, report=print):
+    """
+    Compares the best times of two runs case by case.
+
+    Parameters:
+        old (dict): Results of the earlier run
+        new (dict): Results of the later run
+        threshold (float): Growth in best time, as a fraction, counted as a regression
+        report (function): Called with one line per case found in both runs
+
+    Returns:
+        list: (case, size, old seconds, new seconds) for every case that got slower
+              by more than the threshold
+    """
+    before = {(result['case'], result['size']): result['min'] for result in old['results']}
+    regressions = []
+    for result in new['results']:
+        key = (result['case'], result['size'])
+        if key not in before:
+            continue
+        change = result['min'] / before[key] - 1 if before[key] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠️ slower'
+            regressions.append((key[0], key[1], before[key], result['min']))
+        elif change < -threshold:
+            flag = '  ✅ faster'
+        report(key[0].ljust(18) + ' size ' + str(key[1]).rjust(9) + '  ' +
+               format(before[key] * 1000, '.1f').rjust(10) + ' ms -> ' +
+               format(result['min'] * 1000, '.1f').rjust(10) + ' ms  ' +
+               format(change * 100, '+.1f').rjust(7) + '%' + flag)
+    return regressions
@@ -0,0 +1,145 @@
+"""
+WeCare Inventory Management System - Synthetic Data Module
+
+This module makes up catalogs and order streams for the benchmarks. The
+same seed always gives the same data, so two runs, or two versions of the
+code, are timed on identical input.
+
+Catalogs are written straight to a products.txt-format file a block of
+rows at a time, so even a 10M-SKU catalog is generated in constant memory.
+Product IDs run from 1 to the catalog size.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import csv
+import random
+
+NAME_WORDS = ('Aqua', 'Bomb', 'Cream', 'Skin', 'Cleanser', 'Sunscreen', 'Gentle', 'Hydrating', 'Night',
+              'Repair', 'Serum', 'Toner', 'Mist', 'Gel', 'Foam', 'Balm', 'Vitamin', 'Glow', 'Calming',
+              'Daily', 'Moisture', 'Barrier', 'Clay', 'Mask', 'Peel', 'Lotion', 'Oil', 'Essence')
+BRANDS = ('Cetaphil', 'Aqualogica', 'Belif', 'Cosrx', 'Neutrogena', 'Olay', 'Nivea', 'Innisfree',
+          'Laneige', 'Klairs', 'Simple', 'Garnier', 'Mamaearth', 'Minimalist', 'Biore', 'Hada Labo',
+          'Some By Mi', 'Purito', 'Eucerin', 'La Roche-Posay')
+ORIGINS = ('Switzerland', 'India', 'South Korea', 'Japan', 'France', 'Germany', 'USA', 'Nepal',
+           'United Kingdom', 'Thailand')
+
+# Rows generated per write
+BLOCK_ROWS = 10000
+
+def catalog_rows(count, seed):
+    """
+    Yields the rows of a synthetic catalog.
+
+    Parameters:
+        count (int): Number of products
+        seed (int): Random seed
+
+    Yields:
+        str: A data file row, ID,Product Name,Brand,Quantity,Price,Country, with its newline
+    """
+    chooser = random.Random(seed)
+    for product_id in range(1, count + 1):
+        name = ' '.join(chooser.sample(NAME_WORDS, chooser.randint(1, 3)))
+        yield (str(product_id) + ',' + name + ',' + chooser.choice(BRANDS) + ',' +
+               str(chooser.randint(1, 1000)) + ',' + str(float(chooser.randint(50, 5000))) + ',' +
+               chooser.choice(ORIGINS) + '\n')
+
+def write_catalog(path, count, seed=42):
+    """
+    Writes a synthetic catalog in the products.txt format.
+
+    Parameters:
+        path (str): File to write
+        count (int): Number of products
+        seed (int): Random seed
+
+    Returns:
+        int: Number of products written
+    """
+    with open(path, 'w') as f:
+        block = []
+        for row in catalog_rows(count, seed):
+            block.append(row)
+            if len(block) == BLOCK_ROWS:
+                f.write(''.join(block))
+                block = []
+        f.write(''.join(block))
+    return count
+
+def sales_orders(catalog_size, count, seed=42, customers=50):
+    """
+    Makes up a stream of sales order lines for a synthetic catalog.
+
+    Quantities are small, as at a till, so most lines can be sold.
+
+    Parameters:
+        catalog_size (int): Number of products in the catalog
+        count (int): Number of order lines
+        seed (int): Random seed
+        customers (int): Number of different customers
+
+    Returns:
+        list: Dictionaries with 'customer', 'product_id' and 'quantity',
+              as read_orders() returns them
+    """
+    chooser = random.Random(seed)
+    return [{'customer': 'Customer ' + str(chooser.randint(1, customers)),
+             'product_id': chooser.randint(1, catalog_size),
+             'quantity': chooser.randint(1, 5)}
+            for n in range(count)]
+
+def restock_orders(catalog_size, count, seed=42, vendors=10, new_share=0.1):
+    """
+    Makes up a stream of restocking order lines for a synthetic catalog.
+
+    Most lines restock existing products; about new_share of them add
+    products with IDs above the catalog's.
+
+    Parameters:
+        catalog_size (int): Number of products in the catalog
+        count (int): Number of order lines
+        seed (int): Random seed
+        vendors (int): Number of different vendors
+        new_share (float): Fraction of the lines that add a new product
+
+    Returns:
+        list: Dictionaries with 'vendor', 'product_id', 'quantity', 'cost'
+              and, for new products, 'name', 'brand' and 'origin'
+    """
+    chooser = random.Random(seed)
+    orders = []
+    next_id = catalog_size + 1
+    for n in range(count):
+        order = {'vendor': 'Vendor ' + str(chooser.randint(1, vendors)),
+                 'quantity': chooser.randint(10, 200),
+                 'cost': float(chooser.randint(50, 5000))}
+        if chooser.random() < new_share:
+            order.update({'product_id': next_id,
+                          'name': ' '.join(chooser.sample(NAME_WORDS, 2)),
+                          'brand': chooser.choice(BRANDS),
+                          'origin': chooser.choice(ORIGINS)})
+            next_id += 1
+        else:
+            order['product_id'] = chooser.randint(1, catalog_size)
+        orders.append(order)
+    return orders
+
+def write_orders(path, orders):
+    """
+    Writes order lines as a CSV file that main.py's batch mode reads.
+
+    Parameters:
+        path (str): File to write
+        orders (list): Order dictionaries; the columns are taken from their keys
+    """
+    columns = []
+    for order in orders:
+        for column in order:
+            if column not in columns:
+                columns.append(column)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(orders)
@@ -0,0 +1,410 @@
+"""
+WeCare Inventory Management System - Binary Inventory Module
+
+This module stores the inventory in a fixed-width binary file that is
+accessed through mmap. Every product occupies one record of the same size,
+so the position of any product is known from its slot number, and selling
+an item only rewrites the 4-byte quantity field of that record in place
+instead of rewriting the whole inventory.
+
+File layout (little-endian):
+    Header, 32 bytes:  magic "WCINV1", record count, record size, version
+    Records, 152 bytes each:
+        id      int64
+        qty     int32
+        live    uint8   (0 marks a removed product whose slot can be reused)
+        cost    float64
+        name    64 bytes UTF-8, NUL padded
+        brand   32 bytes UTF-8, NUL padded
+        origin  32 bytes UTF-8, NUL padded
+
+Text longer than its field is cut short when it is stored. The id -> slot
+index is built in memory when the file is opened, and rebuilt whenever the
+header version shows another program has written to the file. A running
+program also checks that products.bin is still the file it mapped each time
+it takes the inventory lock; if "import" replaced it, the new file is mapped
+instead, so no change is written to the old, unlinked copy.
+
+Select it with WECARE_BACKEND=binary, after converting the inventory:
+    python binary_store.py import   (products.txt -> products.bin)
+    python binary_store.py export   (products.bin -> products.txt)
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+from locking import inventory_lock
+from product import Product
+from read import read_from_file
+from write import compact_log
+
+BIN_FILE = 'products.bin'
+
+MAGIC = b'WCINV1\0\0'
+HEADER = struct.Struct('<8sIIQ8x')
+RECORD = struct.Struct('<qiB3xd64s32s32s')
+QTY = struct.Struct('<i')
+VERSION = struct.Struct('<Q')
+SLOT_KEY = struct.Struct('<q4xB')
+
+# Offsets of the fields that are updated in place
+QTY_OFFSET = 8
+LIVE_OFFSET = 12
+VERSION_OFFSET = 16
+
+# Number of record slots added at a time when the file is full
+GROW_SLOTS = 1024
+
+def _encode(text, size):
+    """
+    Encodes text for a fixed-width field, cutting it short if needed.
+
+    Parameters:
+        text (str): Text to encode
+        size (int): Width of the field in bytes
+
+    Returns:
+        bytes: UTF-8 text of at most size bytes, never ending in a split character
+    """
+    return text.encode('utf-8')[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+def _decode(raw):
+    """
+    Decodes a NUL-padded fixed-width text field.
+
+    Parameters:
+        raw (bytes): The field contents
+
+    Returns:
+        str: The stored text
+    """
+    return raw.rstrip(b'\0').decode('utf-8')
+
+def pack_product(product):
+    """
+    Packs a product into one fixed-width record.
+
+    Parameters:
+        product (Product): The product to pack
+
+    Returns:
+        bytes: The record
+    """
+    return RECORD.pack(product.product_id, product.qty, 1, product.cost,
+                       _encode(product.name, 64), _encode(product.brand, 32),
+                       _encode(product.origin, 32))
+
+def unpack_product(buffer, offset):
+    """
+    Unpacks the record at the given offset.
+
+    Parameters:
+        buffer: The mapped file
+        offset (int): Byte offset of the record
+
+    Returns:
+        Product: The stored product, or None if the slot is not live
+    """
+    product_id, qty, live, cost, name, brand, origin = RECORD.unpack_from(buffer, offset)
+    if not live:
+        return None
+    return Product(product_id, _decode(name), _decode(brand), qty, cost, _decode(origin))
+
+class BinaryBackend:
+    """
+    Inventory backend that keeps products in a memory-mapped fixed-width file.
+
+    Attributes:
+        path (str): Path of the binary inventory file
+        _index (dict): Product ID -> byte offset of its record
+        _free (list): Offsets of removed records that can be reused
+    """
+
+    def __init__(self, path=BIN_FILE):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._index = {}
+        self._free = []
+        self._indexed_version = None
+
+    def _open(self):
+        """
+        Maps the file, creating an empty inventory file if there is none.
+
+        The file is mapped again if it was replaced since it was opened.
+        """
+        if self._file is not None and self._replaced():
+            self.close()
+        if self._file is None:
+            if not os.path.exists(self.path):
+                create_binary_file(self.path, [])
+            self._file = open(self.path, 'r+b')
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, count, record_size, version = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or record_size != RECORD.size:
+                self.close()
+                raise ValueError(self.path + " is not a WeCare binary inventory file")
+        elif os.fstat(self._file.fileno()).st_size != len(self._map):
+            # Another program grew the file; map its new length
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _replaced(self):
+        """
+        Checks whether the path now names a different file from the open one.
+
+        Returns:
+            bool: True if the file was replaced, e.g. by "python binary_store.py import"
+        """
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(self._file.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+    def _refresh(self):
+        """
+        Rebuilds the id -> offset index if the file changed since it was built.
+        """
+        self._open()
+        magic, count, record_size, version = HEADER.unpack_from(self._map, 0)
+        if version == self._indexed_version:
+            return
+        self._index = {}
+        self._free = []
+        offset = HEADER.size
+        for slot in range(count):
+            product_id, live = SLOT_KEY.unpack_from(self._map, offset)
+            if live:
+                self._index[product_id] = offset
+            else:
+                self._free.append(offset)
+            offset += RECORD.size
+        self._indexed_version = version
+
+    def signature(self):
+        """
+        Returns a value that changes whenever the inventory is saved.
+
+        Returns:
+            int: The version stored in the file header
+        """
+        return self.version()
+
+    def version(self):
+        """
+        Returns the sequence number of the last saved change.
+
+        Returns:
+            int: Current version of the inventory
+        """
+        self._open()
+        return VERSION.unpack_from(self._map, VERSION_OFFSET)[0]
+
+    def load(self):
+        """
+        Reads every live product from the file.
+
+        Returns:
+            dict: Dictionary mapping product ID to Product
+        """
+        data = {}
+        for product in self.iter_products():
+            data[product.product_id] = product
+        return data
+
+    def iter_products(self):
+        """
+        Yields the live products one at a time, in slot order.
+
+        Yields:
+            Product: The next product in the inventory
+        """
+        self._refresh()
+        count = HEADER.unpack_from(self._map, 0)[1]
+        for slot in range(count):
+            product = unpack_product(self._map, HEADER.size + slot * RECORD.size)
+            if product is not None:
+                yield product
+
+    def get_product(self, product_id):
+        """
+        Reads a single product through the index.
+
+        Parameters:
+            product_id (int): The product to read
+
+        Returns:
+            Product: The product, or None if it is not in the inventory
+        """
+        self._refresh()
+        offset = self._index.get(product_id)
+        return unpack_product(self._map, offset) if offset is not None else None
+
+    def save_changes(self, data, product_ids):
+        """
+        Writes the given products into their records.
+
+        A change that only touches the quantity is a single 4-byte write.
+        Other changes rewrite the product's record in place, new products
+        take a free slot or are appended, and products whose quantity dropped
+        below 1 are removed from the data and their slot is marked free.
+
+        Parameters:
+            data (dict): Dictionary mapping product ID to Product, already updated in memory
+            product_ids (list): IDs of the products that were changed
+
+        Returns:
+            bool: True if the changes were written, False otherwise
+        """
+        try:
+            self._refresh()
+            for key in product_ids:
+                if key in data and data[key].qty < 1:
+                    data.pop(key)
+
+                offset = self._index.get(key)
+                if key not in data:
+                    if offset is not None:
+                        self._map[offset + LIVE_OFFSET] = 0
+                        del self._index[key]
+                        self._free.append(offset)
+                    continue
+
+                record = pack_product(data[key])
+                if offset is None:
+                    offset = self._allocate()
+                    self._map[offset:offset + RECORD.size] = record
+                    self._index[key] = offset
+                elif self._map[offset + LIVE_OFFSET + 1:offset + RECORD.size] == record[LIVE_OFFSET + 1:]:
+                    # Only the quantity changed
+                    QTY.pack_into(self._map, offset + QTY_OFFSET, data[key].qty)
+                else:
+                    self._map[offset:offset + RECORD.size] = record
+
+            version = self.version() + 1
+            VERSION.pack_into(self._map, VERSION_OFFSET, version)
+            self._indexed_version = version
+            self._map.flush()
+            print("✅ Inventory data updated successfully")
+            return True
+        except (OSError, ValueError, struct.error) as e:
+            print("❌ Error writing to binary inventory: " + str(e))
+            return False
+
+    def _allocate(self):
+        """
+        Finds a slot for a new record, growing the file if none is free.
+
+        Returns:
+            int: Byte offset of the slot
+        """
+        if self._free:
+            return self._free.pop()
+        count = HEADER.unpack_from(self._map, 0)[1]
+        offset = HEADER.size + count * RECORD.size
+        if offset + RECORD.size > len(self._map):
+            self._map.flush()
+            self._map.close()
+            self._file.truncate(offset + GROW_SLOTS * RECORD.size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        struct.pack_into('<I', self._map, 8, count + 1)
+        return offset
+
+    def close(self):
+        """
+        Unmaps and closes the file if it is open.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._indexed_version = None
+
+def create_binary_file(path, products, version=0):
+    """
+    Writes a complete binary inventory file.
+
+    Parameters:
+        path (str): File to create or replace
+        products (iterable): Products to store
+        version (int): Version number to store in the header
+
+    Returns:
+        int: Number of products written
+    """
+    records = [pack_product(product) for product in products]
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), RECORD.size, version))
+        f.write(b''.join(records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(records)
+
+def csv_to_binary(bin_path=BIN_FILE):
+    """
+    Converts the flat-file inventory (snapshot plus log) to the binary format.
+
+    Parameters:
+        bin_path (str): Binary file to write
+
+    Returns:
+        int: Number of products converted
+    """
+    with inventory_lock():
+        data = read_from_file()
+        for product in data.values():
+            if (len(product.name.encode('utf-8')) > 64 or len(product.brand.encode('utf-8')) > 32
+                    or len(product.origin.encode('utf-8')) > 32):
+                print("⚠️ Text of product ID " + str(product.product_id) + " is too long and was shortened")
+        version = 0
+        if os.path.exists(bin_path):
+            backend = BinaryBackend(bin_path)
+            try:
+                version = backend.version() + 1
+            except ValueError:
+                pass
+            finally:
+                backend.close()
+        count = create_binary_file(bin_path, data.values(), version)
+    print("✅ Converted " + str(count) + " products to " + bin_path)
+    return count
+
+def binary_to_csv(bin_path=BIN_FILE):
+    """
+    Converts the binary inventory back to the products.txt flat file.
+
+    Parameters:
+        bin_path (str): Binary file to read
+
+    Returns:
+        int: Number of products converted
+    """
+    backend = BinaryBackend(bin_path)
+    try:
+        with inventory_lock():
+            data = backend.load()
+            compact_log(data)
+    finally:
+        backend.close()
+    print("✅ Converted " + str(len(data)) + " products from " + bin_path)
+    return len(data)
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2 and sys.argv[1] == 'import':
+        csv_to_binary()
+    elif len(sys.argv) == 2 and sys.argv[1] == 'export':
+        binary_to_csv()
+    else:
+        print("Usage: python binary_store.py import|export")
@@ -0,0 +1,332 @@
+"""
+WeCare Inventory Management System - Cart Module
+
+This module holds a customer's basket while they shop. Adding an item
+reserves its stock, including the free items it earns, without changing
+the inventory: nothing is written until checkout, when the whole basket is
+saved in one inventory transaction, added to the sales ledger and its
+invoice queued.
+
+Reservations keep two open carts (for example on a shared server) from
+promising the same units. A cart that is neither checked out nor touched
+for CART_TIMEOUT seconds loses its reservations, so an abandoned basket
+never holds stock for long; abandon() releases them at once. If an expired
+cart does come back to checkout, its items are reserved again if the stock
+is still there.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import itertools
+import threading
+import time
+
+from inventory import StockConflictError, inventory
+from invoice_queue import invoice_writer
+from ledger import record_lines
+from pricing import pricing
+
+# Seconds an untouched cart keeps its reservations
+CART_TIMEOUT = 15 * 60
+
+class Reservations:
+    """
+    Units held by open carts, per product.
+
+    Each cart's holdings expire at a deadline that moves forward every time
+    the cart reserves again. Expired holdings are dropped lazily, whenever
+    the reservations are looked at.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._carts = {}     # cart id -> (deadline, {product_id: units})
+        self._totals = {}    # product_id -> units held by all carts
+
+    def _expire(self, now):
+        """
+        Drops the holdings of carts whose deadline has passed.
+
+        Must be called with the lock held.
+
+        Parameters:
+            now (float): Current time.monotonic() value
+        """
+        for cart_id in [cart_id for cart_id, (deadline, held) in self._carts.items() if deadline <= now]:
+            self._drop(cart_id)
+
+    def _drop(self, cart_id):
+        """
+        Removes one cart's holdings from the totals. Must be called with the lock held.
+
+        Parameters:
+            cart_id (int): The cart
+        """
+        deadline, held = self._carts.pop(cart_id, (None, {}))
+        for product_id, units in held.items():
+            left = self._totals[product_id] - units
+            if left:
+                self._totals[product_id] = left
+            else:
+                del self._totals[product_id]
+
+    def held_by_others(self, cart_id, product_id):
+        """
+        Returns the units of a product held by carts other than the given one.
+
+        Parameters:
+            cart_id (int): The cart asking
+            product_id (int): The product
+
+        Returns:
+            int: Units reserved by other carts
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            own = self._carts.get(cart_id, (None, {}))[1].get(product_id, 0)
+            return self._totals.get(product_id, 0) - own
+
+    def hold(self, cart_id, product_id, units, available, timeout):
+        """
+        Sets how many units of a product a cart holds, if the stock allows it.
+
+        Parameters:
+            cart_id (int): The cart
+            product_id (int): The product
+            units (int): Units the cart should hold in total (0 releases them)
+            available (int): Units of the product in stock
+            timeout (float): Seconds until the cart's holdings expire
+
+        Returns:
+            bool: True if the units are now held, False if other carts hold too many
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            deadline, held = self._carts.get(cart_id, (None, {}))
+            own = held.get(product_id, 0)
+            others = self._totals.get(product_id, 0) - own
+            if units and others + units > available:
+                return False
+            if units:
+                held[product_id] = units
+            else:
+                held.pop(product_id, None)
+            total = others + units
+            if total:
+                self._totals[product_id] = total
+            else:
+                self._totals.pop(product_id, None)
+            self._carts[cart_id] = (now + timeout, held)
+            return True
+
+    def is_held(self, cart_id):
+        """
+        Checks whether a cart still has its reservations.
+
+        Parameters:
+            cart_id (int): The cart
+
+        Returns:
+            bool: False if the cart's reservations expired or were released
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            return cart_id in self._carts
+
+    def release(self, cart_id):
+        """
+        Gives back everything a cart holds.
+
+        Parameters:
+            cart_id (int): The cart
+        """
+        with self._lock:
+            self._drop(cart_id)
+
+class Cart:
+    """
+    One customer's basket of items, held until checkout.
+
+    Attributes:
+        customer_name (str): Who the cart belongs to
+        lines (dict): Product ID -> quantity bought, in the order added
+        checked_out (bool): True once the cart has been saved
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, customer_name, store=inventory, rules=pricing, book=None, timeout=CART_TIMEOUT):
+        self.customer_name = customer_name
+        self.lines = {}
+        self.checked_out = False
+        self._id = next(Cart._ids)
+        self._store = store
+        self._rules = rules
+        self._book = book if book is not None else reservations
+        self._timeout = timeout
+
+    def _product(self, product_id):
+        """
+        Looks a product up in the current inventory.
+
+        Parameters:
+            product_id (int): The product
+
+        Returns:
+            Product: The product
+
+        Raises:
+            StockConflictError: If there is no such product
+        """
+        product = self._store.get_data().get(product_id)
+        if product is None:
+            raise StockConflictError("Product ID " + str(product_id) + " is not in the inventory")
+        return product
+
+    def sellable(self, product_id):
+        """
+        Returns how many items of a product this cart could contain in total.
+
+        Stock held by other carts is not available, and enough must be left
+        for the free items the quantity earns.
+
+        Parameters:
+            product_id (int): The product
+
+        Returns:
+            int: Largest quantity of the product the cart can hold
+        """
+        product = self._product(product_id)
+        free_stock = product.qty - self._book.held_by_others(self._id, product_id)
+        return self._rules.sellable_quantity(product, max(free_stock, 0))
+
+    def add(self, product_id, qty):
+        """
+        Adds items to the cart and reserves their stock.
+
+        Adding a product that is already in the cart adds to its quantity,
+        and the offer is worked out on the combined quantity.
+
+        Parameters:
+            product_id (int): The product
+            qty (int): Items to add
+
+        Returns:
+            LineQuote: The product's line as it now stands
+
+        Raises:
+            ValueError: If qty is not positive
+            StockConflictError: If the product is unknown or there is not enough stock
+        """
+        if qty <= 0:
+            raise ValueError("Quantity must be positive")
+        return self._set_line(product_id, self.lines.get(product_id, 0) + qty)
+
+    def remove(self, product_id):
+        """
+        Takes a product out of the cart and releases its stock.
+
+        Parameters:
+            product_id (int): The product
+        """
+        if self.lines.pop(product_id, None) is not None:
+            self._book.hold(self._id, product_id, 0, 0, self._timeout)
+
+    def _set_line(self, product_id, qty):
+        """
+        Sets a product's quantity in the cart and reserves the stock for it.
+
+        Parameters:
+            product_id (int): The product
+            qty (int): Items bought
+
+        Returns:
+            LineQuote: The priced line
+
+        Raises:
+            StockConflictError: If the quantity cannot be sold
+        """
+        product = self._product(product_id)
+        line = self._rules.price_line(product, qty)
+        limit = self.sellable(product_id)
+        if qty > limit or not self._book.hold(self._id, product_id, qty + line.free_qty, product.qty, self._timeout):
+            raise StockConflictError("Only " + str(limit) + " of " + product.name + " can be sold (" +
+                                     line.label + ")")
+        self.lines[product_id] = qty
+        return line
+
+    def quote(self):
+        """
+        Prices the whole cart in one call.
+
+        Returns:
+            CartQuote: The priced cart
+
+        Raises:
+            StockConflictError: If a product in the cart is no longer in the inventory
+        """
+        data = self._store.get_data()
+        items = []
+        for product_id, qty in self.lines.items():
+            if product_id not in data:
+                raise StockConflictError("Product ID " + str(product_id) + " is no longer in the inventory")
+            items.append((data[product_id], qty))
+        return self._rules.price_cart(items)
+
+    def checkout(self, write_invoice=True):
+        """
+        Saves the cart: one inventory write, then the ledger and the invoice.
+
+        If the cart's reservations expired, they are taken again first; this
+        fails if the stock went to other customers in the meantime. Nothing
+        is recorded or invoiced unless the inventory write succeeds; if it
+        fails, the cart stays open with its reservations and can be checked
+        out again.
+
+        Parameters:
+            write_invoice (bool): Queue the customer's invoice
+
+        Returns:
+            CartQuote: The priced cart that was saved, or None if it was empty
+
+        Raises:
+            StockConflictError: If the stock is no longer there; the cart stays open
+            LockTimeoutError: If the inventory stayed locked by another terminal
+            SaveError: If the inventory could not be written; the cart stays open
+        """
+        if not self.lines:
+            self.abandon()
+            return None
+        if not self._book.is_held(self._id):
+            for product_id, qty in list(self.lines.items()):
+                self._set_line(product_id, qty)
+
+        quote = self.quote()
+        self._store.begin()
+        try:
+            for line in quote.lines:
+                self._store.adjust_stock(line.product_id, -(line.qty + line.free_qty))
+        except Exception:
+            self._store.rollback()
+            raise
+        self._store.commit()
+
+        self.checked_out = True
+        self._book.release(self._id)
+        rows = quote.invoice_rows()
+        record_lines('sell', {self.customer_name: rows})
+        if write_invoice:
+            invoice_writer.submit('sell', self.customer_name, rows)
+        return quote
+
+    def abandon(self):
+        """
+        Empties the cart and releases its reservations.
+        """
+        self.lines = {}
+        self._book.release(self._id)
+
+# Reservations shared by every cart in this program
+reservations = Reservations()
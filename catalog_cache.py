@@ -0,0 +1,116 @@
+"""
+WeCare Inventory Management System - Catalog Cache Module
+
+This module keeps an already-parsed copy of the products.txt snapshot in
+products.cache, so loading the inventory does not have to split and
+convert every text row again.
+
+The cache holds the snapshot's products as columns (IDs, names, brands,
+quantities, costs, origins) serialised with marshal, which reads lists of
+numbers and strings back at C speed. It is written whenever the snapshot is
+saved, and also after the snapshot had to be parsed from text, so the next
+load can use it.
+
+The cache records the size, modification time and inode of the
+products.txt it was made from; products.txt itself is never read to check
+it. A CRC covers only the cache's own payload, to catch a damaged cache
+file. If products.txt has a different size, modification time or inode,
+for example because it was edited by hand, or the cache is damaged or from
+another version, the cache is ignored and the text is parsed as before. The transaction log is always
+read from its text file and applied on top.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import marshal
+import os
+import tempfile
+import zlib
+
+from product import products_from_columns
+
+CACHE_FILE = 'products.cache'
+
+# First bytes of a cache file; the digit changes whenever the layout does
+MAGIC = b'WCCACHE1'
+
+def file_key(stat):
+    """
+    Returns what identifies one version of the data file.
+
+    Parameters:
+        stat (os.stat_result): The data file's status
+
+    Returns:
+        tuple: (size, mtime_ns, inode)
+    """
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+def load_cache(key, path=CACHE_FILE):
+    """
+    Reads the cached snapshot if it was made from the given data file.
+
+    Parameters:
+        key (tuple): file_key() of the data file as it is now
+        path (str): Cache file
+
+    Returns:
+        dict: Product ID -> Product in snapshot order, or None if there is no
+              usable cache
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    header = len(MAGIC) + 4
+    if content[:len(MAGIC)] != MAGIC or len(content) < header:
+        return None
+    if zlib.crc32(content[header:]) != int.from_bytes(content[len(MAGIC):header], 'little'):
+        return None
+    try:
+        cached_key, ids, names, brands, qtys, costs, origins = marshal.loads(content[header:])
+        if tuple(cached_key) != key:
+            return None
+        return products_from_columns(ids, names, brands, qtys, costs, origins)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+def write_cache(data, key, path=CACHE_FILE):
+    """
+    Writes the parsed snapshot to the cache.
+
+    The cache is replaced in one rename. It is only a copy, so it is not
+    synced to disk and a failure to write it is ignored: the next load
+    parses the text instead.
+
+    Parameters:
+        data (dict): Product ID -> Product, exactly as products.txt holds them
+        key (tuple): file_key() of the products.txt they were read from or written to
+    """
+    products = data.values()
+    payload = marshal.dumps((key,
+                             [product.product_id for product in products],
+                             [product.name for product in products],
+                             [product.brand for product in products],
+                             [product.qty for product in products],
+                             [product.cost for product in products],
+                             [product.origin for product in products]))
+    # Imported here because write imports this module
+    from write import match_mode
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + zlib.crc32(payload).to_bytes(4, 'little') + payload)
+        match_mode(temp_path, path)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,144 @@
+"""
+WeCare Inventory Management System - Codec Module
+
+This module reads and writes the rows of the inventory data file and the
+product records of the transaction log:
+    ID,Product Name,Brand,Quantity,Price,Country
+
+Rows are CSV as the csv module writes it: a text field that holds a comma
+or a double quote is written in double quotes, with its quotes doubled,
+so "Cleanser, Gentle" stays one field instead of shifting every column
+after it.
+
+Almost every row needs no quoting, so both directions take a fast path
+first. A row is split with str.split() unless it holds a double quote, and
+only then handed to the csv module; a product is formatted by plain
+concatenation, and only written with the csv module when that would not
+give back exactly six fields. Whole files are decoded by decode_rows() in
+one loop into columns of converted fields, which is quicker than parsing
+them line by line.
+
+Every row is kept to one line, which the transaction log, the streaming
+listings and the parallel parser all rely on: a line break in a text
+field is written as a space.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import csv
+import io
+
+# Fields in a data file row
+ROW_FIELDS = 6
+
+def split_row(line):
+    """
+    Splits one data file row into its fields.
+
+    Parameters:
+        line (str): The row, with or without its newline
+
+    Returns:
+        list: The fields as strings, unquoted; the caller checks their number
+
+    Raises:
+        ValueError: If the row's quoting is malformed, e.g. an unclosed quote
+    """
+    line = line.strip()
+    if '"' not in line:
+        return line.split(',')
+    try:
+        return next(csv.reader((line,), strict=True))
+    except csv.Error as e:
+        raise ValueError("malformed quoting: " + str(e))
+
+def decode_rows(lines):
+    """
+    Decodes many data file rows into columns of converted fields.
+
+    The fields are checked and converted as Product.from_fields() does; rows
+    it would refuse are returned in invalid instead, for the caller to
+    report. Blank lines are skipped.
+
+    Parameters:
+        lines (iterable): Rows, with or without their newlines, e.g. an open data file
+
+    Returns:
+        tuple: (number of lines, ids, names, brands, qtys, costs, origins,
+                invalid) where invalid holds (line number, counting from 1,
+                line) for each row that could not be used
+    """
+    ids, names, brands, qtys, costs, origins, invalid = [], [], [], [], [], [], []
+    count = 0
+    for count, line in enumerate(lines, start=1):
+        try:
+            if '"' in line:
+                fields = split_row(line)
+            else:
+                fields = line.split(',')
+            if len(fields) != ROW_FIELDS:
+                raise ValueError("expected 6 fields")
+            product_id = int(fields[0])
+            qty = int(fields[3])
+            cost = float(fields[4])
+        except ValueError:
+            if line.strip():
+                invalid.append((count, line))
+            continue
+        ids.append(product_id)
+        names.append(fields[1].strip())
+        brands.append(fields[2].strip())
+        qtys.append(qty)
+        costs.append(cost)
+        origins.append(fields[5].strip())
+    return count, ids, names, brands, qtys, costs, origins, invalid
+
+def format_row(product):
+    """
+    Formats a product as a data file row, quoting text fields where needed.
+
+    Parameters:
+        product (Product): The product to format
+
+    Returns:
+        str: ID,Product Name,Brand,Quantity,Price,Country without the newline
+    """
+    row = (str(product.product_id) + ',' + product.name + ',' + product.brand + ',' +
+           str(product.qty) + ',' + str(product.cost) + ',' + product.origin)
+    if row.count(',') == ROW_FIELDS - 1 and '"' not in row and '\n' not in row and '\r' not in row:
+        return row
+    return _quoted_row(product)
+
+def _quoted_row(product):
+    """
+    Formats a product whose text fields need quoting, with the csv module.
+
+    Parameters:
+        product (Product): The product to format
+
+    Returns:
+        str: The row without the newline
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='').writerow([
+        product.product_id,
+        _one_line(product.name),
+        _one_line(product.brand),
+        product.qty,
+        product.cost,
+        _one_line(product.origin),
+    ])
+    return buffer.getvalue()
+
+def _one_line(text):
+    """
+    Replaces line breaks in a text field with spaces.
+
+    Parameters:
+        text (str): Field value
+
+    Returns:
+        str: The value on one line
+    """
+    return text.replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ')
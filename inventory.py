@@ -0,0 +1,481 @@
+"""
+WeCare Inventory Management System - Inventory Store Module
+
+This module keeps the parsed inventory in memory so the menu screens do not
+re-read and re-parse the data file every time they need it. The store checks
+whether the underlying storage has changed before handing out data, and only
+reads it again when another program has changed it.
+
+Storage is pluggable. The default backend is the products.txt flat file with
+its transaction log; setting the WECARE_BACKEND environment variable to
+"sqlite" stores the inventory in products.db instead (see sqlite_backend.py),
+and "binary" in the memory-mapped products.bin (see binary_store.py).
+
+Changes can be grouped into a transaction with begin() and commit(), so that
+all the line items of one sale are saved together in a single write.
+Transactions nest, and batch() wraps them in a with-block, so a burst of
+sales can be coalesced into one durable write.
+
+Several terminals can share one inventory. Stock changes are recorded as
+deltas (sell 3, restock 10) rather than absolute values, and every commit
+happens under the inventory lock. If another terminal saved since this one
+loaded its data, the commit re-reads the inventory and re-applies its deltas
+on top; if that would oversell a product, StockConflictError is raised and
+nothing is saved.
+
+The store also maintains the search indexes from search.py, updating them
+as products are added, changed and sold out.
+
+All of operation.py goes through the shared `inventory` store defined here.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+from contextlib import contextmanager
+
+import metrics
+from locking import inventory_lock
+from read import DATA_FILE, LOG_FILE, iter_products, read_from_file
+from search import ProductIndex
+from write import append_to_log, write_atomically
+
+# Sequence number of the last change saved to the flat file
+VERSION_FILE = 'products.seq'
+
+class StockConflictError(Exception):
+    """
+    Raised when a change cannot be applied to the current inventory,
+    for example because another terminal sold the remaining stock.
+    """
+
+class SaveError(OSError):
+    """
+    Raised when changes to the inventory could not be written to storage;
+    none of them were kept.
+    """
+
+class FileBackend:
+    """
+    Inventory backend for the products.txt snapshot and products.log transaction log.
+    """
+
+    def signature(self):
+        """
+        Returns the modification time and size of the data file and the log.
+
+        Returns:
+            tuple: One (mtime_ns, size) pair per file, None for a missing file
+        """
+        signature = []
+        for path in (DATA_FILE, LOG_FILE):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def version(self):
+        """
+        Returns the sequence number of the last saved change.
+
+        Returns:
+            int: Current version of the inventory, 0 if nothing was saved yet
+        """
+        try:
+            with open(VERSION_FILE, 'r') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            # A damaged counter only costs a spurious conflict and a re-read
+            return -1
+
+    def load(self):
+        """
+        Reads the snapshot and replays the log.
+
+        Returns:
+            dict: Dictionary mapping product ID to Product
+        """
+        return read_from_file()
+
+    def iter_products(self):
+        """
+        Yields the products one at a time without building the full dictionary.
+
+        Yields:
+            Product: The next product in the inventory
+        """
+        return iter_products()
+
+    def save_changes(self, data, product_ids):
+        """
+        Appends one log record per changed product and bumps the version.
+
+        The version is only bumped once the log records are written. A crash
+        in between leaves the version behind the log, but the log's new size
+        and mtime still show other terminals that the inventory changed.
+
+        Parameters:
+            data (dict): Dictionary mapping product ID to Product, already updated in memory
+            product_ids (list): IDs of the products that were changed
+
+        Returns:
+            bool: True if the changes were written, False otherwise
+        """
+        version = self.version()
+        if not append_to_log(data, product_ids):
+            return False
+        try:
+            write_atomically(VERSION_FILE, [str(max(version, 0) + 1) + '\n'])
+        except IOError as e:
+            # The changes are in the log; the signature still marks them as new
+            print("⚠️ Error updating inventory version: " + str(e))
+        return True
+
+def get_backend(name=None):
+    """
+    Creates the storage backend selected by name or by WECARE_BACKEND.
+
+    Parameters:
+        name (str): "file", "sqlite" or "binary"; defaults to the WECARE_BACKEND variable
+
+    Returns:
+        FileBackend, SQLiteBackend or BinaryBackend: The backend instance
+    """
+    if name is None:
+        name = os.environ.get('WECARE_BACKEND', 'file')
+    if name == 'sqlite':
+        from sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    if name == 'binary':
+        from binary_store import BinaryBackend
+        return BinaryBackend()
+    if name != 'file':
+        print("⚠️ Unknown storage backend '" + name + "'. Using the products.txt file.")
+    return FileBackend()
+
+def apply_change(data, change):
+    """
+    Applies one recorded change to inventory data.
+
+    Parameters:
+        data (dict): Dictionary mapping product ID to Product, updated in place
+        change (tuple): One of
+            ('adjust', product_id, delta)        add delta (negative for a sale) to the quantity
+            ('restock', product_id, qty, cost)   add qty to the quantity and set a new cost
+            ('add', product)                     add a new product
+            ('put', product_id, product)         store product as given (None removes it)
+
+    Returns:
+        int: ID of the product that was changed
+
+    Raises:
+        StockConflictError: If the change does not fit the current data
+    """
+    kind = change[0]
+    if kind == 'add':
+        product = change[1]
+        if product.product_id in data:
+            raise StockConflictError("Product ID " + str(product.product_id) + " already exists")
+        # Store a copy so replaying the change later starts from the same values
+        data[product.product_id] = product.copy()
+        return product.product_id
+
+    product_id = change[1]
+    if kind == 'put':
+        if change[2] is None:
+            data.pop(product_id, None)
+        else:
+            data[product_id] = change[2].copy()
+        return product_id
+
+    product = data.get(product_id)
+    if product is None:
+        raise StockConflictError("Product ID " + str(product_id) + " is no longer in stock")
+    if kind == 'adjust':
+        if product.qty + change[2] < 0:
+            raise StockConflictError(
+                "Only " + str(product.qty) + " units of " + product.name + " are left in stock")
+        product.qty += change[2]
+    elif kind == 'restock':
+        product.qty += change[2]
+        product.cost = change[3]
+    else:
+        raise ValueError("Unknown change type: " + str(kind))
+    return product_id
+
+class InventoryStore:
+    """
+    In-memory copy of the inventory, refreshed only when the storage changes.
+
+    Attributes:
+        backend: Storage backend providing load(), save_changes(), signature() and version()
+        _data (dict): Cached inventory data with ID as key, or None before the first load
+        _signature: Backend signature when the data was last read or written
+        _version (int): Backend version the cached data corresponds to
+        _pending (list): Changes made in the open transaction, or None outside a transaction
+        _depth (int): Number of begin() calls not yet matched by commit()
+        _index (ProductIndex): Search indexes, or None until the first search
+        _indexed (dict): The cached data _index was built from
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else get_backend()
+        self._data = None
+        self._signature = None
+        self._version = None
+        self._pending = None
+        self._depth = 0
+        self._index = None
+        self._indexed = None
+
+    @metrics.timed('inventory.load')
+    def _load(self):
+        """
+        Reads the inventory from the backend under a shared lock.
+        """
+        with inventory_lock(shared=True):
+            self._version = self.backend.version()
+            self._signature = self.backend.signature()
+            self._data = self.backend.load()
+        if metrics.enabled:
+            metrics.add('inventory.load', rows=len(self._data))
+
+    def get_data(self):
+        """
+        Returns the inventory data, reading the storage only if it changed.
+
+        The returned dictionary is the store's own copy and should be treated
+        as read-only; changes go through adjust_stock(), restock(),
+        add_product() or record_changes(). While a transaction is open the
+        cached data is returned as it is, so that uncommitted changes are not
+        thrown away by a reload.
+
+        Returns:
+            dict: Dictionary containing inventory data with ID as key
+        """
+        if self._data is not None and self._pending is not None:
+            return self._data
+        if self._data is None or self.backend.signature() != self._signature:
+            self._load()
+        return self._data
+
+    def adjust_stock(self, product_id, delta):
+        """
+        Adds delta to a product's quantity; a sale passes a negative delta.
+
+        Parameters:
+            product_id (int): Product to change
+            delta (int): Number of units to add (or remove, if negative)
+
+        Raises:
+            StockConflictError: If the product is gone or the result would be negative
+        """
+        self._change(('adjust', product_id, delta))
+
+    def restock(self, product_id, qty, cost):
+        """
+        Adds units to an existing product and sets its new cost.
+
+        Parameters:
+            product_id (int): Product to restock
+            qty (int): Number of units received
+            cost (float): New cost per item
+
+        Raises:
+            StockConflictError: If the product is no longer in the inventory
+        """
+        self._change(('restock', product_id, qty, cost))
+
+    def add_product(self, product):
+        """
+        Adds a new product to the inventory.
+
+        Parameters:
+            product (Product): The product to add
+
+        Raises:
+            StockConflictError: If a product with the same ID already exists
+        """
+        self._change(('add', product))
+
+    def record_changes(self, product_ids):
+        """
+        Persists the cached values of the given products as they are.
+
+        Unlike the other change methods these are absolute values, so if
+        another terminal changed the same products the last save wins.
+
+        Parameters:
+            product_ids (list): IDs of the products that were changed
+        """
+        data = self.get_cached()
+        self.begin()
+        try:
+            for key in product_ids:
+                product = data.get(key)
+                self._pending.append(('put', key, product.copy() if product is not None else None))
+                self._reindex(key)
+        finally:
+            self.commit()
+
+    def _change(self, change):
+        """
+        Applies a change to the cached data and saves it, or keeps it for commit().
+
+        Parameters:
+            change (tuple): Change in the form accepted by apply_change()
+        """
+        self.begin()
+        try:
+            product_id = apply_change(self._data, change)
+            self._pending.append(change)
+            self._reindex(product_id)
+        finally:
+            self.commit()
+
+    def search_index(self):
+        """
+        Returns the search indexes over the current inventory.
+
+        The indexes are built on first use and then updated product by
+        product as changes are made and sold-out products are removed. When
+        the inventory was read again since, only the products that differ
+        from the previous load are re-indexed, unless so many differ that
+        building new indexes is quicker.
+
+        Returns:
+            ProductIndex: Indexes for name, brand and origin lookups
+        """
+        data = self.get_data()
+        if self._index is None or (self._indexed is not data and not self._index.sync(self._indexed, data)):
+            self._index = ProductIndex(data.values())
+        self._indexed = data
+        return self._index
+
+    def _reindex(self, product_id):
+        """
+        Brings one product's search entries up to date, if the indexes exist.
+
+        Parameters:
+            product_id (int): The product that was changed, added or removed
+        """
+        if self._index is None or self._indexed is not self._data:
+            return
+        product = self._data.get(product_id)
+        if product is None:
+            self._index.remove(product_id)
+        else:
+            self._index.update(product)
+
+    def begin(self):
+        """
+        Starts a transaction; changes are saved together by commit().
+
+        A begin() inside an open transaction joins it, and only the outermost
+        commit() writes anything.
+        """
+        if self._depth == 0:
+            self.get_data()
+            self._pending = []
+        self._depth += 1
+
+    @metrics.timed('inventory.commit')
+    def commit(self):
+        """
+        Saves every change made since the outermost begin() in a single write.
+
+        The write happens under the exclusive inventory lock. If another
+        terminal saved in the meantime, the current inventory is read again
+        and the changes are re-applied to it before saving.
+
+        Raises:
+            StockConflictError: If the changes no longer fit the inventory;
+                                nothing is saved and the cache is reloaded
+            LockTimeoutError: If the inventory stayed locked by another terminal
+            SaveError: If the storage could not be written; nothing is saved
+                       and the cache is reloaded
+        """
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        pending = self._pending
+        self._pending = None
+        if not pending:
+            return
+
+        try:
+            with inventory_lock():
+                version = self.backend.version()
+                if version != self._version or self.backend.signature() != self._signature:
+                    # Another terminal saved since we loaded: rebase our changes on its data
+                    data = self.backend.load()
+                    product_ids = [apply_change(data, change) for change in pending]
+                    self._data = data
+                else:
+                    product_ids = [change[1].product_id if change[0] == 'add' else change[1]
+                                   for change in pending]
+                product_ids = list(dict.fromkeys(product_ids))
+                saved = self.backend.save_changes(self._data, product_ids)
+                self._version = self.backend.version()
+                self._signature = self.backend.signature()
+        except Exception:
+            self.invalidate()
+            raise
+        if not saved:
+            self.invalidate()
+            raise SaveError("The inventory could not be saved; the changes were not kept")
+        # Saving drops sold-out products from the data; drop them from the indexes too
+        for product_id in product_ids:
+            if product_id not in self._data:
+                self._reindex(product_id)
+
+    def rollback(self):
+        """
+        Discards the changes made since begin() by reloading from storage.
+        """
+        self._pending = None
+        self._depth = 0
+        self.invalidate()
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups every change made inside a with-block into one durable write.
+
+        The changes are committed when the block ends, even if it ends with
+        an exception, because the cached data has already been updated.
+        """
+        self.begin()
+        try:
+            yield self.get_cached()
+        finally:
+            self.commit()
+
+    def get_cached(self):
+        """
+        Returns the cached data without checking the storage, loading it if needed.
+
+        Returns:
+            dict: Dictionary containing inventory data with ID as key
+        """
+        if self._data is None:
+            return self.get_data()
+        return self._data
+
+    def invalidate(self):
+        """
+        Drops the cached data so the next get_data() reads the storage again.
+        """
+        self._data = None
+        self._signature = None
+        self._version = None
+
+# Shared store used by the menu operations
+inventory = InventoryStore()
@@ -0,0 +1,352 @@
+"""
+WeCare Inventory Management System - Invoice Template Module
+
+This module renders purchase and sales invoices from templates that are
+prepared once, when the module is loaded. Each layout is split into a
+header, a block repeated for every line item, the separator placed between
+items and a footer, so an invoice is assembled with a single join however
+many items it has, instead of growing one string item by item.
+
+write_invoices() renders and writes a whole batch of invoices in one call,
+for example one per customer of a batch sales run. Invoice numbers come
+from the persistent counter in numbering.py, and the files are filed in the
+date-sharded archive of archive.py.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+from string import Formatter
+
+import metrics
+from archive import invoice_archive
+from numbering import next_invoice_number, reserve_invoice_numbers
+from pricing import pricing
+
+def prepare_items(template, item_fields):
+    """
+    Prepares the item block of a layout as a function that renders every item.
+
+    The named fields of the str.format template are replaced by positions
+    once, when the layout is loaded, so each item is filled in by a single
+    call of the prepared template's format method with the item's number and
+    row. The function takes the item rows and the separator and returns all
+    item blocks joined together.
+
+    Parameters:
+        template (str): str.format template of one item block; {number} is
+                        the position of the item on the invoice
+        item_fields (tuple): Name of each position in an item row
+
+    Returns:
+        function: render_items(rows, separator) -> str
+    """
+    positions = {'number': '0'}
+    for position, field in enumerate(item_fields, start=1):
+        positions[field] = str(position)
+
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is not None:
+            parts.append('{' + positions[field] + ('!' + conversion if conversion else '') +
+                         (':' + spec if spec else '') + '}')
+    format_item = ''.join(parts).format
+
+    def render_items(rows, separator):
+        return separator.join([format_item(number, *row) for number, row in enumerate(rows, 1)])
+    return render_items
+
+class InvoiceTemplate:
+    """
+    An invoice layout prepared for repeated rendering.
+
+    The header and footer are str.format templates filled with the invoice
+    fields (invoice_number, current_date, current_time, party_name,
+    subtotal, tax_amount, total). The item block is prepared by
+    prepare_items() and filled from one row per line item.
+
+    Attributes:
+        file_prefix (str): Start of the file name of every invoice, e.g. "sell_"
+        separator (str): Text placed between two item blocks
+    """
+
+    def __init__(self, file_prefix, header, item, separator, footer, item_fields):
+        self.file_prefix = file_prefix
+        self.separator = separator
+        self._header = header.format_map
+        self._items = prepare_items(item, item_fields)
+        self._footer = footer.format_map
+
+    def render(self, fields, rows):
+        """
+        Renders a complete invoice.
+
+        Parameters:
+            fields (dict): Values for the header and footer
+            rows (list): One row of item values per line item
+
+        Returns:
+            str: The invoice text
+        """
+        return ''.join((self._header(fields), self._items(rows, self.separator), self._footer(fields)))
+
+PURCHASE_INVOICE = InvoiceTemplate(
+    'purchase_',
+    header="""
+╔═════════════════════════════════════════════════════════════════════════════╗
+║                                                                              ║
+║                           ✦ WⒺ CARE Vendor ✦                               ║
+║                         OFFICIAL PURCHASE INVOICE                            ║
+║                                                                              ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+║                                                                              ║
+║  📄 Invoice #: {invoice_number}                                              ║ 
+║  📅 Date: {current_date}                           🕒 Time: {current_time}     ║ 
+║  🏢 Vendor: {party_name}                                                   ║  
+║                                                                              ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+║                             PRODUCT DETAILS                                  ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+""",
+    item="""║                                                                              ║
+║  Item {number}                                                                     ║
+║  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━  ║
+║  Product ID: #{product_id}                                                  ║  
+║  Product Name: {name}                                                ║ 
+║                                                                              ║
+║  Quantity: {qty} units    ×    Unit Cost: ${cost:.2f}           
+║                                                Subtotal: ${subtotal:.2f}     
+║                                                                              ║
+""",
+    item_fields=('product_id', 'name', 'qty', 'cost', 'subtotal'),
+    separator="╠══════════════════════════════════════════════════════════════════════════════╣\n",
+    footer="""╠══════════════════════════════════════════════════════════════════════════════╣
+║                                                                              ║
+║  💰 Items Worth:                                         ${subtotal:.2f}    
+║  💰 Tax Amount:                                          ${tax_amount:.2f}    
+║  💰 TOTAL COST:                                          ${total:.2f}    
+║                                                                              ║
+╠══════════════════════════════════════════════════════════════════════════════╣
+║                                                                              ║
+║  Payment Terms: Due on receipt                                               ║
+║  For questions regarding this invoice, please contact:                       ║
+║  📧 accounting@wecare.com | 📞 (555) 123-4567                               ║
+║                                                                              ║
+║                     THANK YOU FOR YOUR BUSINESS!                             ║
+║                                                                              ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+""")
+
+SALES_INVOICE = InvoiceTemplate(
+    'sell_',
+    header="""
+╔═════════════════════════════════════════════════════════════════════════════╗
+║                                                                             ║
+║                           ✦ WⒺ CARE  vendor✦                               ║
+║                          OFFICIAL SALES INVOICE                             ║
+║                                                                             ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+║                                                                             ║
+║  📄 Invoice #: {invoice_number}                                                ║ 
+║  📅 Date: {current_date}                           🕒 Time: {current_time}             ║  
+║  👤 Customer: {party_name}                                                  
+║                                                                             ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+║                             PRODUCT DETAILS                                 ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+""",
+    item="""║                                                                             ║
+║  Item {number}                                                                     ║
+║  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━║
+║  Product ID: #{product_id}                                                                     
+║  Product Name: {name}                                         
+║  Brand Name: {brand}                                         
+║                                                                              
+║  Quantity: {qty} units    ×    Unit Cost: ${unit_cost:.2f}      
+║                                                Subtotal: ${subtotal:.2f}     
+║  🎁 Free Products: {free_qty} units ({promotion})             
+║                                                                              
+""",
+    item_fields=('product_id', 'name', 'qty', 'free_qty', 'subtotal', 'unit_cost', 'brand', 'tax', 'promotion'),
+    separator="╠═════════════════════════════════════════════════════════════════════════════╣\n",
+    footer="""╠═════════════════════════════════════════════════════════════════════════════╣
+║                                                                             ║
+║  💰 TOTAL COST:                                          ${subtotal:.2f} 
+║  💰 Tax Amount:                                          ${tax_amount:.2f} 
+║  💰 TOTAL Amount:                                          ${total:.2f} 
+║                                                                             ║
+╠═════════════════════════════════════════════════════════════════════════════╣
+║                                                                             ║
+║  Payment Terms: Due on receipt                                              ║
+║  For questions regarding this invoice, please contact:                      ║
+║  📧 support@wecare.com | 📞 (555) 987-6543                                 ║
+║                                                                             ║
+║                THANK YOU FOR CHOOSING WE CARE MEDICAL!                      ║
+║                                                                             ║
+╚═════════════════════════════════════════════════════════════════════════════╝
+""")
+
+def invoice_timestamp(now=None):
+    """
+    Formats the date and time shown on an invoice.
+
+    Parameters:
+        now (datetime): Time of the invoice; defaults to the current time
+
+    Returns:
+        tuple: (current_date, current_time) as zero-padded strings
+    """
+    if now is None:
+        now = datetime.now()
+    return now.strftime('%Y-%m-%d'), now.strftime('%H:%M:%S')
+
+def purchase_fields(items_list):
+    """
+    Prepares the line items of a purchase invoice and its totals.
+
+    Purchases are taxed at the default rate of the pricing rules.
+
+    Parameters:
+        items_list (list): Dictionaries with 'id', 'name', 'qty' and 'cost'
+
+    Returns:
+        tuple: (list of item rows for the template, dict of totals)
+    """
+    rows = []
+    buy_price = 0
+    for item in items_list:
+        cost = float(item['cost'])
+        subtotal = int(item['qty']) * cost
+        buy_price += subtotal
+        rows.append((item['id'], item['name'], item['qty'], cost, subtotal))
+    return rows, _totals(buy_price, buy_price * pricing.tax_rate)
+
+def sales_fields(items_for_invoice):
+    """
+    Prepares the line items of a sales invoice and its totals.
+
+    The items are already in the row layout of the sales template, as made
+    by pricing.LineQuote.invoice_row(), with the tax of each line worked out.
+
+    Parameters:
+        items_for_invoice (list): Lists of [product_id, product_name, quantity,
+                                  free_product, total_cost, unit_cost, brand,
+                                  tax, promotion]
+
+    Returns:
+        tuple: (list of item rows for the template, dict of totals)
+    """
+    return items_for_invoice, _totals(sum([item[4] for item in items_for_invoice]),
+                                      sum([item[7] for item in items_for_invoice]))
+
+def _totals(subtotal, tax_amount):
+    """
+    Adds tax to an invoice subtotal.
+
+    Parameters:
+        subtotal (float): Sum of the line items
+        tax_amount (float): Tax on the line items
+
+    Returns:
+        dict: subtotal, tax_amount and total
+    """
+    return {'subtotal': subtotal, 'tax_amount': tax_amount, 'total': subtotal + tax_amount}
+
+# Template and field builder for each kind of invoice
+INVOICE_KINDS = {
+    'purchase': (PURCHASE_INVOICE, purchase_fields),
+    'sell': (SALES_INVOICE, sales_fields),
+}
+
+def render_invoice(kind, party_name, items, invoice_number=None, now=None):
+    """
+    Renders one invoice without writing it.
+
+    Parameters:
+        kind (str): "purchase" or "sell"
+        party_name (str): Vendor or customer name
+        items (list): Line items in the form taken by purchase_fields() or sales_fields()
+        invoice_number (str): Invoice number to use; defaults to the next one
+                              from the invoice counter
+        now (datetime): Time of the invoice; defaults to the current time
+
+    Returns:
+        tuple: (invoice number, invoice text, invoice total including tax)
+    """
+    template, build_fields = INVOICE_KINDS[kind]
+    if now is None:
+        now = datetime.now()
+    current_date, current_time = invoice_timestamp(now)
+    if invoice_number is None:
+        invoice_number = next_invoice_number(now)
+    item_fields, fields = build_fields(items)
+    fields['invoice_number'] = invoice_number
+    fields['current_date'] = current_date
+    fields['current_time'] = current_time
+    fields['party_name'] = party_name
+    return invoice_number, template.render(fields, item_fields), fields['total']
+
+def write_invoices(kind, invoices, now=None, report=print):
+    """
+    Renders and writes a batch of invoices in one call.
+
+    Invoices without a number get one from a block reserved from the invoice
+    counter in a single step. Each invoice is written into the archive
+    directory for its day, and the whole batch is added to the archive index
+    in one transaction. An existing invoice file is never overwritten; if
+    the name is taken, the invoice is written under the next free number.
+
+    Parameters:
+        kind (str): "purchase" or "sell"
+        invoices (iterable): (party name, items, invoice number) tuples;
+                             an invoice number of None takes the next one
+                             from the invoice counter
+        now (datetime): Time of the invoices; defaults to the current time
+        report (function): Called with each warning or error message
+
+    Returns:
+        list: Paths of the invoices written
+    """
+    started = time.perf_counter()
+    template = INVOICE_KINDS[kind][0]
+    if now is None:
+        now = datetime.now()
+    invoices = list(invoices)
+    rows = 0
+    size = 0
+    numbers = iter(reserve_invoice_numbers(sum([1 for invoice in invoices if invoice[2] is None]), now))
+    written = []
+    entries = []
+    for party_name, items, invoice_number in invoices:
+        if invoice_number is None:
+            invoice_number = next(numbers)
+        while True:
+            invoice_number, content, total = render_invoice(kind, party_name, items, invoice_number, now)
+            file_name = template.file_prefix + invoice_number + '.txt'
+            try:
+                file_name = invoice_archive.path_for(file_name, now)
+                with open(file_name, 'x', encoding='utf-8') as f:
+                    f.write(content)
+                written.append(file_name)
+                rows += len(items)
+                size += len(content)
+                entries.append((kind, invoice_number, party_name, now, total, file_name))
+            except FileExistsError:
+                report("⚠️ " + file_name + " already exists, using the next invoice number")
+                invoice_number = next_invoice_number(now)
+                continue
+            except IOError as e:
+                report("❌ Error generating invoice " + file_name + ": " + str(e))
+            break
+    try:
+        invoice_archive.record(entries)
+    except sqlite3.Error as e:
+        report("❌ Error indexing invoices: " + str(e))
+    if metrics.enabled:
+        metrics.observe('write_invoices.' + kind, time.perf_counter() - started, len(written) < len(invoices))
+        metrics.add('write_invoices.' + kind, rows=rows, bytes_written=size)
+    return written
@@ -0,0 +1,136 @@
+"""
+WeCare Inventory Management System - Background Invoice Module
+
+This module renders and writes invoices on a background thread, so the
+cashier can start serving the next customer as soon as a sale is saved
+instead of waiting for the invoice file to reach the disk.
+
+Invoices wait in a bounded queue. When the queue is full, queuing another
+invoice blocks until the writer has caught up, so a slow disk holds up the
+till rather than letting unwritten invoices pile up in memory. Problems the
+writer runs into are kept until the next menu is shown, where they are
+reported by report_invoices(). drain() waits for every queued invoice to
+be written and is called when the program exits.
+
+All of operation.py queues through the shared `invoice_writer` defined here.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+from invoice import write_invoices
+
+# Invoices that may be waiting to be written before queuing blocks
+QUEUE_SIZE = 64
+
+class BackgroundInvoiceWriter:
+    """
+    Writes queued invoices on a single worker thread.
+
+    One worker is enough: each invoice is one small file, and a single
+    writer keeps the invoice numbers in the order the sales were made.
+    The thread is started with the first invoice.
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # Filled by the worker and emptied by the menu; deque appends and pops are thread-safe
+        self._failures = deque()
+        self._written = deque()
+
+    def submit(self, kind, party_name, items):
+        """
+        Queues an invoice to be written in the background.
+
+        The invoice gets its date and time now, when the sale was made,
+        even if it is written a little later.
+
+        Parameters:
+            kind (str): "purchase" or "sell"
+            party_name (str): Vendor or customer name
+            items (list): Line items in the form taken by invoice.write_invoices()
+        """
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='invoice-writer', daemon=True)
+                self._thread.start()
+        self._queue.put((kind, party_name, items, datetime.now()))
+
+    def _run(self):
+        """
+        Worker loop: writes queued invoices one at a time, forever.
+        """
+        while True:
+            kind, party_name, items, now = self._queue.get()
+            try:
+                self._written.extend(write_invoices(kind, [(party_name, items, None)], now,
+                                                    report=self._failures.append))
+            except Exception as e:
+                self._failures.append("❌ Invoice for " + str(party_name) + " was not written: " + str(e))
+            finally:
+                self._queue.task_done()
+
+    def drain(self):
+        """
+        Waits until every queued invoice has been written.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def take_failures(self):
+        """
+        Returns the problems reported since the last call and forgets them.
+
+        Returns:
+            list: Warning and error messages from the worker
+        """
+        return _take_all(self._failures)
+
+    def take_written(self):
+        """
+        Returns the invoice files written since the last call and forgets them.
+
+        Returns:
+            list: File names of the invoices written
+        """
+        return _take_all(self._written)
+
+def _take_all(messages):
+    """
+    Empties a deque that another thread may still be appending to.
+
+    Parameters:
+        messages (deque): The deque to empty
+
+    Returns:
+        list: The items removed, oldest first
+    """
+    taken = []
+    while messages:
+        taken.append(messages.popleft())
+    return taken
+
+def report_invoices():
+    """
+    Prints the invoices written in the background since the last report,
+    and any problems the writer ran into.
+
+    Returns:
+        bool: True if any invoice failed
+    """
+    for file_name in invoice_writer.take_written():
+        print("✅ Invoice generated Successfully: " + file_name)
+    failures = invoice_writer.take_failures()
+    for message in failures:
+        print(message)
+    return bool(failures)
+
+# The single invoice writer shared by all screens
+invoice_writer = BackgroundInvoiceWriter()
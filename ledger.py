@@ -0,0 +1,259 @@
+"""
+WeCare Inventory Management System - Sales Ledger Module
+
+This module keeps a structured record of every line sold or bought, next
+to the human-readable invoices, so sales can be analysed without parsing
+invoice text.
+
+The ledger is an append-only file of fixed-size little-endian records, one
+per invoice line:
+    timestamp   float64  seconds since 1970-01-01 in local time
+    kind        uint8    0 = sale, 1 = purchase
+    product_id  int64
+    qty         int32
+    free_qty    int32    items given away by multi-buy offers
+    unit_cost   float64
+    total       float64  price of the line after discount, before tax
+    tax         float64
+    party       int32    line number of the customer or vendor in ledger_parties.txt
+
+Because every record has the same layout, the whole file can be loaded as
+columns in one read (see read_columns()), which is what reports.py works on.
+Customer and vendor names are kept once each in ledger_parties.txt and
+referred to by number.
+
+Appends happen under an exclusive lock on ledger.lock, one write per sale.
+A record cut short by a crash is dropped before the next append.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+import struct
+from datetime import datetime
+
+from locking import file_lock
+from pricing import pricing
+
+try:
+    import numpy as np
+except ImportError:  # reports need NumPy; recording does not
+    np = None
+
+LEDGER_FILE = 'ledger.bin'
+PARTIES_FILE = 'ledger_parties.txt'
+LEDGER_LOCK_FILE = 'ledger.lock'
+
+# Column name, struct code and NumPy type of each field, in file order
+LEDGER_FIELDS = (
+    ('timestamp', 'd', '<f8'),
+    ('kind', 'B', 'u1'),
+    ('product_id', 'q', '<i8'),
+    ('qty', 'i', '<i4'),
+    ('free_qty', 'i', '<i4'),
+    ('unit_cost', 'd', '<f8'),
+    ('total', 'd', '<f8'),
+    ('tax', 'd', '<f8'),
+    ('party', 'i', '<i4'),
+)
+RECORD = struct.Struct('<' + ''.join([code for name, code, dtype in LEDGER_FIELDS]))
+
+KIND_SALE = 0
+KIND_PURCHASE = 1
+KIND_CODES = {'sell': KIND_SALE, 'purchase': KIND_PURCHASE}
+
+# Start of the ledger's clock; timestamps count local time from here so a
+# day is always exactly 86400 seconds
+EPOCH = datetime(1970, 1, 1)
+
+def ledger_dtype():
+    """
+    Returns the NumPy record type matching one ledger record.
+
+    Returns:
+        numpy.dtype: Packed structured type with one field per column
+    """
+    return np.dtype([(name, dtype) for name, code, dtype in LEDGER_FIELDS])
+
+class Ledger:
+    """
+    Append-only ledger of invoice lines with its table of party names.
+
+    Attributes:
+        path (str): Ledger file
+        parties_path (str): File holding one customer or vendor name per line
+    """
+
+    def __init__(self, path=LEDGER_FILE, parties_path=PARTIES_FILE, lock_path=LEDGER_LOCK_FILE):
+        self.path = path
+        self.parties_path = parties_path
+        self.lock_path = lock_path
+        self._party_ids = {}
+        self._parties_size = 0
+
+    def _load_parties(self):
+        """
+        Reads any party names added since the table was last read.
+
+        Must be called with the ledger lock held.
+        """
+        try:
+            with open(self.parties_path, 'rb') as f:
+                f.seek(self._parties_size)
+                added = f.read()
+        except FileNotFoundError:
+            return
+        # A name whose newline never reached the disk is not part of the table
+        added = added[:added.rfind(b'\n') + 1]
+        for name in added.decode('utf-8').split('\n')[:-1]:
+            self._party_ids.setdefault(name, len(self._party_ids))
+        self._parties_size += len(added)
+
+    def _party_id(self, name, new_names):
+        """
+        Returns the number of a party, assigning the next one to a new name.
+
+        Parameters:
+            name (str): Customer or vendor name
+            new_names (list): Collects the names that still have to be appended
+
+        Returns:
+            int: The party number
+        """
+        name = ' '.join(str(name).splitlines())
+        if name not in self._party_ids:
+            self._party_ids[name] = len(self._party_ids)
+            new_names.append(name)
+        return self._party_ids[name]
+
+    def record(self, kind, lines_by_party, now=None):
+        """
+        Appends the lines of one or more invoices in a single write.
+
+        Parameters:
+            kind (str): "sell" or "purchase"
+            lines_by_party (dict): Party name -> list of invoice items, in the
+                                   form used for the invoices of that kind
+            now (datetime): Time of the sale; defaults to the current time
+
+        Returns:
+            int: Number of records written
+        """
+        if now is None:
+            now = datetime.now()
+        timestamp = (now - EPOCH).total_seconds()
+        code = KIND_CODES[kind]
+
+        with file_lock(self.lock_path, name="Ledger"):
+            self._load_parties()
+            new_names = []
+            records = []
+            for party_name, items in lines_by_party.items():
+                party = self._party_id(party_name, new_names)
+                for product_id, qty, free_qty, unit_cost, total, tax in _ledger_lines(kind, items):
+                    records.append(RECORD.pack(timestamp, code, product_id, qty, free_qty,
+                                               unit_cost, total, tax, party))
+            if not records:
+                return 0
+
+            if new_names:
+                added = ''.join([name + '\n' for name in new_names]).encode('utf-8')
+                try:
+                    with open(self.parties_path, 'ab') as f:
+                        # Drop a name left without its newline by a crash
+                        f.truncate(self._parties_size)
+                        f.write(added)
+                        f.flush()
+                        os.fsync(f.fileno())
+                except OSError:
+                    # Numbers were handed out for names that did not reach the file
+                    self._party_ids = {}
+                    self._parties_size = 0
+                    raise
+                self._parties_size += len(added)
+
+            with open(self.path, 'ab') as f:
+                # Drop a record left half-written by a crash so the columns stay aligned
+                size = f.seek(0, os.SEEK_END)
+                if size % RECORD.size:
+                    f.truncate(size - size % RECORD.size)
+                f.write(b''.join(records))
+                f.flush()
+                os.fsync(f.fileno())
+        return len(records)
+
+    def parties(self):
+        """
+        Returns the party names, indexed by party number.
+
+        Returns:
+            list: Customer and vendor names
+        """
+        try:
+            with open(self.parties_path, 'r', encoding='utf-8') as f:
+                return f.read().split('\n')[:-1]
+        except FileNotFoundError:
+            return []
+
+    def read_columns(self):
+        """
+        Loads the whole ledger as a NumPy structured array in one read.
+
+        Returns:
+            numpy.ndarray: One element per record; each column is a field,
+                           e.g. columns['total']
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("NumPy is needed for ledger reports (pip install numpy)")
+        try:
+            count = os.path.getsize(self.path) // RECORD.size
+        except FileNotFoundError:
+            return np.zeros(0, dtype=ledger_dtype())
+        return np.fromfile(self.path, dtype=ledger_dtype(), count=count)
+
+def _ledger_lines(kind, items):
+    """
+    Pulls the ledger columns out of invoice items.
+
+    Parameters:
+        kind (str): "sell" or "purchase"
+        items (list): Sales invoice rows [product_id, name, quantity, free_product,
+                      total_cost, unit_cost, brand, tax, promotion] or purchase
+                      invoice dictionaries with 'id', 'qty' and 'cost'
+
+    Returns:
+        list: (product_id, qty, free_qty, unit_cost, total, tax) tuples
+    """
+    if kind == 'sell':
+        return [(int(item[0]), int(item[2]), int(item[3]), float(item[5]), float(item[4]), float(item[7]))
+                for item in items]
+    lines = []
+    for item in items:
+        qty = int(item['qty'])
+        cost = float(item['cost'])
+        lines.append((int(item['id']), qty, 0, cost, qty * cost, qty * cost * pricing.tax_rate))
+    return lines
+
+def record_lines(kind, lines_by_party, now=None):
+    """
+    Adds invoice lines to the shared ledger, reporting rather than raising errors.
+
+    A sale that was saved must not be undone because the ledger could not
+    be written, so problems are printed and the caller carries on.
+
+    Parameters:
+        kind (str): "sell" or "purchase"
+        lines_by_party (dict): Party name -> list of invoice items
+        now (datetime): Time of the sale; defaults to the current time
+    """
+    try:
+        sales_ledger.record(kind, lines_by_party, now)
+    except Exception as e:
+        print("❌ Error writing to sales ledger: " + str(e))
+
+# The ledger shared by all screens
+sales_ledger = Ledger()
@@ -0,0 +1,174 @@
+"""
+WeCare Inventory Management System - Load Test Module
+
+This module drives a running server.py the way a shop full of tills
+would. Worker threads each keep one connection open and send a mix of
+product lookups and small sales, and the run reports the requests served
+per second, the latency percentiles and the responses by status code.
+
+    python loadtest.py [--url http://127.0.0.1:8080] [--requests 5000]
+                       [--concurrency 32] [--sell-ratio 0.1]
+
+Sales really take stock out of the inventory the server is using, so run
+it against a copy of the data (start the server in a scratch directory).
+A 409 is a sale that found its product sold out, which is expected once
+stock runs low.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_URL = 'http://127.0.0.1:8080'
+
+# Products the lookups and sales are spread over
+SAMPLE_PRODUCTS = 1000
+
+def _request(conn, method, path, body=None):
+    """
+    Sends one request on an open connection and reads the answer.
+
+    Parameters:
+        conn (http.client.HTTPConnection): The connection
+        method (str): "GET" or "POST"
+        path (str): Request path
+        body (dict): JSON body for a POST
+
+    Returns:
+        tuple: (status code, decoded JSON body)
+    """
+    headers = {}
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    conn.request(method, path, payload, headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read().decode('utf-8'))
+
+def _worker(host, port, product_ids, count, sell_ratio, seed, results):
+    """
+    Sends a share of the requests and records how long each took.
+
+    Parameters:
+        host (str): Server address
+        port (int): Server port
+        product_ids (list): Products to look up and sell
+        count (int): Requests to send
+        sell_ratio (float): Fraction of the requests that are sales
+        seed (int): Seed for this worker's choice of requests
+        results (list): Collects (seconds, status) per request
+    """
+    chooser = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for n in range(count):
+        product_id = chooser.choice(product_ids)
+        started = time.perf_counter()
+        try:
+            if chooser.random() < sell_ratio:
+                status, body = _request(conn, 'POST', '/sell', {
+                    'customer': 'Load Test ' + str(seed),
+                    'items': [{'product_id': product_id, 'quantity': 1}],
+                })
+            else:
+                status, body = _request(conn, 'GET', '/products/' + str(product_id))
+        except (OSError, http.client.HTTPException, ValueError):
+            status = 'error'
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        results.append((time.perf_counter() - started, status))
+    conn.close()
+
+def percentile(sorted_values, fraction):
+    """
+    Returns a percentile of already sorted values.
+
+    Parameters:
+        sorted_values (list): Values in ascending order
+        fraction (float): 0.5 for the median, 0.99 for the 99th percentile
+
+    Returns:
+        float: The value at that rank
+    """
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def run(url=DEFAULT_URL, requests=5000, concurrency=32, sell_ratio=0.1):
+    """
+    Runs the load test and prints the results.
+
+    Parameters:
+        url (str): Base URL of the server
+        requests (int): Total requests to send
+        concurrency (int): Connections sending at the same time
+        sell_ratio (float): Fraction of the requests that are sales
+
+    Returns:
+        dict: 'requests', 'seconds', 'per_second', latency percentiles in
+              milliseconds and the count of each 'status'
+    """
+    address = urlsplit(url)
+    host, port = address.hostname, address.port or 80
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    status, page = _request(conn, 'GET', '/products?limit=' + str(SAMPLE_PRODUCTS))
+    conn.close()
+    product_ids = [product['product_id'] for product in page.get('products', [])]
+    if status != 200 or not product_ids:
+        raise RuntimeError("the server at " + url + " has no products to test with")
+
+    results = []
+    shares = [requests // concurrency + (1 if n < requests % concurrency else 0) for n in range(concurrency)]
+    threads = [threading.Thread(target=_worker, args=(host, port, product_ids, share, sell_ratio, n, results))
+               for n, share in enumerate(shares) if share]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted([seconds * 1000 for seconds, status in results])
+    statuses = {}
+    for seconds, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary = {
+        'requests': len(results),
+        'seconds': elapsed,
+        'per_second': len(results) / elapsed,
+        'p50_ms': percentile(latencies, 0.50),
+        'p90_ms': percentile(latencies, 0.90),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1],
+        'status': statuses,
+    }
+    print("📈 " + str(summary['requests']) + " requests in " + format(elapsed, '.2f') + " s: " +
+          format(summary['per_second'], '.0f') + " requests/s with " + str(len(threads)) + " connections")
+    print("   latency p50 " + format(summary['p50_ms'], '.1f') + " ms, p90 " + format(summary['p90_ms'], '.1f') +
+          " ms, p99 " + format(summary['p99_ms'], '.1f') + " ms, max " + format(summary['max_ms'], '.1f') + " ms")
+    print("   responses: " + ", ".join([status + " x" + str(count) for status, count in sorted(statuses.items())]))
+    return summary
+
+if __name__ == '__main__':
+    options = {'--url': DEFAULT_URL, '--requests': '5000', '--concurrency': '32', '--sell-ratio': '0.1'}
+    args = sys.argv[1:]
+    try:
+        if len(args) % 2 or any(name not in options for name in args[::2]):
+            raise ValueError
+        options.update(zip(args[::2], args[1::2]))
+        total, connections, ratio = int(options['--requests']), int(options['--concurrency']), float(options['--sell-ratio'])
+        if total < 1 or connections < 1 or not 0 <= ratio <= 1:
+            raise ValueError
+    except ValueError:
+        print("Usage: python loadtest.py [--url URL] [--requests N] [--concurrency N] [--sell-ratio 0..1]")
+        sys.exit(2)
+    try:
+        run(options['--url'], total, connections, ratio)
+    except (OSError, RuntimeError) as e:
+        print("❌ Load test failed: " + str(e))
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""
+WeCare Inventory Management System - Locking Module
+
+This module provides the advisory file lock that lets several checkout
+terminals share the same inventory. Every write to the inventory, and every
+full read of it, happens while holding the lock on products.lock, so one
+terminal never sees or overwrites another terminal's half-finished change.
+The invoice counter and the ledger are guarded the same way, each by its
+own lock file (invoices.lock, ledger.lock), so they never wait on the
+inventory or on each other.
+
+Writers take the lock exclusively; readers take it shared so they can load
+the inventory at the same time as each other. On platforms without fcntl
+(Windows) the lock is always exclusive.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = 'products.lock'
+
+# How long to keep retrying before giving up on the lock, in seconds
+LOCK_TIMEOUT = 10.0
+
+class LockTimeoutError(Exception):
+    """
+    Raised when the inventory lock could not be acquired in time.
+    """
+
+def _try_lock(fd, shared):
+    """
+    Attempts to take the lock once without blocking.
+
+    Parameters:
+        fd (int): File descriptor of the open lock file
+        shared (bool): Take a shared lock instead of an exclusive one
+
+    Returns:
+        bool: True if the lock was acquired
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _unlock(fd):
+    """
+    Releases a lock taken by _try_lock().
+
+    Parameters:
+        fd (int): File descriptor of the open lock file
+    """
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+def inventory_lock(shared=False, path=LOCK_FILE, timeout=LOCK_TIMEOUT):
+    """
+    Holds the inventory lock for the duration of a with-block.
+
+    Parameters:
+        shared (bool): Take a shared (read) lock instead of an exclusive (write) lock
+        path (str): Lock file to use
+        timeout (float): Seconds to keep retrying before giving up
+
+    Raises:
+        LockTimeoutError: If the lock could not be acquired within the timeout
+    """
+    return file_lock(path, shared, timeout, "Inventory")
+
+@contextmanager
+def file_lock(path, shared=False, timeout=LOCK_TIMEOUT, name="File"):
+    """
+    Holds an advisory lock on a file for the duration of a with-block.
+
+    The lock is retried with a growing back-off until it is free or the
+    timeout runs out. Each shared file (the inventory, the invoice counter,
+    the ledger) has its own lock file, so waiting for one never holds up
+    the others.
+
+    Parameters:
+        path (str): Lock file to use
+        shared (bool): Take a shared (read) lock instead of an exclusive (write) lock
+        timeout (float): Seconds to keep retrying before giving up
+        name (str): What the lock guards, for the timeout message
+
+    Raises:
+        LockTimeoutError: If the lock could not be acquired within the timeout
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not _try_lock(fd, shared):
+            if time.monotonic() >= deadline:
+                raise LockTimeoutError(name + " is locked by another terminal")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
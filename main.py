@@ -5,11 +5,28 @@ This module serves as the entry point for the weCare Inventory Management System
 It provides a command-line interface for users to interact with the system,
 offering options to display inventory, sell items, restock inventory, and exit.
 
+Order files can also be processed without the menu:
+    python main.py sell orders.csv
+    python main.py restock orders.jsonl
+Add --no-invoices to skip writing the invoice files.
+
+The inventory can be listed or exported by streaming it, without loading it
+into memory first:
+    python main.py list
+    python main.py export inventory.csv
+
 Author: [Rakshak Sigdel]
 Version: 1.0
 """
 
-from operation import sell_items, display_menu,display_all_products,buy_items,display_menu
+import sys
+
+from inventory import SaveError, StockConflictError, get_backend
+from locking import LockTimeoutError, inventory_lock
+from invoice_queue import invoice_writer, report_invoices
+from operation import sell_items, display_menu,display_all_products,browse_products,buy_items,display_menu,display_reports,display_diagnostics,process_sales,process_restock
+from read import read_orders
+from write import export_products
 
 def main():
     """
@@ -20,9 +37,12 @@ def main():
     - Displaying current inventory
     - Selling items
     - Restocking inventory
+    - Viewing inventory reports
+    - Viewing diagnostics (timings of the busy paths)
     - Exiting the program
     
     The function handles user input validation and provides appropriate feedback.
+    On exit it waits for any invoices still being written in the background.
     
     Returns:
         None
@@ -33,35 +53,113 @@ def main():
 
     # Main program loop
     end_program = False
-    while not end_program:
-        try:
-            # Get user choice from menu options
-            user_input = input("Please enter your choice(1,2,3,4): ")
+    try:
+        while not end_program:
+            try:
+                # Get user choice from menu options
+                user_input = input("Please enter your choice(1,2,3,4,5,6): ")
             
-            # Process user choice
-            if user_input == '1':
-                print("🖥️You choose to display items.")
-                display_all_products()
-                input("🏠Press Enter to return to main menu...")
-                display_menu()
-            elif user_input == '2':
-                print("💲You choose to sell items.")
-                sell_items()
-                input("🏠Press Enter to return to main menu...")
-                display_menu()
-            elif user_input == '3':
-                print("➕You choose to add items.")
-                buy_items()
-                input("🏠Press Enter to return to main menu...")
-                display_menu()
-            elif user_input == '4':
-                print("👋You choose to exit the program.")
-                print("Thank you for using WeCare!")
-                end_program = True
-            else:
-                print("Invalid input. Please enter 1, 2, 3, or 4.")
-        except ValueError:
-            print("Invalid input. Please enter only a number (1, 2, 3, or 4) without any other characters.")
-           
+                # Process user choice
+                if user_input == '1':
+                    print("🖥️You choose to display items.")
+                    browse_products()
+                    input("🏠Press Enter to return to main menu...")
+                    display_menu()
+                elif user_input == '2':
+                    print("💲You choose to sell items.")
+                    sell_items()
+                    input("🏠Press Enter to return to main menu...")
+                    display_menu()
+                elif user_input == '3':
+                    print("➕You choose to add items.")
+                    buy_items()
+                    input("🏠Press Enter to return to main menu...")
+                    display_menu()
+                elif user_input == '5':
+                    print("📊You choose to view reports.")
+                    display_reports()
+                    input("🏠Press Enter to return to main menu...")
+                    display_menu()
+                elif user_input == '6':
+                    print("🩺You choose to view diagnostics.")
+                    display_diagnostics()
+                    input("🏠Press Enter to return to main menu...")
+                    display_menu()
+                elif user_input == '4':
+                    print("👋You choose to exit the program.")
+                    print("Thank you for using WeCare!")
+                    end_program = True
+                else:
+                    print("Invalid input. Please enter 1, 2, 3, 4, 5, or 6.")
+            except ValueError:
+                print("Invalid input. Please enter only a number (1, 2, 3, 4, 5, or 6) without any other characters.")
+    finally:
+        # Finish the invoices still being written in the background before leaving
+        invoice_writer.drain()
+        report_invoices()
+
+def run_batch(args):
+    """
+    Processes a sales or restocking order file without the interactive menu.
+
+    Parameters:
+        args (list): Command-line arguments after the program name:
+                     "sell" or "restock", the order file path, and
+                     optionally --no-invoices
+
+    Returns:
+        int: Exit status, 0 on success
+    """
+    generate_invoices = '--no-invoices' not in args
+    args = [arg for arg in args if arg != '--no-invoices']
+    if len(args) != 2 or args[0] not in ('sell', 'restock'):
+        print("Usage: python main.py [sell|restock] ORDER_FILE [--no-invoices]")
+        return 2
+
+    try:
+        orders = read_orders(args[1])
+    except (IOError, ValueError) as e:
+        print("❌ Error reading order file: " + str(e))
+        return 1
+
+    try:
+        if args[0] == 'sell':
+            process_sales(orders, generate_invoices)
+        else:
+            process_restock(orders, generate_invoices)
+    except (StockConflictError, LockTimeoutError, SaveError) as e:
+        print("❌ The batch could not be saved: " + str(e))
+        return 1
+    return 0
+
+def run_listing(args):
+    """
+    Lists or exports the inventory by streaming it from storage.
+
+    Products are read and printed (or written) one at a time under a shared
+    lock, so memory use stays constant however large the catalog is.
+
+    Parameters:
+        args (list): ["list"] or ["export", OUTPUT_FILE]
+
+    Returns:
+        int: Exit status, 0 on success
+    """
+    if args == ['list']:
+        with inventory_lock(shared=True):
+            display_all_products(get_backend().iter_products())
+        return 0
+    if len(args) == 2 and args[0] == 'export':
+        with inventory_lock(shared=True):
+            export_products(get_backend().iter_products(), args[1])
+        return 0
+    print("Usage: python main.py list | export OUTPUT_FILE")
+    return 2
+
 # Execute the main function
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in ('list', 'export'):
+        sys.exit(run_listing(sys.argv[1:]))
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
+    main()
\ No newline at end of file
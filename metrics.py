@@ -0,0 +1,303 @@
+"""
+WeCare Inventory Management System - Metrics Module
+
+This module records where the time goes on the busy paths: reading the
+inventory, saving it, listing products and writing invoices. For each
+path it keeps the number of calls and errors, a histogram of how long the
+calls took, and the rows, bytes read and bytes written they handled.
+
+Metrics are off unless the WECARE_METRICS environment variable is set:
+    WECARE_METRICS=1 python main.py
+When they are off, timed() hands back the function itself undecorated and
+observe() and add() return at once, so the instrumented code runs as it
+did before.
+
+The figures can be viewed from the diagnostics option of the main menu
+and exported as JSON or in the Prometheus text format with export().
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+METRICS_ENV = 'WECARE_METRICS'
+
+# Upper bounds of the latency histogram buckets, in seconds; slower calls
+# fall in a last, unbounded bucket
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+enabled = os.environ.get(METRICS_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+class PathStats:
+    """
+    What has been recorded for one instrumented path.
+
+    Attributes:
+        calls (int): Calls timed
+        errors (int): Timed calls that raised an exception
+        seconds (float): Total time spent in the timed calls
+        max_seconds (float): Longest call
+        buckets (list): Calls per latency bucket, the last one unbounded
+        rows (int): Rows (products or invoice lines) handled
+        bytes_read (int): Bytes read from files
+        bytes_written (int): Bytes written to files or the terminal
+    """
+
+    __slots__ = ('calls', 'errors', 'seconds', 'max_seconds', 'buckets', 'rows', 'bytes_read', 'bytes_written')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def quantile(self, fraction):
+        """
+        Estimates a latency percentile from the histogram.
+
+        Parameters:
+            fraction (float): 0.5 for the median, 0.99 for the 99th percentile
+
+        Returns:
+            float: Upper bound of the bucket holding that call, in seconds,
+                   but never more than the longest call
+        """
+        rank = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self):
+        """
+        Returns the figures as a JSON-ready dictionary.
+
+        Returns:
+            dict: The attributes, with the histogram as cumulative
+                  {"le": bound, "count": calls} pairs as in Prometheus
+        """
+        cumulative = []
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), self.buckets):
+            seen += count
+            cumulative.append({'le': bound, 'count': seen})
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'seconds': self.seconds,
+            'max_seconds': self.max_seconds,
+            'latency_buckets': cumulative,
+            'rows': self.rows,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+        }
+
+_lock = threading.Lock()
+_paths = {}
+
+def _stats(name):
+    """
+    Returns the figures of a path, creating them on first use. Must be called with the lock held.
+
+    Parameters:
+        name (str): Path name
+
+    Returns:
+        PathStats: The path's figures
+    """
+    stats = _paths.get(name)
+    if stats is None:
+        stats = _paths[name] = PathStats()
+    return stats
+
+def observe(name, seconds, failed=False):
+    """
+    Records one timed call.
+
+    Parameters:
+        name (str): Path name
+        seconds (float): How long the call took
+        failed (bool): True if the call raised an exception
+    """
+    if not enabled:
+        return
+    with _lock:
+        stats = _stats(name)
+        stats.calls += 1
+        stats.errors += failed
+        stats.seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+def add(name, rows=0, bytes_read=0, bytes_written=0):
+    """
+    Adds to the rows and bytes handled by a path.
+
+    Parameters:
+        name (str): Path name
+        rows (int): Rows handled
+        bytes_read (int): Bytes read
+        bytes_written (int): Bytes written
+    """
+    if not enabled:
+        return
+    with _lock:
+        stats = _stats(name)
+        stats.rows += rows
+        stats.bytes_read += bytes_read
+        stats.bytes_written += bytes_written
+
+def timed(name):
+    """
+    Decorator timing every call of a function as a path.
+
+    When metrics are off the function is returned unchanged.
+
+    Parameters:
+        name (str): Path name
+    """
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                observe(name, time.perf_counter() - started, True)
+                raise
+            observe(name, time.perf_counter() - started)
+            return result
+        return wrapper
+    return decorate
+
+def file_size(path):
+    """
+    Returns the size of a file, or 0 if it does not exist.
+
+    Parameters:
+        path (str): The file
+
+    Returns:
+        int: Size in bytes
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def snapshot():
+    """
+    Returns a copy of everything recorded so far.
+
+    Returns:
+        dict: Path name -> figures, as PathStats.to_dict()
+    """
+    with _lock:
+        return {name: stats.to_dict() for name, stats in sorted(_paths.items())}
+
+def reset():
+    """
+    Forgets everything recorded so far.
+    """
+    with _lock:
+        _paths.clear()
+
+def to_json():
+    """
+    Returns the metrics as a JSON document.
+
+    Returns:
+        str: {"enabled": ..., "paths": {name: figures}}
+    """
+    return json.dumps({'enabled': enabled, 'paths': snapshot()}, indent=2)
+
+def to_prometheus():
+    """
+    Returns the metrics in the Prometheus text exposition format.
+
+    Each path is a "path" label on the wecare_* metric families.
+
+    Returns:
+        str: The exposition text
+    """
+    paths = snapshot()
+    lines = []
+
+    def family(metric, kind, help_text, field):
+        lines.append("# HELP " + metric + " " + help_text)
+        lines.append("# TYPE " + metric + " " + kind)
+        for name, figures in paths.items():
+            lines.append(metric + '{path="' + name + '"} ' + repr(figures[field]))
+
+    family('wecare_calls_total', 'counter', 'Calls of the path.', 'calls')
+    family('wecare_errors_total', 'counter', 'Calls of the path that raised an exception.', 'errors')
+    lines.append("# HELP wecare_latency_seconds Time taken by calls of the path.")
+    lines.append("# TYPE wecare_latency_seconds histogram")
+    for name, figures in paths.items():
+        for bucket in figures['latency_buckets']:
+            lines.append('wecare_latency_seconds_bucket{path="' + name + '",le="' + str(bucket['le']) + '"} ' +
+                         str(bucket['count']))
+        lines.append('wecare_latency_seconds_sum{path="' + name + '"} ' + repr(figures['seconds']))
+        lines.append('wecare_latency_seconds_count{path="' + name + '"} ' + str(figures['calls']))
+    family('wecare_rows_total', 'counter', 'Rows handled by the path.', 'rows')
+    family('wecare_read_bytes_total', 'counter', 'Bytes read by the path.', 'bytes_read')
+    family('wecare_written_bytes_total', 'counter', 'Bytes written by the path.', 'bytes_written')
+    return '\n'.join(lines) + '\n'
+
+def export(path):
+    """
+    Writes the metrics to a file, in Prometheus text format for a .prom or
+    .txt file and as JSON otherwise.
+
+    Parameters:
+        path (str): File to write
+
+    Raises:
+        OSError: If the file could not be written
+    """
+    content = to_prometheus() if path.endswith(('.prom', '.txt')) else to_json()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def format_table():
+    """
+    Formats the metrics as a table for the terminal.
+
+    Returns:
+        str: One row per path with calls, errors, latency, rows and bytes
+    """
+    paths = snapshot()
+    with _lock:
+        quantiles = {name: (_paths[name].quantile(0.5), _paths[name].quantile(0.99)) for name in paths}
+    rows = ["Path                       Calls  Errors  Avg ms   p50 ms   p99 ms   Max ms      Rows   Read KB  Written KB"]
+    for name, figures in paths.items():
+        calls = figures['calls']
+        p50, p99 = quantiles[name]
+        rows.append(name[:25].ljust(25) +
+                    str(calls).rjust(7) +
+                    str(figures['errors']).rjust(8) +
+                    format(figures['seconds'] / calls * 1000 if calls else 0, '.2f').rjust(8) +
+                    format(p50 * 1000, '.2f').rjust(9) +
+                    format(p99 * 1000, '.2f').rjust(9) +
+                    format(figures['max_seconds'] * 1000, '.2f').rjust(9) +
+                    str(figures['rows']).rjust(10) +
+                    format(figures['bytes_read'] / 1024, '.1f').rjust(10) +
+                    format(figures['bytes_written'] / 1024, '.1f').rjust(12))
+    return '\n'.join(rows)
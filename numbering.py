@@ -0,0 +1,100 @@
+"""
+WeCare Inventory Management System - Invoice Numbering Module
+
+This module hands out invoice numbers from a counter kept on disk, so no
+two invoices ever get the same number, even when they are written in the
+same second or by different terminals.
+
+The counter lives in invoices.seq as a single fixed-width decimal record.
+It is read and overwritten in place while holding an exclusive lock on
+invoices.lock, and synced to disk before the lock is released, so a number
+once handed out is never handed out again. A bulk run reserves a whole
+block of numbers with one update of the counter.
+
+An invoice number is the date followed by the sequence, both zero padded,
+e.g. "20240111-000042". The sequence keeps increasing across days.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+from datetime import datetime
+
+from locking import file_lock
+
+SEQUENCE_FILE = 'invoices.seq'
+SEQUENCE_LOCK_FILE = 'invoices.lock'
+
+# Width of the counter record in invoices.seq, newline included
+RECORD_WIDTH = 21
+
+def reserve_sequence(count=1, path=SEQUENCE_FILE, lock_path=SEQUENCE_LOCK_FILE):
+    """
+    Reserves a block of consecutive sequence numbers.
+
+    Parameters:
+        count (int): How many numbers to reserve
+        path (str): Counter file
+        lock_path (str): Lock file guarding the counter
+
+    Returns:
+        range: The reserved sequence numbers
+
+    Raises:
+        ValueError: If the counter file is damaged
+        LockTimeoutError: If another terminal held the counter too long
+    """
+    if count < 1:
+        return range(0)
+    with file_lock(lock_path, name="Invoice counter"):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            record = os.read(fd, RECORD_WIDTH).strip()
+            last = int(record) if record else 0
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, (str(last + count).rjust(RECORD_WIDTH - 1, '0') + '\n').encode('ascii'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return range(last + 1, last + count + 1)
+
+def format_invoice_number(sequence, now):
+    """
+    Builds the invoice number shown on an invoice and in its file name.
+
+    Parameters:
+        sequence (int): Number from reserve_sequence()
+        now (datetime): Time of the invoice
+
+    Returns:
+        str: The invoice number, e.g. "20240111-000042"
+    """
+    return now.strftime('%Y%m%d') + '-' + str(sequence).rjust(6, '0')
+
+def reserve_invoice_numbers(count, now=None):
+    """
+    Reserves a block of invoice numbers for a bulk invoice run.
+
+    Parameters:
+        count (int): How many invoice numbers are needed
+        now (datetime): Time of the invoices; defaults to the current time
+
+    Returns:
+        list: Invoice numbers in increasing order
+    """
+    if now is None:
+        now = datetime.now()
+    return [format_invoice_number(sequence, now) for sequence in reserve_sequence(count)]
+
+def next_invoice_number(now=None):
+    """
+    Reserves a single invoice number.
+
+    Parameters:
+        now (datetime): Time of the invoice; defaults to the current time
+
+    Returns:
+        str: The invoice number
+    """
+    return reserve_invoice_numbers(1, now)[0]
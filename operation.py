@@ -3,10 +3,13 @@ WeCare Inventory Management System - Operations Module
 
 This module handles the core operations for the WeCare Inventory Management System.
 It provides comprehensive functionality for:
-1. User Interface: Displaying the main menu and product listings
-2. Sales Management: Processing customer purchases with the "Buy 3 Get 1 Free" promotion
+1. User Interface: Displaying the main menu and paginated product listings
+2. Sales Management: Processing customer purchases with the offers from pricing.py
 3. Inventory Management: Restocking existing items and adding new products
-4. Documentation: Generating detailed invoices for both sales and purchases
+4. Documentation: Generating detailed invoices for both sales and purchases,
+   written in the background so the next customer can be served at once
+5. Batch Processing: Applying whole files of sales or restocking orders
+   without prompts, with a single inventory load and save
 
 The module maintains accurate inventory records across all transactions and
 provides a user-friendly interface for staff to manage the complete
@@ -16,16 +19,31 @@ Author: [Rakshak Sigdel]
 Version: 1.0
 """
 
-from read import read_from_file
-from write import buy_items_invoice,sell_item_invoice,save_to_inventory
+import math
+import sys
+
+import metrics
+from cart import Cart
+from inventory import inventory, SaveError, StockConflictError
+from invoice import write_invoices
+from invoice_queue import invoice_writer, report_invoices
+from ledger import record_lines
+from locking import LockTimeoutError
+from pricing import pricing
+from product import Product
+from reports import LOW_STOCK_THRESHOLD, inventory_report, print_inventory_report, sold_units
 
 def display_menu():
     """
     Displays the Options available in the management system.
+
+    Invoices finished in the background since the menu was last shown, and
+    any that could not be written, are reported first.
     
     Returns:
         None
     """
+    report_invoices()
     print("""
           ╔════════════════════════════════════════╗
           ║                                        ║ 
@@ -39,77 +57,296 @@ def display_menu():
 ║                2️  💸 SELL STUFF 💸                         ║
 ║                3️  🔄 RESTOCK THE SHELVES 🔄                ║
 ║                4️  👋 PEACE OUT 👋                          ║
+║                5️  📊 REPORTS 📊                            ║
+║                6️  🩺 DIAGNOSTICS 🩺                        ║
 ╚════════════════════════════════════════════════════════════╝
 """)
 
-def display_all_products():
+# Number of products shown per page of the product table
+PAGE_SIZE = 20
+
+TABLE_HEADER = (
+    "╔" + "═" * 79 + "╗\n" +
+    "║" + "                                  Product List                                 " + "║\n" +
+    "╠" + "═" * 79 + "╣\n" +
+    "║ID ║       Name         ║    Brand     ║   Qty    ║  Cost    ║     Origin      ║\n" +
+    "╠" + "═" * 79 + "╣\n"
+)
+TABLE_FOOTER = "╚" + "═" * 79 + "╝\n"
+
+# Formatted table rows by product ID, reused for as long as the product is unchanged
+_row_cache = {}
+
+def format_product_row(product):
+    """
+    Formats one product as a row of the product table.
+
+    Each column is cut short with ".." or padded with spaces to its width.
+    The cost shown is doubled from the stored value (representing retail price).
+
+    Parameters:
+        product (Product): The product to format
+
+    Returns:
+        str: The table row, including the trailing newline
+    """
+    id_val = str(product.product_id)
+    name = product.name
+    brand = product.brand
+    origin = product.origin
+    
+    id_space = " "
+    id_display = id_space + id_val + id_space if (len(id_val) <= 4) else id_space + id_val[:3] + ".. "
+    
+    if len(name) > 18:
+        name_display = name[:16] + ".."
+    else:
+        name_display = name + " " * (18 - len(name))
+    
+    if len(brand) > 12:
+        brand_display = brand[:10] + ".."
+    else:
+        brand_display = brand + " " * (12 - len(brand))
+    
+    qty_str = str(product.qty)
+    if len(qty_str) > 8:
+        qty_display = qty_str[:6] + ".."
+    else:
+        qty_display = qty_str + " " * (8 - len(qty_str))
+    
+    cost_doubled = str(product.cost * 2)
+    if len(cost_doubled) > 8:
+        cost_display = cost_doubled[:6] + ".."
+    else:
+        cost_display = cost_doubled + " " * (8 - len(cost_doubled))
+    
+    if len(origin) > 15:
+        origin_display = origin[:13] + ".."
+    else:
+        origin_display = origin + " " * (15 - len(origin))
+    
+    return (
+        "║" + id_display + 
+        "║ " + name_display + 
+        " ║ " + brand_display + 
+        " ║ " + qty_display + 
+        " ║ " + cost_display + 
+        " ║ " + origin_display + " ║\n"
+    )
+
+def cached_product_row(product):
+    """
+    Returns the table row for a product, formatting it only if it changed.
+
+    Parameters:
+        product (Product): The product to format
+
+    Returns:
+        str: The table row, including the trailing newline
+    """
+    key = (product.name, product.brand, product.qty, product.cost, product.origin)
+    cached = _row_cache.get(product.product_id)
+    if cached is None or cached[0] != key:
+        cached = (key, format_product_row(product))
+        _row_cache[product.product_id] = cached
+    return cached[1]
+
+@metrics.timed('display_all_products')
+def display_all_products(products=None):
     """
     Displays the current inventory in a formatted table.
     
     This function processes inventory data and displays it in a well-formatted
     table showing product ID, name, brand, quantity, cost, and origin.
-    The cost shown is doubled from the stored value (representing retail price).
+    Rows are written to the terminal in blocks rather than one print() each.
     
     Parameters:
-        None
+        products (iterable): Products to list, e.g. a stream from iter_products();
+                             defaults to the inventory store's cached data
         
     Returns:
         None
     """
-    # Get inventory data from file
-    data = read_from_file()
+    if products is None:
+        # Get inventory data from the store, re-read only if the file changed
+        products = inventory.get_data().values()
     
-    # Print table header
-    print("╔" + "═" * 79 + "╗")
-    print("║" + "                                  Product List                                 " + "║")
-    print("╠" + "═" * 79 + "╣")
-    print("║ID ║       Name         ║    Brand     ║   Qty    ║  Cost    ║     Origin      ║")
-    print("╠" + "═" * 79 + "╣")
-
-    for key in data:
-        id_val, name, brand, qty, cost, origin = data[key]
-        
-        id_space = " "
-        id_display = id_space + id_val + id_space if (len(id_val) <= 4) else id_space + id_val[:3] + ".. "
-        
-        if len(name) > 18:
-            name_display = name[:16] + ".."
-        else:
-            name_display = name + " " * (18 - len(name))
-        
-        if len(brand) > 12:
-            brand_display = brand[:10] + ".."
-        else:
-            brand_display = brand + " " * (12 - len(brand))
-        
-        qty_str = str(qty)
-        if len(qty_str) > 8:
-            qty_display = qty_str[:6] + ".."
-        else:
-            qty_display = qty_str + " " * (8 - len(qty_str))
-        
-        cost_doubled = str(float(cost) * 2)
-        if len(cost_doubled) > 8:
-            cost_display = cost_doubled[:6] + ".."
-        else:
-            cost_display = cost_doubled + " " * (8 - len(cost_doubled))
-        
-        if len(origin) > 15:
-            origin_display = origin[:13] + ".."
+    sys.stdout.write(TABLE_HEADER)
+    rows = 0
+    written = len(TABLE_HEADER)
+    block = []
+    for product in products:
+        block.append(format_product_row(product))
+        if len(block) == 1000:
+            text = ''.join(block)
+            sys.stdout.write(text)
+            rows += 1000
+            written += len(text)
+            block = []
+    rows += len(block)
+    block.append(TABLE_FOOTER)
+    text = ''.join(block)
+    sys.stdout.write(text)
+    sys.stdout.flush()
+    if metrics.enabled:
+        metrics.add('display_all_products', rows=rows, bytes_written=written + len(text))
+
+def display_product_page(products, page, page_size=PAGE_SIZE):
+    """
+    Displays one page of the product table in a single write.
+
+    Parameters:
+        products (list): All products, in display order
+        page (int): Page to show, counting from 0
+        page_size (int): Number of products per page
+
+    Returns:
+        int: Total number of pages
+    """
+    pages = max(1, (len(products) + page_size - 1) // page_size)
+    page = min(max(page, 0), pages - 1)
+    start = page * page_size
+    rows = [cached_product_row(product) for product in products[start:start + page_size]]
+    status = ""
+    if pages > 1:
+        status = ("📄 Page " + str(page + 1) + " of " + str(pages) + " (products " + str(start + 1) +
+                  "-" + str(start + len(rows)) + " of " + str(len(products)) + ")\n")
+    sys.stdout.write(TABLE_HEADER + ''.join(rows) + TABLE_FOOTER + status)
+    sys.stdout.flush()
+    return pages
+
+def browse_products(page_size=PAGE_SIZE):
+    """
+    Lets the user page through the product table.
+
+    Commands: N for the next page, P for the previous page, J followed by a
+    product ID to jump to the page holding that product, and Enter to finish.
+    A catalog that fits on one page is simply shown.
+
+    Parameters:
+        page_size (int): Number of products per page
+
+    Returns:
+        None
+    """
+    products = list(inventory.get_data().values())
+    positions = None
+    page = 0
+    while True:
+        pages = display_product_page(products, page, page_size)
+        if pages == 1:
+            return
+        command = input("⏩ [N]ext, [P]revious, [J]ump to ID, Enter to finish: ").strip().lower()
+        if command == 'n':
+            page = min(page + 1, pages - 1)
+        elif command == 'p':
+            page = max(page - 1, 0)
+        elif command.startswith('j'):
+            id_text = command[1:].strip() or input("🔢 Product ID: ").strip()
+            if positions is None:
+                positions = {product.product_id: index for index, product in enumerate(products)}
+            try:
+                page = positions[int(id_text)] // page_size
+            except (KeyError, ValueError):
+                print("⚠️ Product ID " + id_text + " not found.")
         else:
-            origin_display = origin + " " * (15 - len(origin))
-        
-        print(
-            "║" + id_display + 
-            "║ " + name_display + 
-            " ║ " + brand_display + 
-            " ║ " + qty_display + 
-            " ║ " + cost_display + 
-            " ║ " + origin_display + " ║"
-        )
-    # Print table footer
-    print("╚" + "═" * 79 + "╝")
+            return
+
+def search_products(query, limit=PAGE_SIZE):
+    """
+    Shows the products matching a search as a product table.
+
+    "brand:NAME" and "origin:COUNTRY" look up an exact brand or country of
+    origin, and "TEXT*" finds products whose name starts with TEXT; any other
+    text finds products whose name contains each of its words, so
+    "aqua cream" finds "Aqua Bomb Cream".
+
+    Parameters:
+        query (str): What to search for
+        limit (int): Largest number of matches to show
+
+    Returns:
+        list: IDs of the matches shown
+    """
+    index = inventory.search_index()
+    query = query.strip()
+    # Ask for one extra match to know whether there are more than we show
+    found = index.find(query, limit + 1)
+
+    if not found:
+        print("🔍 No products match '" + query + "'.")
+        return []
+    data = inventory.get_data()
+    shown = found[:limit]
+    display_product_page([data[product_id] for product_id in shown], 0, limit)
+    if len(found) > limit:
+        print("ℹ️ Showing the first " + str(limit) + " matches. Refine the search to see others.")
+    return shown
+
+def display_products_overview():
+    """
+    Shows the first page of the product table for the sell and restock screens.
+
+    Returns:
+        None
+    """
+    products = list(inventory.get_data().values())
+    if display_product_page(products, 0) > 1:
+        print("ℹ️ Use option 1 from the main menu to browse all products.")
     
+def display_reports():
+    """
+    Shows the inventory report: valuation, low stock, and stock and
+    sell-through by brand and origin.
+
+    The low-stock threshold can be entered, or left at the default. All
+    figures come from one pass over the inventory.
+
+    Returns:
+        None
+    """
+    print("""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           📊 INVENTORY REPORTS 📊                             ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+""")
+    threshold_input = input("⚠️ Low-stock threshold (Enter for " + str(LOW_STOCK_THRESHOLD) + "): ").strip()
+    threshold = int(threshold_input) if threshold_input.isdigit() else LOW_STOCK_THRESHOLD
+    try:
+        sold = sold_units()
+    except Exception as e:
+        print("⚠️ Sales ledger could not be read, sell-through is not shown: " + str(e))
+        sold = None
+    if sold is None:
+        print("ℹ️ Sell-through needs NumPy and is shown as 0%.")
+    print_inventory_report(inventory_report(inventory.get_data().values(), threshold, sold=sold))
+
+def display_diagnostics():
+    """
+    Shows the call counts, latencies, rows and bytes recorded for the busy
+    paths, and offers to export them to a JSON or Prometheus text file.
+
+    Returns:
+        None
+    """
+    print("\n" + "═" * 60)
+    print("🩺 DIAGNOSTICS")
+    print("═" * 60)
+    if not metrics.enabled:
+        print("⚠️ Metrics are off. Start the program with " + metrics.METRICS_ENV + "=1 to record them.")
+        return
+    if not metrics.snapshot():
+        print("ℹ️ Nothing has been recorded yet.")
+        return
+    print(metrics.format_table())
+    path = input("\n💾 Export to file (.json, or .prom for Prometheus; Enter to skip): ").strip()
+    if path:
+        try:
+            metrics.export(path)
+            print("✅ Metrics exported to " + path)
+        except OSError as e:
+            print("❌ Error exporting metrics: " + str(e))
+
 def sell_items():
     """
     Manages the process of selling items to customers.
@@ -117,14 +354,15 @@ def sell_items():
     This function provides a comprehensive user interface to:
     - Display the current inventory to the sales staff
     - Process sales transactions for multiple customers
-    - Implement a "Buy 3 Get 1 Free" promotion
+    - Apply the pricing rules ("Buy 3 Get 1 Free" unless configured otherwise)
     - Validate user inputs to ensure data integrity
     - Update inventory levels after successful sales
     - Generate professional sales invoices for customers
     
-    The function maintains accurate inventory records by updating
-    the data file after each transaction and provides detailed
-    feedback throughout the sales process.
+    Items are held in a cart that reserves their stock until checkout,
+    when everything sold to the customer is saved in one transaction. A
+    cancelled or interrupted sale releases the reserved stock and saves
+    nothing.
     
     Parameters:
         None
@@ -138,10 +376,7 @@ def sell_items():
 ║                        🛒 SALES MANAGEMENT 🛒                                 ║
 ╚═══════════════════════════════════════════════════════════════════════════════╝
 """)
-        display_all_products()
-        
-        #Storing the product data in a dictionary
-        data = read_from_file()
+        display_products_overview()
         
         print("\n" + "─" * 50)
         print("👤 CUSTOMER INFORMATION")
@@ -149,97 +384,122 @@ def sell_items():
         customer_name = input("📝 Customer Name: ")
         print("─" * 50)
         
-        #creating a list to store the items for invoice
-        items_for_invoice = []
-        
-        keep_selling = True  #Inner loop for selling items to the same customer
-        while keep_selling:
-            try:
-                print("\n" + "═" * 60)
-                print("🔍 PRODUCT SELECTION")
-                print("═" * 60)
-                
-                #Getting product ID with validation
-                while True:
-                    try:
-                        product_id = int(input("🔢 Enter Product ID: "))
-                        if product_id in data:
-                            break
-                        else:
-                            print("⚠️ Invalid product ID. Please try again.")
-                    except ValueError:
-                        print("⚠️ Invalid input. Please enter a number.")
-                
-                available_quantity = int(data[product_id][3]) 
-                quantity_for_sale = available_quantity - (available_quantity // 4) #To maintain the buy 3 get 1 free policy
-                # Display selected product information
-                print("\n" + "─" * 60)
-                print("🏷️ SELECTED: Item #" + str(product_id) + " - " + data[product_id][1])
-                print("─" * 60)
-                print("• Brand: " + data[product_id][2])
-                print("• Quantity in stock: " + str(data[product_id][3]))
-                print("• Available for sale: " + str(quantity_for_sale))
-                print("• Unit Price: $" + str(round(float(data[product_id][4]), 2)))
-                print("• Origin: " + data[product_id][5])
-                print("─" * 60)
-
-                while True:
-                    try:
-                        quantity = int(input("📦 Enter Quantity to Purchase: "))
-                        if quantity > quantity_for_sale:
-                            print("⚠️ Insufficient stock. We can only sell "+ str(quantity_for_sale) +" items to maintain buy three get one free policy")
-                        elif quantity <= 0:
-                            print("⚠️ Invalid quantity. Please enter a positive number.")
-                        else:
-                            break
-                    except ValueError:
-                        print("⚠️ Invalid input. Please enter a number.")
-                
-                free_product = quantity // 3
-                unit_cost = float(data[product_id][4])
-                total_cost = quantity * unit_cost
-                
-                # Show transaction summary
-                print("\n" + "─" * 60)
-                print("🧮 TRANSACTION SUMMARY")
-                print("─" * 60)
-                print("• Item: " + data[product_id][0])
-                print("• Quantity: " + str(quantity))
-                print("• Free Items (Buy 3 Get 1): " + str(free_product))
-                print("• Price Per Unit: $" + str(round(float(data[product_id][3]), 2)))
-                print("• Subtotal: $" + str(round(total_cost, 2)))
-                print("─" * 60)
+        #the cart reserves stock as items are added; nothing is saved until checkout
+        cart = Cart(customer_name)
+        try:
+            keep_selling = True  #Inner loop for selling items to the same customer
+            while keep_selling:
+                try:
+                    print("\n" + "═" * 60)
+                    print("🔍 PRODUCT SELECTION")
+                    print("═" * 60)
+                    
+                    #Getting product ID with validation
+                    product_id = None
+                    while True:
+                        try:
+                            id_input = input("🔢 Enter Product ID (or ?name to search, X to cancel the sale): ").strip()
+                            if id_input.startswith('?'):
+                                search_products(id_input[1:])
+                                continue
+                            if id_input.lower() == 'x':
+                                break
+                            product_id = int(id_input)
+                            data = inventory.get_data()
+                            if product_id in data and cart.sellable(product_id) > cart.lines.get(product_id, 0):
+                                break
+                            elif product_id in data:
+                                print("⚠️ This product is out of stock. Please choose another.")
+                            else:
+                                print("⚠️ Invalid product ID. Please try again.")
+                        except ValueError:
+                            print("⚠️ Invalid input. Please enter a number.")
+                    
+                    if product_id is None:
+                        cart.abandon()
+                        print("🗑️ Sale cancelled. The reserved items are back on sale.")
+                        break
+                    
+                    product = data[product_id]
+                    in_cart = cart.lines.get(product_id, 0)
+                    #Stock held in other carts and the free items the quantity earns are not for sale
+                    quantity_for_sale = cart.sellable(product_id) - in_cart
+                    offer = pricing.terms_for(product).label
+                    # Display selected product information
+                    print("\n" + "─" * 60)
+                    print("🏷️ SELECTED: Item #" + str(product_id) + " - " + product.name)
+                    print("─" * 60)
+                    print("• Brand: " + product.brand)
+                    print("• Quantity in stock: " + str(product.qty))
+                    print("• Available for sale: " + str(quantity_for_sale))
+                    if in_cart:
+                        print("• Already in cart: " + str(in_cart))
+                    print("• Unit Price: $" + str(round(product.cost, 2)))
+                    print("• Offer: " + offer)
+                    print("• Origin: " + product.origin)
+                    print("─" * 60)
 
-                
-                #update quantity
-                data[product_id][3] = str(available_quantity - quantity - free_product)
-                #update the item_for_invoice
-                items_for_invoice.append([
-                    product_id,
-                    data[product_id][1],
-                    quantity,
-                    free_product,
-                    total_cost,
-                    unit_cost,
-                    data[product_id][2]
+                    while True:
+                        try:
+                            quantity = int(input("📦 Enter Quantity to Purchase: "))
+                            if quantity > quantity_for_sale:
+                                print("⚠️ Insufficient stock. We can only sell "+ str(quantity_for_sale) +" items to honour the offer: " + offer)
+                            elif quantity <= 0:
+                                print("⚠️ Invalid quantity. Please enter a positive number.")
+                            else:
+                                break
+                        except ValueError:
+                            print("⚠️ Invalid input. Please enter a number.")
                     
-                ])
-                #update the data file
-                save_to_inventory(data)
-                        
-                # Ask to continue with current customer
-                print("\n" + "─" * 60)
-                print("🔄 CONTINUE WITH CURRENT CUSTOMER?")
-                print("─" * 60)
-                user_input = input("Want to sell more items to " + customer_name + "? (Y/N): ")
-                if user_input.lower() != "y":
-                    keep_selling = False
-            except Exception as e:
-                print("❌ An unexpected error occurred: "+   str(e))
-                print("⚠️ No items available for sale.")
-                break 
+                    #reserve the items, the free items they earn included
+                    line = cart.add(product_id, quantity)
+                    
+                    # Show transaction summary
+                    print("\n" + "─" * 60)
+                    print("🧮 TRANSACTION SUMMARY")
+                    print("─" * 60)
+                    print("• Item: " + product.name)
+                    print("• Quantity: " + str(line.qty))
+                    print("• Free Items (" + line.label + "): " + str(line.free_qty))
+                    print("• Price Per Unit: $" + str(round(line.unit_cost, 2)))
+                    if line.discount:
+                        print("• Discount: $" + str(round(line.discount, 2)))
+                    print("• Subtotal: $" + str(round(line.subtotal, 2)))
+                    print("─" * 60)
+                            
+                    # Ask to continue with current customer
+                    print("\n" + "─" * 60)
+                    print("🔄 CONTINUE WITH CURRENT CUSTOMER?")
+                    print("─" * 60)
+                    user_input = input("Want to sell more items to " + customer_name + "? (Y/N): ")
+                    if user_input.lower() != "y":
+                        keep_selling = False
+                except StockConflictError as e:
+                    #another cart took the stock first; the rest of the cart is still held
+                    print("⚠️ " + str(e))
+                except Exception as e:
+                    print("❌ An unexpected error occurred: "+   str(e))
+                    print("⚠️ The sale was cancelled.")
+                    cart.abandon()
+                    break 
+            
+            #checkout saves the whole cart in one transaction and queues the invoice
+            try:
+                quote = cart.checkout()
+            except (StockConflictError, LockTimeoutError) as e:
+                print("❌ The sale could not be saved: " + str(e))
+                print("⚠️ Stock was changed at another terminal. Please ring up the items again.")
+                quote = None
+            except SaveError as e:
+                print("❌ " + str(e))
+                print("⚠️ Nothing was sold. Please check the disk and ring up the items again.")
+                quote = None
+        finally:
+            #an abandoned cart gives its stock back at once
+            if not cart.checked_out:
+                cart.abandon()
                
-        if items_for_invoice:
+        if quote:
             print("\n" + "═" * 60)
             print("📊 FINALIZING TRANSACTION")
             print("═" * 60)
@@ -249,11 +509,11 @@ def sell_items():
                 print("🧾 GENERATING INVOICE")
                 print("─" * 60)
                 print("Customer: " +  customer_name)
-                print("Items Processed: " + str(len(items_for_invoice)))
+                print("Items Processed: " + str(len(quote.lines)))
+                print("Total: $" + str(round(quote.total, 2)))
                 
-                # Generate the invoice
-                sell_item_invoice(customer_name, items_for_invoice)
-                print("✅ Invoice generated successfully")
+                # The invoice is written in the background while the next customer is served
+                print("✅ Invoice queued")
                 
                 # Ask if want to sell to another customer
                 print("\n" + "─" * 60)
@@ -301,9 +561,11 @@ def buy_items():
 ║                              📦 STOCK MANAGEMENT 📦                           ║
 ╚═══════════════════════════════════════════════════════════════════════════════╝
 """)
-        display_all_products()
-        # store the data from the file to data variable
-        data = read_from_file()
+        display_products_overview()
+        # all items from this vendor are saved together at the end
+        inventory.begin()
+        # store the data from the inventory store to data variable
+        data = inventory.get_data()
         
         print("\n" + "─" * 50)
         print("📋 VENDOR INFORMATION")
@@ -323,8 +585,12 @@ def buy_items():
                 print("═" * 60)
                 print("• Enter existing ID to restock an item")
                 print("• Enter new ID to add a new product")
+                print("• Enter ?name, ?start*, ?brand:NAME or ?origin:COUNTRY to search")
                 print("─" * 60)
-                product_id_input = input("🔢 Product ID: ")
+                product_id_input = input("🔢 Product ID: ").strip()
+                if product_id_input.startswith('?'):
+                    search_products(product_id_input[1:])
+                    continue
                 
                 if not product_id_input.isdigit():
                     print("❌ Invalid Product ID. Please enter a number.")
@@ -335,16 +601,17 @@ def buy_items():
 
                 if product_id in data:
                     # --- RESTOCK EXISTING ITEM ---
-                    item_name = data[product_id][1]
+                    product = data[product_id]
+                    item_name = product.name
                     print("\n" + "─" * 60)
                     print("✅ RESTOCKING: Item #"+ str(product_id) + " - " + str(item_name))
                     print("─" * 60)
                     
                     # Display current information
-                    print("• Current Brand: "+ str(data[product_id][2]))
-                    print("• Current Quantity: "+ str(data[product_id][3]))
-                    print("• Current Cost: $" + str(data[product_id][4]))
-                    print("• Origin: " + str(data[product_id][5]))
+                    print("• Current Brand: "+ product.brand)
+                    print("• Current Quantity: "+ str(product.qty))
+                    print("• Current Cost: $" + str(product.cost))
+                    print("• Origin: " + product.origin)
                     
                     # Get new quantity with validation
                     while True:
@@ -359,18 +626,14 @@ def buy_items():
                         new_cost = input("💰 New Cost per Item: $")
                         try:
                             float_cost = float(new_cost)
-                            if float_cost >= 0:
+                            if float_cost >= 0 and math.isfinite(float_cost):
                                 break
                             print("❌ Invalid cost. Please enter a non-negative number.")
                         except ValueError:
                             print("❌ Invalid cost. Please enter a valid number.")
                     
-                    # Update quantity
-                    old_qty = int(data[product_id][3])
-                    new_total = old_qty + new_qty
-                    data[product_id][3] = str(new_total)
-                    # Update cost
-                    data[product_id][4] = str(float_cost)
+                    # Update quantity and cost
+                    inventory.restock(product_id, new_qty, float_cost)
                     #Add items to list for invoice
                     items_for_invoice.append({
                         'id': product_id,
@@ -405,21 +668,21 @@ def buy_items():
                         new_item_cost = input("💰 Cost per Item: $")
                         try:
                             float_cost = float(new_item_cost)
-                            if float_cost >= 0:
+                            if float_cost >= 0 and math.isfinite(float_cost):
                                 break
                             print("❌ Invalid cost. Please enter a non-negative number.")
                         except ValueError:
                             print("❌ Invalid cost. Please enter a valid number.")
                     
                     new_item_origin = input("🌍 Country of Origin: ")
-                    data[product_id] = [
-                        str(product_id),
+                    inventory.add_product(Product(
+                        product_id,
                         new_item_name,
                         new_item_brand,
-                        str(new_item_qty),
-                        str(float_cost),
+                        new_item_qty,
+                        float_cost,
                         new_item_origin
-                    ]
+                    ))
                     
                     # Add to invoice items
                     items_for_invoice.append({
@@ -430,8 +693,6 @@ def buy_items():
                     })
                     
                     print("✅ Successfully added " + str(new_item_qty) + " units of " + str(new_item_name))
-                #updating the data
-                save_to_inventory(data)
 
                 # Ask to continue with current vendor
                 print("\n" + "─" * 60)
@@ -449,7 +710,19 @@ def buy_items():
                 print("❌ An unexpected error occurred: " +  str(e))
 
         # --- Write updated data back to file and generate invoice ---
+        try:
+            inventory.commit()
+        except (StockConflictError, LockTimeoutError) as e:
+            print("❌ The purchase could not be saved: " + str(e))
+            print("⚠️ Stock was changed at another terminal. Please enter the items again.")
+            items_for_invoice = []
+        except SaveError as e:
+            # Nothing was saved, so nothing is recorded or invoiced
+            print("❌ " + str(e))
+            print("⚠️ Nothing was bought. Please check the disk and enter the items again.")
+            return
         if items_for_invoice:
+            record_lines('purchase', {vendor_name: items_for_invoice})
             print("\n" + "═" * 60)
             print("📊 FINALIZING TRANSACTION")
             print("═" * 60)
@@ -461,9 +734,9 @@ def buy_items():
                 print("Vendor: "+ str(vendor_name))
                 print("Items Processed: "+ str(len(items_for_invoice)))
                 
-                # Generate the invoice
-                buy_items_invoice(vendor_name, items_for_invoice)
-                print("✅ Invoice generated successfully")
+                # The invoice is written in the background while the next vendor is served
+                invoice_writer.submit('purchase', vendor_name, items_for_invoice)
+                print("✅ Invoice queued")
                 
                 # Ask if want to buy from another vendor
                 print("\n" + "─" * 60)
@@ -485,6 +758,184 @@ def buy_items():
             print("\n❗ No items were added or restocked.")
             return
         
+def process_sales(orders, generate_invoices=True):
+    """
+    Applies a batch of sales without any prompts.
+
+    Every line is checked against the same rules as sell_items: the product
+    must exist and there must be stock for the quantity and the free items
+    it earns under the pricing rules, which also price the line. The inventory is loaded
+    once and all accepted lines are saved together in a single commit.
+    Only once that save has succeeded are the lines added to the sales
+    ledger and one sales invoice written per customer.
+
+    Parameters:
+        orders (list): Dictionaries with 'customer', 'product_id' and 'quantity'
+        generate_invoices (bool): Write the customer invoices after saving
+
+    Returns:
+        dict: 'lines', 'applied', 'rejected' (list of (line number, reason))
+              and 'invoices' (number of invoices written)
+
+    Raises:
+        StockConflictError: If another terminal changed the stock so the batch no longer fits
+        LockTimeoutError: If the inventory stayed locked by another terminal
+        SaveError: If the inventory could not be written; nothing is recorded or invoiced
+    """
+    rejected = []
+    invoices = {}  # customer name -> items for invoice, in order of first appearance
+
+    inventory.begin()
+    try:
+        data = inventory.get_cached()
+        for line_no, order in enumerate(orders, start=1):
+            try:
+                customer_name = str(order['customer'])
+                product_id = int(order['product_id'])
+                quantity = int(order['quantity'])
+            except (KeyError, TypeError, ValueError) as e:
+                rejected.append((line_no, "Malformed order line: " + str(e)))
+                continue
+
+            product = data.get(product_id)
+            if product is None:
+                rejected.append((line_no, "Invalid product ID " + str(product_id)))
+                continue
+            quantity_for_sale = pricing.sellable_quantity(product)
+            if quantity <= 0 or quantity > quantity_for_sale:
+                rejected.append((line_no, "Cannot sell " + str(quantity) + " of product " +
+                                 str(product_id) + ", " + str(quantity_for_sale) + " available"))
+                continue
+
+            line = pricing.price_line(product, quantity)
+            inventory.adjust_stock(product_id, -(quantity + line.free_qty))
+            invoices.setdefault(customer_name, []).append(line.invoice_row())
+    except Exception:
+        inventory.rollback()
+        raise
+    # A failed save raises here, before anything is recorded
+    inventory.commit()
+
+    record_lines('sell', invoices)
+    if generate_invoices:
+        _write_batch_invoices(invoices, 'sell')
+    return _batch_summary(orders, rejected, len(invoices) if generate_invoices else 0)
+
+def process_restock(orders, generate_invoices=True):
+    """
+    Applies a batch of restocking orders without any prompts.
+
+    A line for an existing product adds its quantity and sets the new cost,
+    as buy_items does. A line for an unknown ID adds a new product and must
+    also give 'name', 'brand' and 'origin'. The inventory is loaded once and
+    all accepted lines are saved together in a single commit. Only once that
+    save has succeeded are the lines added to the ledger and one purchase
+    invoice written per vendor.
+
+    Parameters:
+        orders (list): Dictionaries with 'vendor', 'product_id', 'quantity', 'cost'
+                       and, for new products, 'name', 'brand' and 'origin'
+        generate_invoices (bool): Write the vendor invoices after saving
+
+    Returns:
+        dict: 'lines', 'applied', 'rejected' (list of (line number, reason))
+              and 'invoices' (number of invoices written)
+
+    Raises:
+        StockConflictError: If another terminal added one of the new product IDs first
+        LockTimeoutError: If the inventory stayed locked by another terminal
+        SaveError: If the inventory could not be written; nothing is recorded or invoiced
+    """
+    rejected = []
+    invoices = {}  # vendor name -> items for invoice, in order of first appearance
+
+    inventory.begin()
+    try:
+        data = inventory.get_cached()
+        for line_no, order in enumerate(orders, start=1):
+            try:
+                vendor_name = str(order['vendor'])
+                product_id = int(order['product_id'])
+                quantity = int(order['quantity'])
+                cost = float(order['cost'])
+            except (KeyError, TypeError, ValueError) as e:
+                rejected.append((line_no, "Malformed order line: " + str(e)))
+                continue
+            if quantity < 0 or cost < 0:
+                rejected.append((line_no, "Quantity and cost must not be negative"))
+                continue
+            if not math.isfinite(cost):
+                rejected.append((line_no, "Cost must be a finite number"))
+                continue
+
+            if product_id in data:
+                name = data[product_id].name
+                inventory.restock(product_id, quantity, cost)
+            else:
+                name = order.get('name')
+                if not name or not order.get('brand') or not order.get('origin') or quantity == 0:
+                    rejected.append((line_no, "New product " + str(product_id) +
+                                     " needs a name, brand, origin and a positive quantity"))
+                    continue
+                inventory.add_product(Product(product_id, name, order['brand'], quantity, cost, order['origin']))
+
+            invoices.setdefault(vendor_name, []).append({
+                'id': product_id,
+                'name': name,
+                'qty': quantity,
+                'cost': cost
+            })
+    except Exception:
+        inventory.rollback()
+        raise
+    # A failed save raises here, before anything is recorded
+    inventory.commit()
+
+    record_lines('purchase', invoices)
+    if generate_invoices:
+        _write_batch_invoices(invoices, 'purchase')
+    return _batch_summary(orders, rejected, len(invoices) if generate_invoices else 0)
+
+def _write_batch_invoices(invoices, kind):
+    """
+    Writes one invoice per customer or vendor of a batch.
+
+    The invoice numbers are reserved as one block from the invoice counter.
+
+    Parameters:
+        invoices (dict): Party name -> list of invoice items
+        kind (str): "sell" or "purchase"
+    """
+    files = write_invoices(kind, [(party_name, items, None) for party_name, items in invoices.items()])
+    if files:
+        print("✅ " + str(len(files)) + " invoices generated, " + files[0] + " to " + files[-1])
+
+def _batch_summary(orders, rejected, invoice_count):
+    """
+    Prints and returns the outcome of a batch run.
+
+    Parameters:
+        orders (list): The order lines that were processed
+        rejected (list): (line number, reason) for each line that was not applied
+        invoice_count (int): Number of invoices written
+
+    Returns:
+        dict: 'lines', 'applied', 'rejected' and 'invoices'
+    """
+    for line_no, reason in rejected[:20]:
+        print("⚠️ Line " + str(line_no) + ": " + reason)
+    if len(rejected) > 20:
+        print("⚠️ ... and " + str(len(rejected) - 20) + " more rejected lines")
+    applied = len(orders) - len(rejected)
+    print("✅ Applied " + str(applied) + " of " + str(len(orders)) + " order lines, " +
+          str(invoice_count) + " invoices written")
+    return {
+        'lines': len(orders),
+        'applied': applied,
+        'rejected': rejected,
+        'invoices': invoice_count
+    }
+
 def check_digit_(string):
     is_digit=False
     for each in string:
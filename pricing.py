@@ -0,0 +1,322 @@
+"""
+WeCare Inventory Management System - Pricing Module
+
+This module decides what a customer pays: how many items of a product can
+be sold, how many are given away free, any discount, and the tax. The rules
+are data rather than code. They are read from pricing.json when it exists,
+and otherwise the shop's standing offer applies: "Buy 3 Get 1 Free" on
+everything, with 13% tax.
+
+pricing.json holds a default tax rate and a list of rules:
+    {
+      "tax_rate": 0.13,
+      "rules": [
+        {"type": "multi_buy", "buy": 2, "free": 1, "brand": "Belif"},
+        {"type": "multi_buy", "buy": 3, "free": 1},
+        {"type": "percent_off", "percent": 10, "origin": "Japan"},
+        {"type": "tax", "rate": 0.05, "product_id": 7}
+      ]
+    }
+A rule applies to every product unless it names a "brand", "origin" or
+"product_id", in which case it applies only to products matching all of
+them. For each type the first rule that applies wins, so more specific
+rules go first.
+
+The rules that apply to a product are worked out once and cached on the
+rule set, so pricing a large batch only matches rules once per product.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import json
+
+PRICING_FILE = 'pricing.json'
+
+DEFAULT_TAX_RATE = 0.13
+
+DEFAULT_RULES = {
+    'tax_rate': DEFAULT_TAX_RATE,
+    'rules': [
+        {'type': 'multi_buy', 'buy': 3, 'free': 1},
+    ],
+}
+
+RULE_TYPES = ('multi_buy', 'percent_off', 'tax')
+
+# Rule fields that limit which products a rule applies to
+SCOPE_FIELDS = ('brand', 'origin', 'product_id')
+
+class ProductTerms:
+    """
+    The pricing rules that apply to one product.
+
+    Attributes:
+        buy (int): Items to buy to earn free items; 0 when there is no multi-buy offer
+        free (int): Items given free for every `buy` bought
+        percent_off (float): Discount on the price, in percent
+        tax_rate (float): Tax charged on the discounted price
+        label (str): Description of the offers, shown on the invoice
+    """
+
+    __slots__ = ('buy', 'free', 'percent_off', 'tax_rate', 'label')
+
+    def __init__(self, buy, free, percent_off, tax_rate):
+        self.buy = buy
+        self.free = free
+        self.percent_off = percent_off
+        self.tax_rate = tax_rate
+        offers = []
+        if buy and free:
+            offers.append("Buy " + str(buy) + " Get " + str(free) + " Free")
+        if percent_off:
+            offers.append(format(percent_off, 'g') + "% off")
+        self.label = ", ".join(offers) or "no offer"
+
+    def free_items(self, qty):
+        """
+        Returns the free items earned by buying qty items.
+
+        Parameters:
+            qty (int): Items bought
+
+        Returns:
+            int: Items given free
+        """
+        return (qty // self.buy) * self.free if self.buy else 0
+
+    def sellable(self, available):
+        """
+        Returns the most items that can be sold from the stock on hand,
+        leaving enough stock for the free items they earn.
+
+        Parameters:
+            available (int): Items in stock
+
+        Returns:
+            int: Largest quantity that can be sold
+        """
+        if not self.buy or not self.free:
+            return available
+        # Whole offers first; of the rest, stop one short of earning free items we do not have
+        offers, rest = divmod(available, self.buy + self.free)
+        return offers * self.buy + min(rest, self.buy - 1)
+
+class LineQuote:
+    """
+    The price of one cart line.
+
+    Attributes:
+        product_id (int): Product sold
+        name (str): Product name
+        brand (str): Brand name
+        qty (int): Items bought
+        free_qty (int): Items given free
+        unit_cost (float): Price per item before discount
+        discount (float): Amount taken off by percentage discounts
+        subtotal (float): Price of the line after discount, before tax
+        tax (float): Tax on the line
+        label (str): Offers applied
+    """
+
+    __slots__ = ('product_id', 'name', 'brand', 'qty', 'free_qty', 'unit_cost', 'discount', 'subtotal',
+                 'tax', 'label')
+
+    def __init__(self, product, qty, terms):
+        self.product_id = product.product_id
+        self.name = product.name
+        self.brand = product.brand
+        self.qty = qty
+        self.free_qty = terms.free_items(qty)
+        self.unit_cost = product.cost
+        gross = qty * product.cost
+        self.discount = gross * terms.percent_off / 100
+        self.subtotal = gross - self.discount
+        self.tax = self.subtotal * terms.tax_rate
+        self.label = terms.label
+
+    def invoice_row(self):
+        """
+        Returns the line as a sales invoice row.
+
+        Returns:
+            list: [product_id, name, qty, free_qty, subtotal, unit_cost, brand, tax, label]
+        """
+        return [self.product_id, self.name, self.qty, self.free_qty, self.subtotal, self.unit_cost,
+                self.brand, self.tax, self.label]
+
+class CartQuote:
+    """
+    The price of a whole cart.
+
+    Attributes:
+        lines (list): One LineQuote per cart line
+        subtotal (float): Sum of the line subtotals
+        tax (float): Sum of the line taxes
+        total (float): subtotal + tax
+        units (int): Items leaving the shelf, free items included
+    """
+
+    __slots__ = ('lines', 'subtotal', 'tax', 'total', 'units')
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.subtotal = sum([line.subtotal for line in lines])
+        self.tax = sum([line.tax for line in lines])
+        self.total = self.subtotal + self.tax
+        self.units = sum([line.qty + line.free_qty for line in lines])
+
+    def invoice_rows(self):
+        """
+        Returns the cart as sales invoice rows.
+
+        Returns:
+            list: One row per line, see LineQuote.invoice_row()
+        """
+        return [line.invoice_row() for line in self.lines]
+
+class PricingRules:
+    """
+    A validated rule set with a cache of the terms worked out per product.
+
+    Attributes:
+        tax_rate (float): Tax rate for products no tax rule applies to
+        rules (list): The rules, in order of precedence
+    """
+
+    def __init__(self, config):
+        self.tax_rate = float(config.get('tax_rate', DEFAULT_TAX_RATE))
+        self.rules = [_check_rule(rule) for rule in config.get('rules', [])]
+        self._terms = {}
+        # Products on the same offers share one ProductTerms
+        self._shared_terms = {}
+
+    def terms_for(self, product):
+        """
+        Returns the terms that apply to a product, matching the rules only once.
+
+        The cache is keyed on the product's ID, brand and origin, so a product
+        whose brand or origin is changed is matched again.
+
+        Parameters:
+            product (Product): The product
+
+        Returns:
+            ProductTerms: The product's terms
+        """
+        key = (product.product_id, product.brand, product.origin)
+        terms = self._terms.get(key)
+        if terms is None:
+            found = {}
+            for rule in self.rules:
+                if rule['type'] not in found and _applies(rule, product):
+                    found[rule['type']] = rule
+            multi_buy = found.get('multi_buy', {})
+            values = (int(multi_buy.get('buy', 0)), int(multi_buy.get('free', 0)),
+                      float(found.get('percent_off', {}).get('percent', 0)),
+                      float(found.get('tax', {}).get('rate', self.tax_rate)))
+            terms = self._shared_terms.get(values)
+            if terms is None:
+                terms = self._shared_terms[values] = ProductTerms(*values)
+            self._terms[key] = terms
+        return terms
+
+    def sellable_quantity(self, product, available=None):
+        """
+        Returns how many items of a product can be sold.
+
+        Parameters:
+            product (Product): The product
+            available (int): Stock to sell from; defaults to the product's quantity
+
+        Returns:
+            int: Largest quantity that can be sold
+        """
+        return self.terms_for(product).sellable(product.qty if available is None else available)
+
+    def price_line(self, product, qty):
+        """
+        Prices one cart line.
+
+        Parameters:
+            product (Product): The product
+            qty (int): Items bought
+
+        Returns:
+            LineQuote: The priced line
+        """
+        return LineQuote(product, qty, self.terms_for(product))
+
+    def price_cart(self, lines):
+        """
+        Prices a whole cart in one call.
+
+        Parameters:
+            lines (iterable): (Product, qty) pairs
+
+        Returns:
+            CartQuote: The priced cart
+        """
+        return CartQuote([self.price_line(product, qty) for product, qty in lines])
+
+def _check_rule(rule):
+    """
+    Validates one rule from the configuration.
+
+    Parameters:
+        rule (dict): The rule
+
+    Returns:
+        dict: The same rule
+
+    Raises:
+        ValueError: If the rule has an unknown type or invalid values
+    """
+    rule_type = rule.get('type')
+    if rule_type not in RULE_TYPES:
+        raise ValueError("unknown rule type " + repr(rule_type))
+    if rule_type == 'multi_buy' and (int(rule.get('buy', 0)) < 1 or int(rule.get('free', 0)) < 0):
+        raise ValueError("multi_buy needs buy >= 1 and free >= 0")
+    if rule_type == 'percent_off' and not 0 <= float(rule.get('percent', -1)) <= 100:
+        raise ValueError("percent_off needs a percent between 0 and 100")
+    if rule_type == 'tax' and float(rule.get('rate', -1)) < 0:
+        raise ValueError("tax needs a rate of 0 or more")
+    return rule
+
+def _applies(rule, product):
+    """
+    Checks whether a rule's scope covers a product.
+
+    Parameters:
+        rule (dict): The rule
+        product (Product): The product
+
+    Returns:
+        bool: True if every scope field the rule names matches the product
+    """
+    for field in SCOPE_FIELDS:
+        if field in rule and rule[field] != getattr(product, field):
+            return False
+    return True
+
+def load_rules(path=PRICING_FILE):
+    """
+    Reads the pricing rules, falling back to the standing offer.
+
+    Parameters:
+        path (str): Rules file
+
+    Returns:
+        PricingRules: The rule set
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return PricingRules(json.load(f))
+    except FileNotFoundError:
+        return PricingRules(DEFAULT_RULES)
+    except (ValueError, TypeError, AttributeError) as e:
+        print("❌ Error in " + path + ", using the standard offer instead: " + str(e))
+        return PricingRules(DEFAULT_RULES)
+
+# The rule set used for every sale
+pricing = load_rules()
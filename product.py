@@ -0,0 +1,110 @@
+"""
+WeCare Inventory Management System - Product Module
+
+This module defines the Product record used for every inventory entry.
+Rows from the data file are parsed into Product objects once, when they are
+loaded, so the rest of the system works with a real integer quantity and
+float cost instead of re-converting strings on every access.
+
+Products use __slots__ to keep per-row memory low on large catalogs, and the
+brand and origin strings are interned because they repeat across many rows.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import gc
+import sys
+
+from codec import format_row
+
+class Product:
+    """
+    A single inventory entry.
+
+    Attributes:
+        product_id (int): Unique product ID
+        name (str): Product name
+        brand (str): Brand name
+        qty (int): Quantity in stock
+        cost (float): Cost per item (the retail price shown is double this)
+        origin (str): Country of origin
+    """
+
+    __slots__ = ('product_id', 'name', 'brand', 'qty', 'cost', 'origin')
+
+    def __init__(self, product_id, name, brand, qty, cost, origin):
+        self.product_id = product_id
+        self.name = name
+        self.brand = sys.intern(brand)
+        self.qty = qty
+        self.cost = cost
+        self.origin = sys.intern(origin)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """
+        Builds a Product from the six fields of a data file row.
+
+        Parameters:
+            fields (list): [ID, Product Name, Brand, Quantity, Price, Country] as strings,
+                           as codec.split_row() returns them
+
+        Returns:
+            Product: The parsed product
+
+        Raises:
+            ValueError: If the row does not have six fields or a number is malformed
+        """
+        if len(fields) != 6:
+            raise ValueError("expected 6 fields, got " + str(len(fields)))
+        return cls(
+            int(fields[0]),
+            fields[1].strip(),
+            fields[2].strip(),
+            int(fields[3]),
+            float(fields[4]),
+            fields[5].strip()
+        )
+
+    def copy(self):
+        """
+        Returns an independent copy of the product.
+
+        Returns:
+            Product: A new record with the same field values
+        """
+        return Product(self.product_id, self.name, self.brand, self.qty, self.cost, self.origin)
+
+    def to_row(self):
+        """
+        Formats the product as a data file row, without the trailing newline.
+
+        Returns:
+            str: ID,Product Name,Brand,Quantity,Price,Country, quoted as the codec module does
+        """
+        return format_row(self)
+
+    def __repr__(self):
+        return 'Product(' + self.to_row() + ')'
+
+def products_from_columns(ids, names, brands, qtys, costs, origins):
+    """
+    Builds products from parallel columns of their fields.
+
+    Parameters:
+        ids, names, brands, qtys, costs, origins (list): One field of every
+            product, already converted, in the same order
+
+    Returns:
+        dict: Product ID -> Product, in column order; the last of a repeated ID wins
+    """
+    # Building a million products sets off the cycle collector over and over,
+    # though none of them can form a cycle; it costs more than the building
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return dict(zip(ids, map(Product, ids, names, brands, qtys, costs, origins)))
+    finally:
+        if collecting:
+            gc.enable()
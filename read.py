@@ -3,48 +3,328 @@ WeCare Inventory Management System - Read Module
 
 This module handles reading inventory data from the data file and preparing it for use
 within the system. It processes data from a comma-separated text file where each line
-represents a product entry with the first field being the product ID.
+represents a product entry with the first field being the product ID. Rows are
+split by the codec module, so quoted names and brands holding commas are read whole.
 
 Features:
-- Reads structured product data from data/data.txt
+- Reads structured product data from the products.txt snapshot (DATA_FILE)
+- Replays the append-only transaction log, products.log (LOG_FILE), on top of the snapshot
+- Loads the snapshot from its binary cache when that matches the data file
+- Parses very large data files in parallel, one chunk of lines per CPU
+- Streams products one at a time for listings and scans of large catalogs
 - Validates data format during import
 - Handles file access errors gracefully
 - Returns data in a dictionary structure for easy lookup by ID
+- Reads bulk order files (CSV or JSON Lines) for batch sales and restocking
 
 Author: Rakshak Sigdel
 Version: 1.0
 """
 
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+from catalog_cache import file_key, load_cache, write_cache
+from codec import ROW_FIELDS, decode_rows, split_row
+from product import Product, products_from_columns
+
+# Snapshot of the whole inventory and the log of changes made since it was written
+DATA_FILE = 'products.txt'
+LOG_FILE = 'products.log'
+
+# Data files at least this large are parsed by a pool of processes; below
+# it, starting the pool costs more than it saves
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+@metrics.timed('read_from_file')
 def read_from_file():
     """
     Reads product data from the data file.
-    
+
     This function reads data from the data file and stores it in a dictionary
-    with ID as the key and product details as values.
-    
+    with ID as the key and a Product record as value. Any changes recorded in
+    the transaction log since the last compaction are applied as well. When a
+    product ID appears more than once, the last row wins.
+
+    The products come out in the order iter_products() yields them: changed
+    products keep their place and products added since the last compaction
+    come last.
+
     Returns:
-        dict: Dictionary containing inventory data with ID as key
+        dict: Dictionary mapping product ID to Product
     """
+    changes = read_log_changes()
     # Dictionary to store inventory data with ID as key
-    data = {}
+    data = read_snapshot()
+    for product_id, product in changes.items():
+        if product is None:
+            data.pop(product_id, None)
+        else:
+            data[product_id] = product
+    if metrics.enabled:
+        metrics.add('read_from_file', rows=len(data),
+                    bytes_read=metrics.file_size(DATA_FILE) + metrics.file_size(LOG_FILE))
+    return data
+
+def read_snapshot(workers=None):
+    """
+    Reads the data file into a dictionary, without the transaction log.
 
+    The parsed snapshot is taken from products.cache when the cache was made
+    from the data file as it is now. Otherwise the text is parsed, in
+    parallel if the file is at least PARALLEL_MIN_BYTES, and the result is
+    cached for the next load.
+
+    Parameters:
+        workers (int): Processes to parse with; defaults to the number of CPUs
+
+    Returns:
+        dict: Dictionary mapping product ID to Product
+    """
     try:
-        # Read data from file and store in dictionary
-        with open('products.txt', 'r') as f:
-            for line in f:
-                if line.strip():  # Skip empty lines
-                    fields = line.strip().split(',')
-                    if fields:
-                        try:
-                            # Use the first field as ID
-                            id_value = int(fields[0])
-                            # Store all fields the data dictionary
-                            data[id_value] = fields
-                        except ValueError:
-                            print(f"⚠️ Invalid ID format in line: {line.strip()}")
+        key = file_key(os.stat(DATA_FILE))
+    except FileNotFoundError:
+        print("⚠️ Data file not found. Starting with an empty inventory.")
+        return {}
+    except OSError as e:
+        print("❌ Error reading data file: " + str(e))
+        return {}
+
+    data = load_cache(key)
+    if data is not None:
+        return data
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    data = {}
+    try:
+        parsed = None
+        if workers > 1 and key[0] >= PARALLEL_MIN_BYTES:
+            parsed = parse_in_parallel(DATA_FILE, workers)
+        if parsed is not None:
+            data = parsed
+        else:
+            with open(DATA_FILE, 'r') as f:
+                data = _merge_chunks([decode_rows(f)])
+        # Only a file that did not change while it was read may be cached
+        if file_key(os.stat(DATA_FILE)) == key:
+            write_cache(data, key)
     except FileNotFoundError:
         print("⚠️ Data file not found. Starting with an empty inventory.")
     except Exception as e:
-        print("❌ Error reading data file: " +  str({e}))
-    
+        print("❌ Error reading data file: " + str(e))
     return data
+
+def parse_in_parallel(path, workers):
+    """
+    Parses a data file in chunks, one per worker process.
+
+    The file is cut into byte ranges that start at the beginning of a line,
+    and each range is parsed into columns by its own process. The columns
+    are merged in file order, so a product ID that appears more than once
+    keeps its last row, as when the file is read line by line. Invalid rows
+    are reported with their line numbers in the file.
+
+    Parameters:
+        path (str): Data file
+        workers (int): Number of processes
+
+    Returns:
+        dict: Dictionary mapping product ID to Product, or None if no process
+              pool could be started here
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        bounds = [0]
+        for n in range(1, workers):
+            # A range starts just after the first newline at or past its share of the file
+            f.seek(max(size * n // workers - 1, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    with open(path, 'r') as f:
+        encoding = f.encoding
+    chunks = [(path, start, end, encoding) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+    try:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            return _merge_chunks(pool.map(_parse_chunk, chunks))
+    except (OSError, BrokenProcessPool):
+        return None
+
+def _merge_chunks(chunks):
+    """
+    Builds the products of consecutive chunks of the data file, in order.
+
+    Parameters:
+        chunks (iterable): Results of codec.decode_rows() for consecutive
+                           chunks of lines, starting at the first
+
+    Returns:
+        dict: Dictionary mapping product ID to Product; the last of a repeated ID wins
+    """
+    data = {}
+    lines_before = 0
+    for line_count, ids, names, brands, qtys, costs, origins, invalid in chunks:
+        for line_no, line in invalid:
+            # Parsed again here only to report the problem in the usual words
+            parse_product_line(line, lines_before + line_no)
+        data.update(products_from_columns(ids, names, brands, qtys, costs, origins))
+        lines_before += line_count
+    return data
+
+def _parse_chunk(chunk):
+    """
+    Parses one byte range of a data file into columns; runs in a worker process.
+
+    Parameters:
+        chunk (tuple): (path, start, end, encoding); start and end fall at
+                       the beginning of a line or the end of the file
+
+    Returns:
+        tuple: The range's rows as codec.decode_rows() returns them
+    """
+    path, start, end, encoding = chunk
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode(encoding).split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return decode_rows(lines)
+
+def iter_products():
+    """
+    Yields the products of the inventory one at a time.
+
+    The data file is read line by line and each row is parsed into a Product
+    only when it is needed, so a catalog of any size can be listed or scanned
+    in constant memory. Changes from the transaction log are merged in as the
+    rows go past: changed products are yielded with their new values, removed
+    ones are skipped, and products added since the last compaction come last.
+
+    Rows are yielded as they appear, so a product ID repeated in the data file
+    is yielded more than once; read_from_file() keeps the last one.
+
+    Yields:
+        Product: The next product in the inventory
+    """
+    # The log is compacted at LOG_COMPACT_BYTES, so its changes fit in memory
+    changes = read_log_changes()
+    merged = set()
+
+    try:
+        with open(DATA_FILE, 'r') as f:
+            for line_no, line in enumerate(f, start=1):
+                product = parse_product_line(line, line_no)
+                if product is None:
+                    continue
+                if product.product_id in changes:
+                    merged.add(product.product_id)
+                    product = changes[product.product_id]
+                    if product is None:
+                        continue
+                yield product
+    except FileNotFoundError:
+        print("⚠️ Data file not found. Starting with an empty inventory.")
+    except Exception as e:
+        print("❌ Error reading data file: " + str(e))
+
+    for product_id, product in changes.items():
+        if product is not None and product_id not in merged:
+            yield product
+
+def parse_product_line(line, line_no=None):
+    """
+    Parses one line of the data file, reporting rows that cannot be used.
+
+    Parameters:
+        line (str): A line of the data file
+        line_no (int): Line number, given in the warning for an invalid row
+
+    Returns:
+        Product: The parsed product, or None for a blank or invalid line
+    """
+    if not line.strip():  # Skip empty lines
+        return None
+    where = "line" if line_no is None else "line " + str(line_no)
+    try:
+        # Use the first field as ID; it is a number, so it is never quoted
+        int(line.split(',', 1)[0])
+    except ValueError:
+        print(f"⚠️ Invalid ID format in {where}: {line.strip()}")
+        return None
+    try:
+        # Parse quantity and cost once, here, instead of on every access
+        return Product.from_fields(split_row(line))
+    except ValueError as e:
+        print(f"⚠️ Invalid product data in {where} ({e}): {line.strip()}")
+        return None
+
+def read_log_changes():
+    """
+    Reads the transaction log into the net change for each product.
+
+    Each line of the log is either a full product row prefixed with "S,"
+    (the product was added or changed), quoted as in the data file, or a
+    product ID prefixed with "D," (the product sold out and was removed).
+    Records are read in order, so the last record for a product wins.
+
+    Returns:
+        dict: Product ID -> Product with its latest values, or None if it was removed
+    """
+    changes = {}
+    try:
+        with open(LOG_FILE, 'r') as f:
+            for line in f:
+                kind, _, record = line.partition(',')
+                try:
+                    if not line.endswith('\n'):
+                        # A torn final write leaves a partial record behind
+                        print(f"⚠️ Skipping incomplete log record: {line.strip()}")
+                        continue
+                    fields = split_row(record) if kind == 'S' else []
+                    if len(fields) == ROW_FIELDS:
+                        product = Product.from_fields(fields)
+                        changes[product.product_id] = product
+                    elif kind == 'D' and ',' not in record:
+                        changes[int(record)] = None
+                    elif line.strip():
+                        print(f"⚠️ Invalid log record: {line.strip()}")
+                except ValueError:
+                    print(f"⚠️ Invalid data in log record: {line.strip()}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("❌ Error reading transaction log: " + str(e))
+
+    return changes
+
+def read_orders(path):
+    """
+    Reads a bulk order file for batch sales or restocking.
+
+    A file ending in .jsonl holds one JSON object per line. Any other file is
+    read as CSV with a header row naming the columns, for example:
+        customer,product_id,quantity
+        vendor,product_id,quantity,cost,name,brand,origin
+
+    Parameters:
+        path (str): Path of the order file
+
+    Returns:
+        list: One dictionary per order line, keyed by column name
+    """
+    orders = []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    orders.append(json.loads(line))
+        else:
+            for row in csv.DictReader(f):
+                orders.append(row)
+    return orders
@@ -0,0 +1,386 @@
+"""
+WeCare Inventory Management System - Reports Module
+
+This module computes sales and purchase reports from the structured ledger
+in ledger.py. The ledger is loaded as columns in one read and every report
+is a handful of vectorised NumPy operations over those columns (masks,
+bincount and sorting), with no Python loop over the ledger rows, so reports
+over millions of ledger lines take seconds.
+
+It also produces the inventory report: stock valuation, low-stock alerts
+and stock and sell-through by brand and origin. All of these are gathered
+in a single pass over the products, which can be streamed from storage, so
+the catalog is walked once however many figures are asked for.
+
+    python reports.py summary|daily|products|customers [--from YYYY-MM-DD]
+                      [--to YYYY-MM-DD] [--purchases] [--top N]
+    python reports.py inventory [--threshold N] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+NumPy is required for the ledger reports and for sell-through; the rest of
+the inventory report, and the rest of the system, runs without it.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import heapq
+import sys
+from datetime import datetime, timedelta
+
+from inventory import get_backend
+from ledger import EPOCH, KIND_CODES, sales_ledger
+from locking import inventory_lock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SECONDS_PER_DAY = 86400
+
+# Products with this many units or fewer are reported as low on stock
+LOW_STOCK_THRESHOLD = 10
+
+# Low-stock products listed in the report; all of them are counted
+LOW_STOCK_LIMIT = 20
+
+def load_ledger(kind='sell', start=None, end=None, ledger=sales_ledger):
+    """
+    Loads the ledger lines of one kind within a date range.
+
+    Parameters:
+        kind (str): "sell" or "purchase"
+        start (str): First day to include, as YYYY-MM-DD
+        end (str): Last day to include, as YYYY-MM-DD
+        ledger (Ledger): Ledger to read
+
+    Each field is copied out of the packed records into its own contiguous
+    array, which the reports then work on.
+
+    Returns:
+        dict: Field name -> NumPy array of that column for the matching lines
+    """
+    records = ledger.read_columns()
+    mask = records['kind'] == KIND_CODES[kind]
+    if start is not None:
+        mask &= records['timestamp'] >= _day_start(start)
+    if end is not None:
+        mask &= records['timestamp'] < _day_start(end) + SECONDS_PER_DAY
+    if mask.all():
+        return {name: np.ascontiguousarray(records[name]) for name in records.dtype.names}
+    return {name: records[name][mask] for name in records.dtype.names}
+
+def _day_start(day):
+    """
+    Converts a date to the ledger's clock.
+
+    Parameters:
+        day (str): Date as YYYY-MM-DD
+
+    Returns:
+        float: Ledger timestamp of midnight at the start of that day
+    """
+    return (datetime.strptime(day, '%Y-%m-%d') - EPOCH).total_seconds()
+
+def summary(columns):
+    """
+    Totals a set of ledger lines.
+
+    Parameters:
+        columns (dict): Ledger columns from load_ledger()
+
+    Returns:
+        dict: 'lines', 'qty', 'free_qty', 'revenue', 'tax' and 'total'
+    """
+    revenue = float(columns['total'].sum())
+    tax = float(columns['tax'].sum())
+    return {
+        'lines': len(columns['qty']),
+        'qty': int(columns['qty'].sum()),
+        'free_qty': int(columns['free_qty'].sum()),
+        'revenue': revenue,
+        'tax': tax,
+        'total': revenue + tax,
+    }
+
+def daily_totals(columns):
+    """
+    Adds up the ledger lines of each day.
+
+    Parameters:
+        columns (dict): Ledger columns from load_ledger()
+
+    Returns:
+        list: (date, lines, qty, revenue, tax) tuples, oldest day first
+    """
+    days, group = np.unique((columns['timestamp'] // SECONDS_PER_DAY).astype(np.int64), return_inverse=True)
+    lines = np.bincount(group, minlength=len(days))
+    qty = np.bincount(group, weights=columns['qty'], minlength=len(days))
+    revenue = np.bincount(group, weights=columns['total'], minlength=len(days))
+    tax = np.bincount(group, weights=columns['tax'], minlength=len(days))
+    return [((EPOCH + timedelta(days=int(days[i]))).strftime('%Y-%m-%d'), int(lines[i]), int(qty[i]),
+             float(revenue[i]), float(tax[i])) for i in range(len(days))]
+
+def top_products(columns, top=10):
+    """
+    Ranks the products by quantity sold (or bought).
+
+    Parameters:
+        columns (dict): Ledger columns from load_ledger()
+        top (int): How many products to return
+
+    Returns:
+        list: (product_id, qty, free_qty, revenue) tuples, largest quantity first
+    """
+    products, group = np.unique(columns['product_id'], return_inverse=True)
+    qty = np.bincount(group, weights=columns['qty'], minlength=len(products))
+    free_qty = np.bincount(group, weights=columns['free_qty'], minlength=len(products))
+    revenue = np.bincount(group, weights=columns['total'], minlength=len(products))
+    order = _largest(qty, top)
+    return [(int(products[i]), int(qty[i]), int(free_qty[i]), float(revenue[i])) for i in order]
+
+def top_parties(columns, parties, top=10):
+    """
+    Ranks the customers (or vendors) by amount spent before tax.
+
+    Parameters:
+        columns (dict): Ledger columns from load_ledger()
+        parties (list): Party names indexed by party number, from Ledger.parties()
+        top (int): How many parties to return
+
+    Returns:
+        list: (name, lines, revenue) tuples, largest amount first
+    """
+    lines = np.bincount(columns['party'], minlength=len(parties))
+    revenue = np.bincount(columns['party'], weights=columns['total'], minlength=len(parties))
+    order = [i for i in _largest(revenue, top) if lines[i]]
+    return [(parties[i] if i < len(parties) else '#' + str(i), int(lines[i]), float(revenue[i])) for i in order]
+
+def _largest(values, top):
+    """
+    Returns the positions of the largest values, largest first.
+
+    Only the top entries are sorted, after argpartition has picked them out.
+
+    Parameters:
+        values (numpy.ndarray): Values to rank
+        top (int): How many positions to return
+
+    Returns:
+        numpy.ndarray: Positions into values
+    """
+    if len(values) > top:
+        candidates = np.argpartition(-values, top - 1)[:top]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+def sold_units(start=None, end=None, ledger=sales_ledger):
+    """
+    Adds up the units sold of each product from the ledger.
+
+    Parameters:
+        start (str): First day to include, as YYYY-MM-DD
+        end (str): Last day to include, as YYYY-MM-DD
+        ledger (Ledger): Ledger to read
+
+    Returns:
+        dict: Product ID -> units sold, or None if NumPy is not installed
+    """
+    if np is None:
+        return None
+    columns = load_ledger('sell', start, end, ledger)
+    products, group = np.unique(columns['product_id'], return_inverse=True)
+    units = np.bincount(group, weights=columns['qty'], minlength=len(products))
+    return dict(zip(products.tolist(), units.astype(np.int64).tolist()))
+
+def inventory_report(products, threshold=LOW_STOCK_THRESHOLD, brand_thresholds=None, sold=None,
+                     low_stock_limit=LOW_STOCK_LIMIT):
+    """
+    Gathers every inventory figure in one pass over the products.
+
+    The products are only iterated, never stored, so a stream from
+    iter_products() keeps memory use to the size of the report.
+
+    Parameters:
+        products (iterable): Products to report on
+        threshold (int): Stock level at or below which a product is low
+        brand_thresholds (dict): Brand -> threshold, overriding the default for that brand
+        sold (dict): Product ID -> units sold, from sold_units(); None leaves
+                     the sell-through figures at zero
+        low_stock_limit (int): How many of the lowest-stocked products to list
+
+    Returns:
+        dict: 'products', 'units', 'cost_value', 'retail_value',
+              'low_stock_count', 'low_stock' (list of Products, lowest
+              stock first), and 'brands' and 'origins', each mapping a name
+              to [products, units, cost_value, units_sold]
+    """
+    if brand_thresholds is None:
+        brand_thresholds = {}
+    if sold is None:
+        sold = {}
+    count = 0
+    units = 0
+    cost_value = 0.0
+    low_count = 0
+    low_heap = []  # (-qty, -id, count, product): the largest stock on top, dropped first
+    brands = {}
+    origins = {}
+    for product in products:
+        qty = product.qty
+        value = qty * product.cost
+        units_sold = sold.get(product.product_id, 0)
+        count += 1
+        units += qty
+        cost_value += value
+
+        if qty <= brand_thresholds.get(product.brand, threshold):
+            low_count += 1
+            entry = (-qty, -product.product_id, count, product)
+            if len(low_heap) < low_stock_limit:
+                heapq.heappush(low_heap, entry)
+            elif entry[:2] > low_heap[0][:2]:
+                heapq.heapreplace(low_heap, entry)
+
+        for groups, key in ((brands, product.brand), (origins, product.origin)):
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, qty, value, units_sold]
+            else:
+                group[0] += 1
+                group[1] += qty
+                group[2] += value
+                group[3] += units_sold
+
+    return {
+        'products': count,
+        'units': units,
+        'cost_value': cost_value,
+        # The product table shows cost x 2 as the retail price
+        'retail_value': cost_value * 2,
+        'low_stock_count': low_count,
+        'low_stock': [entry[3] for entry in sorted(low_heap, reverse=True)],
+        'brands': brands,
+        'origins': origins,
+    }
+
+def sell_through(units_sold, units_left):
+    """
+    Share of the stock that was sold: sold / (sold + still on hand).
+
+    Parameters:
+        units_sold (int): Units sold in the period
+        units_left (int): Units still in stock
+
+    Returns:
+        float: Sell-through between 0 and 1
+    """
+    total = units_sold + units_left
+    return units_sold / total if total else 0.0
+
+def print_inventory_report(report, top=20):
+    """
+    Prints an inventory report built by inventory_report().
+
+    Parameters:
+        report (dict): The report
+        top (int): Brands and origins listed, largest stock value first
+    """
+    lines = [
+        "═" * 70,
+        "📊 INVENTORY VALUATION",
+        "═" * 70,
+        "Products: " + str(report['products']) + "   Units in stock: " + str(report['units']),
+        "Value at cost:   $" + format(report['cost_value'], '.2f'),
+        "Value at retail: $" + format(report['retail_value'], '.2f'),
+        "",
+        "⚠️ LOW STOCK: " + str(report['low_stock_count']) + " products",
+    ]
+    for product in report['low_stock']:
+        lines.append("  #" + str(product.product_id).ljust(8) + product.name[:30].ljust(31) +
+                     product.brand[:16].ljust(17) + str(product.qty).rjust(8))
+    if report['low_stock_count'] > len(report['low_stock']):
+        lines.append("  ... and " + str(report['low_stock_count'] - len(report['low_stock'])) + " more")
+    for title, groups in (("BY BRAND", report['brands']), ("BY ORIGIN", report['origins'])):
+        lines.append("")
+        lines.append(title.ljust(24) + "Products     Units      Value at cost  Sell-through")
+        ranked = heapq.nlargest(top, groups.items(), key=lambda item: item[1][2])
+        for name, (count, units, value, units_sold) in ranked:
+            lines.append(name[:23].ljust(24) + str(count).rjust(8) + str(units).rjust(10) +
+                         format(value, '.2f').rjust(19) + format(sell_through(units_sold, units) * 100, '.1f').rjust(13) + "%")
+        if len(groups) > top:
+            lines.append("... " + str(len(groups) - top) + " more")
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+def _option(args, name, default=None):
+    """
+    Returns the value following a command-line option.
+
+    Parameters:
+        args (list): Command-line arguments
+        name (str): Option name, e.g. "--from"
+        default: Value when the option is not given
+
+    Returns:
+        str: The option's value, or the default
+    """
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return default
+
+def run_report(args):
+    """
+    Prints one report chosen on the command line.
+
+    Parameters:
+        args (list): Report name followed by its options
+
+    Returns:
+        int: Exit status, 0 on success
+    """
+    if args[:1] == ['inventory']:
+        sold = sold_units(_option(args, '--from'), _option(args, '--to'))
+        # Stream the catalog under a shared lock, as 'main.py list' does
+        with inventory_lock(shared=True):
+            report = inventory_report(get_backend().iter_products(),
+                                      int(_option(args, '--threshold', LOW_STOCK_THRESHOLD)), sold=sold)
+        print_inventory_report(report, int(_option(args, '--top', 20)))
+        return 0
+    if not args or args[0] not in ('summary', 'daily', 'products', 'customers'):
+        print("Usage: python reports.py summary|daily|products|customers "
+              "[--from YYYY-MM-DD] [--to YYYY-MM-DD] [--purchases] [--top N]\n"
+              "       python reports.py inventory [--threshold N] [--from YYYY-MM-DD] [--to YYYY-MM-DD]")
+        return 2
+    if np is None:
+        print("❌ Reports need NumPy (pip install numpy)")
+        return 1
+    kind = 'purchase' if '--purchases' in args else 'sell'
+    top = int(_option(args, '--top', 10))
+    columns = load_ledger(kind, _option(args, '--from'), _option(args, '--to'))
+
+    if args[0] == 'summary':
+        totals = summary(columns)
+        print("Lines: " + str(totals['lines']) + "   Units: " + str(totals['qty']) +
+              "   Free units: " + str(totals['free_qty']))
+        print("Before tax: $" + format(totals['revenue'], '.2f') + "   Tax: $" + format(totals['tax'], '.2f') +
+              "   Total: $" + format(totals['total'], '.2f'))
+    elif args[0] == 'daily':
+        print("Date        Lines     Units        Revenue          Tax")
+        for day, lines, qty, revenue, tax in daily_totals(columns):
+            print(day + str(lines).rjust(8) + str(qty).rjust(10) + format(revenue, '.2f').rjust(15) +
+                  format(tax, '.2f').rjust(13))
+    elif args[0] == 'products':
+        print("Product ID     Units   Free        Revenue")
+        for product_id, qty, free_qty, revenue in top_products(columns, top):
+            print(str(product_id).ljust(10) + str(qty).rjust(10) + str(free_qty).rjust(7) +
+                  format(revenue, '.2f').rjust(15))
+    else:
+        print("Name                      Lines        Revenue")
+        for name, lines, revenue in top_parties(columns, sales_ledger.parties(), top):
+            print(name[:24].ljust(24) + str(lines).rjust(7) + format(revenue, '.2f').rjust(15))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run_report(sys.argv[1:]))
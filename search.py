@@ -0,0 +1,322 @@
+"""
+WeCare Inventory Management System - Search Module
+
+This module lets staff find products by name, brand or origin instead of by
+their numeric ID. It keeps secondary indexes over the inventory:
+
+- a sorted list of product names, for prefix search with bisect
+- an inverted index from each word of a name to the products using it, with
+  all known words joined into one string so substring search runs at C speed
+- exact-match indexes on brand and on origin
+
+All matching is case-insensitive. The inventory store keeps the indexes up to
+date as products are added, changed and removed. When the inventory is read
+again because another terminal saved, only the products that differ between
+the two loads are re-indexed; the indexes are built in full on first use and
+when a large share of the catalog changed at once.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import bisect
+import heapq
+import re
+
+# Separates the words of a product name
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# Share of the catalog that may differ between two loads for the indexes to be
+# updated product by product; above it they are rebuilt, which is then quicker
+SYNC_FRACTION = 0.05
+
+def name_words(name):
+    """
+    Splits a product name into lowercase words.
+
+    Parameters:
+        name (str): Product name
+
+    Returns:
+        set: The distinct words of the name
+    """
+    return set(WORD_PATTERN.findall(name.lower()))
+
+class ProductIndex:
+    """
+    Secondary indexes over the products of the inventory.
+
+    Attributes:
+        _entries (dict): Product ID -> (lowercase name, brand, origin, words) as indexed
+        _names (list): Sorted (lowercase name, product ID) pairs
+        _words (dict): Word -> set of product IDs whose name contains it
+        _brands (dict): Lowercase brand -> set of product IDs
+        _origins (dict): Lowercase origin -> set of product IDs
+        _vocabulary (str): All words joined by newlines, rebuilt when words are added
+        _word_list (list): The words in the order they appear in _vocabulary
+        _word_starts (list): Offset of each word in _vocabulary
+    """
+
+    def __init__(self, products=()):
+        self._entries = {}
+        self._names = []
+        self._words = {}
+        self._brands = {}
+        self._origins = {}
+        self._vocabulary = None
+        self._word_starts = None
+        self._word_list = None
+        for product in products:
+            self._add(product, sort=False)
+        self._names.sort()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, product, sort=True):
+        """
+        Adds a product to every index.
+
+        Parameters:
+            product (Product): The product to add
+            sort (bool): Keep the name list sorted; False while bulk loading
+        """
+        name = product.name.lower()
+        brand = product.brand.lower()
+        origin = product.origin.lower()
+        words = name_words(product.name)
+        self._entries[product.product_id] = (name, brand, origin, words)
+
+        if sort:
+            bisect.insort(self._names, (name, product.product_id))
+        else:
+            self._names.append((name, product.product_id))
+        for word in words:
+            if word not in self._words:
+                self._words[word] = set()
+                self._vocabulary = None
+            self._words[word].add(product.product_id)
+        self._brands.setdefault(brand, set()).add(product.product_id)
+        self._origins.setdefault(origin, set()).add(product.product_id)
+
+    def remove(self, product_id):
+        """
+        Removes a product from every index.
+
+        Parameters:
+            product_id (int): The product to remove
+        """
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        name, brand, origin, words = entry
+
+        position = bisect.bisect_left(self._names, (name, product_id))
+        if position < len(self._names) and self._names[position] == (name, product_id):
+            del self._names[position]
+        for word in words:
+            ids = self._words[word]
+            ids.discard(product_id)
+            if not ids:
+                del self._words[word]
+                self._vocabulary = None
+        for index, key in ((self._brands, brand), (self._origins, origin)):
+            ids = index[key]
+            ids.discard(product_id)
+            if not ids:
+                del index[key]
+
+    def update(self, product):
+        """
+        Indexes a new product, or re-indexes one whose text may have changed.
+
+        Parameters:
+            product (Product): The product as it is now
+        """
+        entry = self._entries.get(product.product_id)
+        if entry is not None:
+            if (entry[0] == product.name.lower() and entry[1] == product.brand.lower()
+                    and entry[2] == product.origin.lower()):
+                return
+            self.remove(product.product_id)
+        self._add(product)
+
+    def sync(self, previous, current):
+        """
+        Brings the indexes from one load of the inventory to the next.
+
+        Only the products added, removed or given a new name, brand or
+        origin between the two loads are re-indexed. Each of those updates
+        keeps the name list sorted, so when more than SYNC_FRACTION of the
+        catalog differs nothing is changed and the caller should build new
+        indexes instead.
+
+        Parameters:
+            previous (dict): Product ID -> Product, as the indexes hold them
+            current (dict): Product ID -> Product, as read now
+
+        Returns:
+            bool: True if the indexes now match current, False if they were left as they were
+        """
+        removed = [product_id for product_id in previous if product_id not in current]
+        changed = []
+        for product_id, product in current.items():
+            old = previous.get(product_id)
+            if (old is None or old.name != product.name or old.brand != product.brand
+                    or old.origin != product.origin):
+                changed.append(product)
+        if len(removed) + len(changed) > len(current) * SYNC_FRACTION:
+            return False
+        for product_id in removed:
+            self.remove(product_id)
+        for product in changed:
+            self.update(product)
+        return True
+
+    def find(self, query, limit=None):
+        """
+        Answers a query as typed at the product prompts.
+
+        "brand:NAME" and "origin:COUNTRY" look up an exact brand or country,
+        text ending in "*" finds names starting with the text before it, and
+        any other text finds names containing each of its words.
+
+        Parameters:
+            query (str): What to search for
+            limit (int): Largest number of IDs to return, or None for all
+
+        Returns:
+            list: Matching product IDs; in name order for a prefix, otherwise ascending
+        """
+        query = query.strip()
+        if query.lower().startswith('brand:'):
+            return self.by_brand(query[6:].strip(), limit)
+        if query.lower().startswith('origin:'):
+            return self.by_origin(query[7:].strip(), limit)
+        if query.endswith('*'):
+            return self.prefix(query[:-1].strip(), limit)
+        return self.search(query, limit)
+
+    def prefix(self, text, limit=None):
+        """
+        Finds products whose name starts with the given text.
+
+        Parameters:
+            text (str): Start of the name
+            limit (int): Largest number of IDs to return, or None for all
+
+        Returns:
+            list: Matching product IDs in name order
+        """
+        text = text.lower()
+        position = bisect.bisect_left(self._names, (text,))
+        found = []
+        while position < len(self._names) and self._names[position][0].startswith(text):
+            found.append(self._names[position][1])
+            if limit is not None and len(found) >= limit:
+                break
+            position += 1
+        return found
+
+    def search(self, text, limit=None):
+        """
+        Finds products whose name contains every word of the given text.
+
+        Each word of the text may match any part of a word in the name, so
+        "clean" finds "Skin Cleanser".
+
+        Parameters:
+            text (str): Words to look for
+            limit (int): Largest number of IDs to return, or None for all
+
+        Returns:
+            list: Matching product IDs in ascending order
+        """
+        query_words = WORD_PATTERN.findall(text.lower())
+        if not query_words:
+            return []
+        # Match the rarest word first so the intersection stays small
+        candidate_sets = sorted((self._ids_for_fragment(word) for word in query_words), key=len)
+        found = set(candidate_sets[0])
+        for ids in candidate_sets[1:]:
+            found &= ids
+            if not found:
+                break
+        return _smallest(found, limit)
+
+    def _ids_for_fragment(self, fragment):
+        """
+        Collects the products with a name word containing the fragment.
+
+        Parameters:
+            fragment (str): Lowercase text to find inside words
+
+        Returns:
+            set: Matching product IDs
+        """
+        if self._vocabulary is None:
+            self._build_vocabulary()
+
+        ids = set()
+        position = self._vocabulary.find(fragment)
+        while position != -1:
+            # Map the match back to the word it falls in, then carry on after that word
+            word_number = bisect.bisect_right(self._word_starts, position) - 1
+            ids |= self._words[self._word_list[word_number]]
+            if word_number + 1 == len(self._word_list):
+                break
+            position = self._vocabulary.find(fragment, self._word_starts[word_number + 1])
+        return ids
+
+    def _build_vocabulary(self):
+        """
+        Joins every known word into one searchable string.
+        """
+        self._word_list = list(self._words)
+        self._word_starts = []
+        offset = 0
+        for word in self._word_list:
+            self._word_starts.append(offset)
+            offset += len(word) + 1
+        self._vocabulary = '\n'.join(self._word_list)
+
+    def by_brand(self, brand, limit=None):
+        """
+        Finds the products of a brand.
+
+        Parameters:
+            brand (str): Exact brand name, in any case
+            limit (int): Largest number of IDs to return, or None for all
+
+        Returns:
+            list: Matching product IDs in ascending order
+        """
+        return _smallest(self._brands.get(brand.lower(), ()), limit)
+
+    def by_origin(self, origin, limit=None):
+        """
+        Finds the products from a country of origin.
+
+        Parameters:
+            origin (str): Exact country name, in any case
+            limit (int): Largest number of IDs to return, or None for all
+
+        Returns:
+            list: Matching product IDs in ascending order
+        """
+        return _smallest(self._origins.get(origin.lower(), ()), limit)
+
+def _smallest(ids, limit):
+    """
+    Returns the lowest product IDs of a set in ascending order.
+
+    Parameters:
+        ids (set): Product IDs
+        limit (int): Largest number of IDs to return, or None for all
+
+    Returns:
+        list: The IDs, sorted
+    """
+    if limit is None or limit >= len(ids):
+        return sorted(ids)
+    return heapq.nsmallest(limit, ids)
@@ -0,0 +1,514 @@
+"""
+WeCare Inventory Management System - HTTP Service Module
+
+This module serves the inventory to point-of-sale terminals over a local
+HTTP/JSON API, so many tills can sell at once instead of taking turns at
+the main.py menu.
+
+    GET  /products?offset=0&limit=100   page of the catalog
+    GET  /products/ID                   one product, with what can be sold now
+    GET  /search?q=TEXT&limit=20        name search; "TEXT*", "brand:X" and "origin:X" as in the menu
+    GET  /metrics                       timings in Prometheus text format (see metrics.py)
+    POST /sell      {"customer": "Jane", "items": [{"product_id": 2, "quantity": 3}]}
+    POST /restock   {"vendor": "Acme", "items": [{"product_id": 2, "quantity": 50, "cost": 300.0}]}
+
+A restock line for a new product ID also needs "name", "brand" and
+"origin". A sale or restock is applied whole or not at all: any bad line
+rejects the request with a 400, and a sale the stock no longer covers is
+answered with a 409. Successful requests return what was saved, priced by
+the same rules as the menu.
+
+The server holds one shared in-memory inventory (inventory.py). Each
+connection has its own thread, and one lock puts every use of the store
+in order, so writes are serialised and reads never see a half-applied
+sale. Sales go through carts (cart.py), so the saving, ledger and invoice
+handling are the same as at the menu. Invoices are written by the background
+writer so a till gets its answer as soon as the stock is saved.
+Other terminals can keep using main.py on the same files; the inventory lock
+keeps their writes apart.
+
+    python server.py [--host 127.0.0.1] [--port 8080]
+
+See loadtest.py for a load generator.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import json
+import math
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from cart import Cart, reservations
+from inventory import SaveError, StockConflictError, inventory
+from invoice_queue import invoice_writer, report_invoices
+from ledger import record_lines
+from locking import LockTimeoutError
+from pricing import pricing
+from product import Product
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+
+# Largest page of products one request may ask for
+MAX_PAGE = 1000
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+# Every use of the shared inventory store happens under this lock
+store_lock = threading.Lock()
+
+class RequestError(Exception):
+    """
+    Raised for a request that cannot be served; carries the HTTP status.
+
+    Attributes:
+        status (int): HTTP status code to answer with
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def product_json(product):
+    """
+    Returns a product as a JSON-ready dictionary.
+
+    Parameters:
+        product (Product): The product
+
+    Returns:
+        dict: The product's fields, plus the retail price shown in the product table
+    """
+    return {
+        'product_id': product.product_id,
+        'name': product.name,
+        'brand': product.brand,
+        'qty': product.qty,
+        'cost': product.cost,
+        'price': product.cost * 2,
+        'origin': product.origin,
+    }
+
+def quote_json(quote):
+    """
+    Returns a priced cart as a JSON-ready dictionary.
+
+    Parameters:
+        quote (CartQuote): The priced cart
+
+    Returns:
+        dict: The lines with their offers, and the totals
+    """
+    return {
+        'lines': [{
+            'product_id': line.product_id,
+            'name': line.name,
+            'qty': line.qty,
+            'free_qty': line.free_qty,
+            'unit_cost': line.unit_cost,
+            'discount': line.discount,
+            'subtotal': line.subtotal,
+            'tax': line.tax,
+            'offer': line.label,
+        } for line in quote.lines],
+        'subtotal': quote.subtotal,
+        'tax': quote.tax,
+        'total': quote.total,
+    }
+
+def list_products(offset, limit):
+    """
+    Returns one page of the catalog, in file order.
+
+    Parameters:
+        offset (int): Products to skip
+        limit (int): Largest number of products to return
+
+    Returns:
+        dict: 'total' products in the catalog and the page of 'products'
+    """
+    with store_lock:
+        data = inventory.get_data()
+        return {
+            'total': len(data),
+            'products': [product_json(product) for product in islice(data.values(), offset, offset + limit)],
+        }
+
+def get_product(product_id):
+    """
+    Returns one product and how many items of it can be sold right now.
+
+    Stock held in open carts is not for sale, and enough is kept back for
+    the free items a sale earns.
+
+    Parameters:
+        product_id (int): The product
+
+    Returns:
+        dict: The product, with 'sellable' and 'offer'
+
+    Raises:
+        RequestError: 404 if there is no such product
+    """
+    with store_lock:
+        product = inventory.get_data().get(product_id)
+        if product is None:
+            raise RequestError(404, "Product ID " + str(product_id) + " is not in the inventory")
+        available = max(product.qty - reservations.held_by_others(None, product_id), 0)
+        found = product_json(product)
+        found['sellable'] = pricing.sellable_quantity(product, available)
+        found['offer'] = pricing.terms_for(product).label
+        return found
+
+def search(query, limit):
+    """
+    Returns the products matching a search, as the menu's search does.
+
+    Parameters:
+        query (str): Name words, "TEXT*" for a name prefix, "brand:NAME" or "origin:COUNTRY"
+        limit (int): Largest number of matches to return
+
+    Returns:
+        dict: The matching 'products'
+    """
+    with store_lock:
+        found = inventory.search_index().find(query, limit)
+        data = inventory.get_data()
+        return {'products': [product_json(data[product_id]) for product_id in found if product_id in data]}
+
+def _items(request, party_field):
+    """
+    Checks the shape of a sell or restock request.
+
+    Parameters:
+        request (dict): The decoded request body
+        party_field (str): "customer" or "vendor"
+
+    Returns:
+        tuple: (party name, list of item dictionaries)
+
+    Raises:
+        RequestError: 400 if the party or items are missing
+    """
+    if not isinstance(request, dict):
+        raise RequestError(400, "Expected a JSON object")
+    party = request.get(party_field)
+    items = request.get('items')
+    if not isinstance(party, str) or not party.strip():
+        raise RequestError(400, "'" + party_field + "' is required")
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        raise RequestError(400, "'items' must be a non-empty list of objects")
+    return party.strip(), items
+
+def sell(request):
+    """
+    Sells a customer's items in one transaction and queues the invoice.
+
+    Parameters:
+        request (dict): {"customer": NAME, "items": [{"product_id": ID, "quantity": N}, ...]}
+
+    Returns:
+        dict: The 'customer' and the priced sale
+
+    Raises:
+        RequestError: 400 for a malformed line, 409 if the stock does not cover the sale,
+                      503 if another terminal kept the inventory locked or it could not be saved
+    """
+    customer_name, items = _items(request, 'customer')
+    with store_lock:
+        cart = Cart(customer_name)
+        try:
+            for line_no, item in enumerate(items, start=1):
+                try:
+                    product_id = int(item['product_id'])
+                    quantity = int(item['quantity'])
+                    cart.add(product_id, quantity)
+                except (KeyError, TypeError, ValueError) as e:
+                    raise RequestError(400, "Line " + str(line_no) + ": " + str(e))
+                except StockConflictError as e:
+                    raise RequestError(409, "Line " + str(line_no) + ": " + str(e))
+            try:
+                quote = cart.checkout()
+            except StockConflictError as e:
+                raise RequestError(409, str(e))
+            except (LockTimeoutError, SaveError) as e:
+                raise RequestError(503, str(e))
+        finally:
+            if not cart.checked_out:
+                cart.abandon()
+    result = quote_json(quote)
+    result['customer'] = customer_name
+    return result
+
+def restock(request):
+    """
+    Restocks or adds a vendor's products in one transaction and queues the invoice.
+
+    Lines are checked as in process_restock, but any bad line rejects the
+    whole request.
+
+    Parameters:
+        request (dict): {"vendor": NAME, "items": [{"product_id": ID, "quantity": N, "cost": C}, ...]}
+
+    Returns:
+        dict: The 'vendor', the 'lines' saved and their 'total' cost before tax
+
+    Raises:
+        RequestError: 400 for a bad line, 409 if another terminal added a new product ID first,
+                      503 if another terminal kept the inventory locked or it could not be saved
+    """
+    vendor_name, items = _items(request, 'vendor')
+    lines = []
+    for line_no, item in enumerate(items, start=1):
+        try:
+            line = {'id': int(item['product_id']), 'qty': int(item['quantity']), 'cost': float(item['cost'])}
+        except (KeyError, TypeError, ValueError) as e:
+            raise RequestError(400, "Line " + str(line_no) + ": malformed line: " + str(e))
+        if line['qty'] < 0 or line['cost'] < 0:
+            raise RequestError(400, "Line " + str(line_no) + ": quantity and cost must not be negative")
+        if not math.isfinite(line['cost']):
+            raise RequestError(400, "Line " + str(line_no) + ": cost must be a finite number")
+        lines.append((line, item))
+
+    with store_lock:
+        # Every line is checked before the transaction starts, so a bad request
+        # is refused without a rollback reloading the whole inventory
+        data = inventory.get_data()
+        invoice_items = []
+        for line_no, (line, item) in enumerate(lines, start=1):
+            if line['id'] in data:
+                line['name'] = data[line['id']].name
+            elif item.get('name') and item.get('brand') and item.get('origin') and line['qty'] > 0:
+                line['name'] = str(item['name'])
+            else:
+                raise RequestError(400, "Line " + str(line_no) + ": new product " + str(line['id']) +
+                                   " needs a name, brand, origin and a positive quantity")
+            invoice_items.append(line)
+
+        inventory.begin()
+        try:
+            # begin() may have picked up another terminal's save; a product it
+            # removed or added since the check is a conflict
+            for line, item in lines:
+                if line['id'] in data:
+                    inventory.restock(line['id'], line['qty'], line['cost'])
+                else:
+                    inventory.add_product(Product(line['id'], line['name'], str(item['brand']), line['qty'],
+                                                  line['cost'], str(item['origin'])))
+        except StockConflictError as e:
+            inventory.rollback()
+            raise RequestError(409, str(e))
+        except Exception:
+            # Any other failure must not leave the transaction open for later requests
+            inventory.rollback()
+            raise
+        try:
+            inventory.commit()
+        except StockConflictError as e:
+            raise RequestError(409, str(e))
+        except (LockTimeoutError, SaveError) as e:
+            raise RequestError(503, str(e))
+        record_lines('purchase', {vendor_name: invoice_items})
+        invoice_writer.submit('purchase', vendor_name, invoice_items)
+
+    return {
+        'vendor': vendor_name,
+        'lines': [{'product_id': line['id'], 'name': line['name'], 'qty': line['qty'], 'cost': line['cost']}
+                  for line in invoice_items],
+        'total': sum([line['qty'] * line['cost'] for line in invoice_items]),
+    }
+
+def _int_param(params, name, default, largest=None):
+    """
+    Reads a non-negative integer from the query string.
+
+    Parameters:
+        params (dict): Parsed query string
+        name (str): Parameter name
+        default (int): Value when the parameter is missing
+        largest (int): Upper limit the value is cut down to, if any
+
+    Returns:
+        int: The value
+
+    Raises:
+        RequestError: 400 if the value is not a non-negative integer
+    """
+    value = params.get(name, [str(default)])[0]
+    if not value.isdigit():
+        raise RequestError(400, "'" + name + "' must be a non-negative integer")
+    value = int(value)
+    return min(value, largest) if largest is not None else value
+
+class InventoryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes API requests to the functions above and answers in JSON.
+    """
+
+    # Keep connections open so a till does not reconnect for every request
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['products']:
+            self._respond(lambda: list_products(_int_param(params, 'offset', 0),
+                                                _int_param(params, 'limit', 100, MAX_PAGE)))
+        elif len(parts) == 2 and parts[0] == 'products' and parts[1].isdigit():
+            self._respond(lambda: get_product(int(parts[1])))
+        elif parts == ['search']:
+            self._respond(lambda: search(params.get('q', [''])[0].strip(),
+                                         _int_param(params, 'limit', 20, MAX_PAGE)))
+        elif parts == ['metrics']:
+            self._send_payload(200, 'text/plain; version=0.0.4', metrics.to_prometheus().encode('utf-8'))
+        else:
+            self._respond(lambda: self._not_found())
+
+    def do_POST(self):
+        routes = {'/sell': sell, '/restock': restock}
+        handler = routes.get(urlsplit(self.path).path.rstrip('/'))
+        try:
+            request = self._read_json()
+        except RequestError as e:
+            self._send(e.status, {'error': str(e)})
+            return
+        if handler is None:
+            self._respond(lambda: self._not_found())
+        else:
+            self._respond(lambda: handler(request))
+
+    def _not_found(self):
+        raise RequestError(404, "No such endpoint: " + self.command + " " + self.path)
+
+    def _read_json(self):
+        """
+        Reads and decodes the JSON request body.
+
+        Returns:
+            object: The decoded body
+
+        Raises:
+            RequestError: 400 for a missing or malformed body, 413 if it is too large
+        """
+        length = self.headers.get('Content-Length', '')
+        if not length.isdigit():
+            raise RequestError(400, "Content-Length is required")
+        if int(length) > MAX_BODY:
+            raise RequestError(413, "Request body is too large")
+        try:
+            return json.loads(self.rfile.read(int(length)).decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise RequestError(400, "Malformed JSON: " + str(e))
+
+    def _respond(self, action):
+        """
+        Runs one request and sends its result or error.
+
+        Parameters:
+            action (callable): Returns the JSON-ready result
+        """
+        try:
+            self._send(200, action())
+        except RequestError as e:
+            self._send(e.status, {'error': str(e)})
+        except Exception as e:
+            print("❌ Error serving " + self.command + " " + self.path + ": " + str(e))
+            self._send(500, {'error': "Internal error"})
+
+    def _send(self, status, body):
+        """
+        Sends a JSON response.
+
+        Parameters:
+            status (int): HTTP status code
+            body (object): JSON-ready response body
+        """
+        self._send_payload(status, 'application/json', json.dumps(body).encode('utf-8'))
+
+    def _send_payload(self, status, content_type, payload):
+        """
+        Sends a response body.
+
+        Parameters:
+            status (int): HTTP status code
+            content_type (str): Content-Type of the body
+            payload (bytes): The body
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # One line per request would swamp the console at till volumes; errors are printed above
+        pass
+
+class InventoryServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server with room for many tills connecting at once.
+    """
+
+    # The default backlog of 5 makes extra connections wait for a SYN retry
+    request_queue_size = 128
+    daemon_threads = True
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Creates the HTTP server and loads the inventory it will serve.
+
+    Parameters:
+        host (str): Address to listen on
+        port (int): Port to listen on; 0 picks a free port
+
+    Returns:
+        InventoryServer: The server, ready for serve_forever()
+    """
+    with store_lock:
+        inventory.get_data()
+    return InventoryServer((host, port), InventoryRequestHandler)
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Runs the service until interrupted, then finishes the queued invoices.
+
+    Parameters:
+        host (str): Address to listen on
+        port (int): Port to listen on
+    """
+    server = make_server(host, port)
+    print("✅ WeCare inventory service on http://" + host + ":" + str(server.server_address[1]) +
+          " (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        invoice_writer.drain()
+        report_invoices()
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    host = DEFAULT_HOST
+    port = DEFAULT_PORT
+    valid = len(args) % 2 == 0
+    for name, value in zip(args[::2], args[1::2]):
+        if name == '--host':
+            host = value
+        elif name == '--port' and value.isdigit():
+            port = int(value)
+        else:
+            valid = False
+    if not valid:
+        print("Usage: python server.py [--host ADDRESS] [--port PORT]")
+        sys.exit(2)
+    serve(host, port)
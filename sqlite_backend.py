@@ -0,0 +1,268 @@
+"""
+WeCare Inventory Management System - SQLite Backend Module
+
+This module stores the inventory in a local SQLite database as an alternative
+to the products.txt flat file. Products live in a single table keyed on the
+product ID, with indexes on brand and origin, so changing one product is an
+indexed update instead of a rewrite of the whole catalog. All changes made in
+one save are committed as a single transaction.
+
+It also provides a one-shot migration between the flat file and the database:
+    python sqlite_backend.py import   (products.txt -> products.db)
+    python sqlite_backend.py export   (products.db -> products.txt)
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+import sqlite3
+import sys
+
+from locking import inventory_lock
+from product import Product
+from read import read_from_file
+from write import compact_log
+
+DB_FILE = 'products.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    origin TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand);
+CREATE INDEX IF NOT EXISTS idx_products_origin ON products (origin);
+"""
+
+class SQLiteBackend:
+    """
+    Inventory backend that keeps products in an SQLite database.
+
+    The product ID is the table's INTEGER PRIMARY KEY, so lookups and
+    updates by ID use the table's own B-tree.
+
+    Attributes:
+        path (str): Path of the database file
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        """
+        Opens the database on first use and creates the schema if needed.
+
+        Returns:
+            sqlite3.Connection: The open connection
+        """
+        if self._conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN.
+            # The HTTP service uses the backend from its request threads, one
+            # at a time under its store lock
+            self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def signature(self):
+        """
+        Returns a value that changes whenever the database file changes.
+
+        Returns:
+            tuple: (mtime_ns, size) of the database file, or None if it is missing
+        """
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def version(self):
+        """
+        Returns the sequence number of the last saved change.
+
+        The number is kept in the database's user_version header field and is
+        incremented inside every save_changes() transaction.
+
+        Returns:
+            int: Current version of the inventory
+        """
+        return self._connect().execute("PRAGMA user_version").fetchone()[0]
+
+    def load(self):
+        """
+        Reads every product from the database.
+
+        Returns:
+            dict: Dictionary mapping product ID to Product
+        """
+        data = {}
+        for product in self.iter_products():
+            data[product.product_id] = product
+        return data
+
+    def iter_products(self):
+        """
+        Yields the products one at a time, ordered by ID, straight from a cursor.
+
+        Yields:
+            Product: The next product in the inventory
+        """
+        try:
+            rows = self._connect().execute(
+                "SELECT id, name, brand, qty, cost, origin FROM products ORDER BY id")
+            for row in rows:
+                yield Product(*row)
+        except sqlite3.Error as e:
+            print("❌ Error reading inventory database: " + str(e))
+
+    def save_changes(self, data, product_ids):
+        """
+        Writes the given products to the database in one transaction.
+
+        Products whose quantity dropped below 1 are removed from the data and
+        deleted from the database, the same as the flat file does.
+
+        Parameters:
+            data (dict): Dictionary mapping product ID to Product, already updated in memory
+            product_ids (list): IDs of the products that were changed
+
+        Returns:
+            bool: True if the transaction was committed, False otherwise
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute("PRAGMA user_version = " + str(version + 1))
+            for key in product_ids:
+                if key in data and data[key].qty < 1:
+                    data.pop(key)
+
+                if key in data:
+                    product = data[key]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO products (id, name, brand, qty, cost, origin) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (product.product_id, product.name, product.brand,
+                         product.qty, product.cost, product.origin))
+                else:
+                    conn.execute("DELETE FROM products WHERE id = ?", (key,))
+            conn.execute("COMMIT")
+            print("✅ Inventory data updated successfully")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print("❌ Error writing to inventory database: " + str(e))
+            return False
+
+    def find(self, brand=None, origin=None):
+        """
+        Looks up products by brand and/or origin using the column indexes.
+
+        Parameters:
+            brand (str): Exact brand name to match, or None for any brand
+            origin (str): Exact country of origin to match, or None for any origin
+
+        Returns:
+            list: Matching Product records ordered by ID
+        """
+        query = "SELECT id, name, brand, qty, cost, origin FROM products WHERE 1 = 1"
+        params = []
+        if brand is not None:
+            query += " AND brand = ?"
+            params.append(brand)
+        if origin is not None:
+            query += " AND origin = ?"
+            params.append(origin)
+        rows = self._connect().execute(query + " ORDER BY id", params)
+        return [Product(*row) for row in rows]
+
+    def replace_all(self, data):
+        """
+        Replaces the whole contents of the database with the given data.
+
+        Parameters:
+            data (dict): Dictionary mapping product ID to Product
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute("PRAGMA user_version = " + str(version + 1))
+            conn.execute("DELETE FROM products")
+            conn.executemany(
+                "INSERT INTO products (id, name, brand, qty, cost, origin) VALUES (?, ?, ?, ?, ?, ?)",
+                ((p.product_id, p.name, p.brand, p.qty, p.cost, p.origin) for p in data.values()))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """
+        Closes the database connection if it is open.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def migrate_file_to_sqlite(db_path=DB_FILE):
+    """
+    Copies the flat-file inventory (snapshot plus log) into the database.
+
+    Any products already in the database are replaced.
+
+    Parameters:
+        db_path (str): Path of the database file to write
+
+    Returns:
+        int: Number of products migrated
+    """
+    backend = SQLiteBackend(db_path)
+    try:
+        with inventory_lock():
+            data = read_from_file()
+            backend.replace_all(data)
+    finally:
+        backend.close()
+    print("✅ Migrated " + str(len(data)) + " products to " + db_path)
+    return len(data)
+
+def migrate_sqlite_to_file(db_path=DB_FILE):
+    """
+    Writes the database inventory back out as the flat-file snapshot.
+
+    The transaction log is emptied, since the new snapshot already holds
+    the current state of every product.
+
+    Parameters:
+        db_path (str): Path of the database file to read
+
+    Returns:
+        int: Number of products migrated
+    """
+    backend = SQLiteBackend(db_path)
+    try:
+        with inventory_lock():
+            data = backend.load()
+            compact_log(data)
+    finally:
+        backend.close()
+    print("✅ Migrated " + str(len(data)) + " products from " + db_path)
+    return len(data)
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2 and sys.argv[1] == 'import':
+        migrate_file_to_sqlite()
+    elif len(sys.argv) == 2 and sys.argv[1] == 'export':
+        migrate_sqlite_to_file()
+    else:
+        print("Usage: python sqlite_backend.py import|export")
@@ -0,0 +1,129 @@
+"""
+WeCare Inventory Management System - Concurrent Writer Stress Test
+
+This test runs several terminal processes against one inventory at once.
+Each process sells random quantities of a small catalog through the
+inventory store, as a checkout terminal does: begin(), adjust_stock(),
+commit(). The catalog is small so the processes keep colliding on the
+same products, and many sales are refused because another terminal sold
+the stock first.
+
+When every process has finished, the units sold that they report must
+add up to exactly the stock that left the inventory, and no quantity may
+be negative. A lost update or a double-applied change shows up as a
+difference.
+
+Run from the project directory:
+    python -m unittest tests.test_concurrent_writers
+The number of processes and sales can be raised with the WECARE_STRESS_PROCESSES
+and WECARE_STRESS_SALES environment variables.
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PROCESSES = int(os.environ.get('WECARE_STRESS_PROCESSES', '6'))
+SALES = int(os.environ.get('WECARE_STRESS_SALES', '60'))
+
+# A small catalog, so the processes sell the same products out from under each other
+PRODUCTS = 8
+STOCK = 100
+
+# One terminal: sells random products and prints what it sold as its last line
+TERMINAL = """
+import json
+import random
+import sys
+sys.path.insert(0, sys.argv[1])
+from inventory import StockConflictError, inventory
+from locking import LockTimeoutError
+chooser = random.Random(int(sys.argv[2]))
+sold = {}
+refused = timeouts = 0
+for n in range(int(sys.argv[3])):
+    product_id = chooser.randint(1, int(sys.argv[4]))
+    units = chooser.randint(1, 4)
+    inventory.begin()
+    try:
+        inventory.adjust_stock(product_id, -units)
+    except StockConflictError:
+        inventory.rollback()
+        refused += 1
+        continue
+    try:
+        inventory.commit()
+    except StockConflictError:
+        refused += 1
+        continue
+    except LockTimeoutError:
+        timeouts += 1
+        continue
+    sold[product_id] = sold.get(product_id, 0) + units
+print(json.dumps({'sold': sold, 'refused': refused, 'timeouts': timeouts}))
+"""
+
+class ConcurrentWritersTest(unittest.TestCase):
+    """
+    Sells from several processes at once and checks that no stock is lost or invented.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='wecare-stress-')
+        with open(os.path.join(self.directory, 'products.txt'), 'w') as f:
+            for product_id in range(1, PRODUCTS + 1):
+                f.write(str(product_id) + ',Product ' + str(product_id) + ',Brand,' + str(STOCK) +
+                        ',100.0,Nepal\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_stock_is_conserved(self):
+        terminals = [subprocess.Popen([sys.executable, '-c', TERMINAL, ROOT, str(seed), str(SALES), str(PRODUCTS)],
+                                      cwd=self.directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                      text=True)
+                     for seed in range(PROCESSES)]
+        # Wait for every terminal before checking any of them
+        results = [terminal.communicate() for terminal in terminals]
+        sold = {}
+        refused = timeouts = 0
+        for terminal, (output, errors) in zip(terminals, results):
+            self.assertEqual(terminal.returncode, 0, errors)
+            report = json.loads(output.strip().splitlines()[-1])
+            for product_id, units in report['sold'].items():
+                sold[int(product_id)] = sold.get(int(product_id), 0) + units
+            refused += report['refused']
+            timeouts += report['timeouts']
+
+        previous = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            from inventory import inventory
+            inventory.invalidate()
+            data = inventory.get_data()
+        finally:
+            os.chdir(previous)
+
+        for product_id in range(1, PRODUCTS + 1):
+            # Sold-out products are dropped from the inventory
+            left = data[product_id].qty if product_id in data else 0
+            self.assertGreaterEqual(left, 0)
+            self.assertEqual(left + sold.get(product_id, 0), STOCK,
+                             "stock of product " + str(product_id) + " not conserved")
+        print("\n" + str(PROCESSES) + " processes sold " + str(sum(sold.values())) + " of " +
+              str(PRODUCTS * STOCK) + " units; " + str(refused) + " sales refused, " +
+              str(timeouts) + " lock timeouts")
+
+if __name__ == '__main__':
+    unittest.main()
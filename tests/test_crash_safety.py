@@ -0,0 +1,136 @@
+"""
+WeCare Inventory Management System - Crash Safety Tests
+
+These tests check that saving the inventory snapshot survives a crash.
+A child process saves a large catalog over and over, each time with every
+quantity set to the save's generation number, and is killed with SIGKILL
+at a random moment, usually in the middle of writing or syncing. After
+each kill products.txt must still hold the whole catalog from a single
+generation: the old snapshot or the new one, never a torn mix.
+
+They also check that files created by write_atomically() get the usual
+permissions rather than mkstemp's owner-only ones.
+
+Run from the project directory:
+    python -m unittest discover tests
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import os
+import random
+import shutil
+import signal
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_catalog
+from codec import decode_rows
+
+# Products in the catalog; large enough that one save takes a while
+CATALOG_SIZE = 100000
+
+# Times the saving process is killed
+KILLS = 8
+
+# Saves the catalog in a loop, printing each generation before saving it
+SAVER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from read import read_from_file
+from write import save_to_inventory
+data = read_from_file()
+generation = max(product.qty for product in data.values())
+while True:
+    generation += 1
+    for product in data.values():
+        product.qty = generation
+    print(generation, flush=True)
+    save_to_inventory(data)
+"""
+
+class AtomicSnapshotTest(unittest.TestCase):
+    """
+    Kills a process while it saves the snapshot and checks what is left.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='wecare-crash-')
+        catalog = os.path.join(self.directory, 'products.txt')
+        write_catalog(catalog, CATALOG_SIZE, seed=7)
+        # Start from generation 1: every quantity 1
+        with open(catalog, 'r') as f:
+            rows = [line.split(',') for line in f]
+        with open(catalog, 'w') as f:
+            f.writelines([','.join(fields[:3] + ['1'] + fields[4:]) for fields in rows])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def read_generations(self):
+        """
+        Parses products.txt and returns the generations found in it.
+
+        Returns:
+            set: Distinct quantities in the file
+        """
+        with open(os.path.join(self.directory, 'products.txt'), 'r') as f:
+            line_count, ids, names, brands, qtys, costs, origins, invalid = decode_rows(f)
+        self.assertEqual(invalid, [], "snapshot holds a torn or invalid row")
+        self.assertEqual(len(ids), CATALOG_SIZE, "snapshot lost products")
+        self.assertEqual(sorted(ids), list(range(1, CATALOG_SIZE + 1)))
+        return set(qtys)
+
+    @unittest.skipUnless(hasattr(signal, 'SIGKILL'), "needs SIGKILL")
+    def test_killed_saves_leave_a_whole_snapshot(self):
+        chooser = random.Random(1)
+        last_generation = 0
+        for kill in range(KILLS):
+            saver = subprocess.Popen([sys.executable, '-c', SAVER, ROOT], cwd=self.directory,
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            try:
+                # Wait until the first save has started, then kill somewhere in the next few saves
+                first = int(saver.stdout.readline())
+                time.sleep(chooser.uniform(0.0, 1.0))
+                saver.send_signal(signal.SIGKILL)
+                started = [first] + [int(line) for line in saver.stdout.read().split() if line.isdigit()]
+            finally:
+                saver.kill()
+                saver.wait()
+                saver.stdout.close()
+
+            generations = self.read_generations()
+            self.assertEqual(len(generations), 1, "snapshot mixes generations " + str(sorted(generations)))
+            generation = generations.pop()
+            # Either the save in progress landed whole, or the one before it is still there
+            self.assertIn(generation, (started[-1], started[-1] - 1))
+            self.assertGreaterEqual(generation, last_generation)
+            last_generation = generation
+
+    def test_new_files_follow_the_umask(self):
+        from write import write_atomically
+        previous = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            os.chmod('products.txt', 0o640)
+            write_atomically('products.txt', ['1,A,B,1,1.0,X\n'])
+            write_atomically('new.txt', ['new\n'])
+        finally:
+            os.chdir(previous)
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.directory, 'products.txt')).st_mode), 0o640)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.directory, 'new.txt')).st_mode),
+                         0o666 & ~umask)
+
+if __name__ == '__main__':
+    unittest.main()
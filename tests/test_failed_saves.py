@@ -0,0 +1,187 @@
+"""
+WeCare Inventory Management System - Failed Save Tests
+
+These tests check what happens when the inventory cannot be written. The
+transaction log is replaced by a directory, so appending to it fails the
+way a full or read-only disk would, even for the root user. A commit must
+then raise SaveError, leave products.seq as it was, and reload the
+inventory so the unsaved change is not shown as if it had happened. A
+cart whose checkout fails must stay open with its reservations, and
+neither a cart nor a batch run may reach the ledger or an invoice.
+
+Run from the project directory:
+    python -m unittest tests.test_failed_saves
+
+Author: [Rakshak Sigdel]
+Version: 1.0
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from cart import Cart, Reservations
+from inventory import FileBackend, InventoryStore, SaveError, StockConflictError
+from invoice_queue import invoice_writer
+from operation import buy_items, process_restock, process_sales
+
+CATALOG = '1,Aqua Cream,Belif,10,100.0,South Korea\n2,Gentle Cleanser,Cetaphil,5,50.0,Switzerland\n'
+
+class FailedSaveTest(unittest.TestCase):
+    """
+    Base for tests that run in a scratch inventory whose log cannot be written.
+    """
+
+    def setUp(self):
+        self.previous = os.getcwd()
+        self.directory = tempfile.mkdtemp(prefix='wecare-save-')
+        os.chdir(self.directory)
+        with open('products.txt', 'w') as f:
+            f.write(CATALOG)
+        self.store = InventoryStore(FileBackend())
+        self.quietly(self.store.get_data)
+
+    def tearDown(self):
+        os.chdir(self.previous)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def quietly(self, call, *args):
+        """
+        Runs a call with the program's messages discarded.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            return call(*args)
+
+    def break_log(self):
+        """
+        Makes every later append to products.log fail.
+        """
+        if os.path.exists('products.log'):
+            os.remove('products.log')
+        os.mkdir('products.log')
+
+class StoreCommitTest(FailedSaveTest):
+    """
+    InventoryStore.commit() when the log cannot be written.
+    """
+
+    def test_commit_raises_and_keeps_nothing(self):
+        self.break_log()
+        self.quietly(self.store.begin)
+        self.store.adjust_stock(1, -3)
+        with self.assertRaises(SaveError):
+            self.quietly(self.store.commit)
+
+        self.assertFalse(os.path.exists('products.seq'), "version bumped for a failed save")
+        data = self.quietly(self.store.get_data)
+        self.assertEqual(data[1].qty, 10, "unsaved sale still shown in memory")
+        with open('products.txt') as f:
+            self.assertEqual(f.read(), CATALOG)
+
+    def test_single_change_raises(self):
+        self.break_log()
+        with self.assertRaises(SaveError):
+            self.quietly(self.store.restock, 2, 4, 55.0)
+        self.assertEqual(self.quietly(self.store.get_data)[2].qty, 5)
+
+    def test_version_follows_a_good_save(self):
+        self.store.begin()
+        self.store.adjust_stock(1, -3)
+        self.quietly(self.store.commit)
+        with open('products.seq') as f:
+            self.assertEqual(f.read().strip(), '1')
+        self.assertEqual(self.quietly(self.store.get_data)[1].qty, 7)
+
+class CartCheckoutTest(FailedSaveTest):
+    """
+    Cart.checkout() when the inventory cannot be saved.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.book = Reservations()
+        self.cart = Cart('Sita', store=self.store, book=self.book)
+        self.quietly(self.cart.add, 1, 2)
+        invoice_writer.take_written()
+
+    def test_failed_checkout_keeps_the_cart_open(self):
+        self.break_log()
+        with self.assertRaises(SaveError):
+            self.quietly(self.cart.checkout)
+
+        self.assertFalse(self.cart.checked_out)
+        self.assertEqual(self.cart.lines, {1: 2})
+        self.assertTrue(self.book.is_held(self.cart._id), "reservations released")
+        self.assertGreater(self.book.held_by_others(None, 1), 0)
+        invoice_writer.drain()
+        self.assertEqual(invoice_writer.take_written(), [], "invoice written for an unsaved sale")
+        self.assertFalse(os.path.exists('ledger.bin'), "unsaved sale recorded in the ledger")
+        self.assertEqual(self.quietly(self.store.get_data)[1].qty, 10)
+
+    def test_checkout_can_be_retried(self):
+        self.break_log()
+        with self.assertRaises(SaveError):
+            self.quietly(self.cart.checkout)
+        os.rmdir('products.log')
+
+        quote = self.quietly(self.cart.checkout, False)
+        self.assertTrue(self.cart.checked_out)
+        self.assertEqual(quote.lines[0].qty, 2)
+        self.assertFalse(self.book.is_held(self.cart._id))
+        self.assertTrue(os.path.exists('ledger.bin'))
+
+    def test_quote_refuses_a_deleted_product(self):
+        self.quietly(self.cart.add, 2, 1)
+        # Another terminal sells the rest, and sold-out products leave the inventory
+        self.store.begin()
+        self.store.adjust_stock(2, -5)
+        self.quietly(self.store.commit)
+        with self.assertRaises(StockConflictError):
+            self.cart.quote()
+
+class BatchTest(FailedSaveTest):
+    """
+    process_sales() and process_restock() when the inventory cannot be saved.
+    """
+
+    def setUp(self):
+        super().setUp()
+        from inventory import inventory
+        inventory.invalidate()
+        self.break_log()
+
+    def assert_nothing_recorded(self):
+        self.assertFalse(os.path.exists('ledger.bin'), "unsaved batch recorded in the ledger")
+        self.assertFalse(os.path.exists('invoices.seq'), "invoice numbered for an unsaved batch")
+
+    def test_sales_stop_at_the_failed_save(self):
+        orders = [{'customer': 'Sita', 'product_id': 1, 'quantity': 2}]
+        with self.assertRaises(SaveError):
+            self.quietly(process_sales, orders)
+        self.assert_nothing_recorded()
+
+    def test_restock_stops_at_the_failed_save(self):
+        orders = [{'vendor': 'Hari', 'product_id': 2, 'quantity': 4, 'cost': 55.0}]
+        with self.assertRaises(SaveError):
+            self.quietly(process_restock, orders)
+        self.assert_nothing_recorded()
+
+    def test_purchase_stops_at_the_failed_save(self):
+        # Vendor, product ID, quantity, cost, then no more items
+        answers = ['Hari', '2', '4', '55', 'n']
+        with mock.patch('builtins.input', side_effect=answers):
+            self.quietly(buy_items)
+        self.assert_nothing_recorded()
+        self.assertEqual(self.quietly(self.store.get_data)[2].qty, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,20 +3,37 @@ WeCare Inventory Management System - File Operations Module
 
 This module manages inventory data persistence and document generation:
 1. Inventory Management: Handles saving inventory data with automatic removal
-   of out-of-stock items (quantity < 1)
+   of out-of-stock items (quantity < 1), either as a full snapshot or as
+   records appended to the transaction log which is compacted periodically
 2. Purchase Documentation: Generates professional purchase invoices when buying
    new inventory items from vendors
 3. Sales Documentation: Creates detailed customer sales invoices with support for
    promotions like "Buy 3 Get 1 Free"
 
+The invoice layouts themselves live in invoice.py.
+
 All invoice files are saved in organized directories with timestamps for easy retrieval.
 
 Author: [Rakshak Sigdel]
 Version: 1.0
 """
 
-from datetime import datetime
+import os
+import tempfile
+
+import metrics
+from catalog_cache import file_key, write_cache
+from invoice import write_invoices
+from read import DATA_FILE, LOG_FILE
+
+# Once the transaction log grows past this size it is folded back into the snapshot
+LOG_COMPACT_BYTES = 1024 * 1024
 
+# The umask can only be read by setting it, so it is read once, on import
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+@metrics.timed('save_to_inventory')
 def save_to_inventory(data):
     """
     Save inventory data to file with error handling.
@@ -24,28 +41,205 @@ def save_to_inventory(data):
     
     The data is saved in the format:
     ID,Product Name,Brand,Quantity,Price,Country
+    with text fields quoted by the codec module where they need it.
+
+    The snapshot is written to a temporary file, synced to disk and then
+    renamed over the data file, so a crash mid-write or a concurrent
+    reader never sees a truncated inventory. The parsed products are then
+    cached for the next load.
+
+    Returns:
+        bool: True if the snapshot was written, False otherwise
     """
     try:
         for key in list(data.keys()):
-            try:
-                if int(data[key][3]) < 1:
-                    data.pop(key)
-            except (ValueError, IndexError):
-                print("⚠️ Warning: Invalid quantity data for product ID " + {key})
+            if data[key].qty < 1:
+                data.pop(key)
         
         # Write the filtered data to file
-        with open('products.txt', 'w') as f:
-            for key in (data.keys()):
-                f.write(','.join(str(field).strip() for field in data[key]) + '\n')
-        
+        write_atomically(DATA_FILE, (product.to_row() + '\n' for product in data.values()))
+        write_cache(data, file_key(os.stat(DATA_FILE)))
+        if metrics.enabled:
+            metrics.add('save_to_inventory', rows=len(data), bytes_written=metrics.file_size(DATA_FILE))
         
         print("✅ Inventory data updated successfully")
+        return True
+    except IOError as e:
+        print("❌ Error writing to file: " + str(e))
+    except Exception as e:
+        print("❌ An unexpected Error occured while writing to file: " + str(e))
+    return False
+
+def write_atomically(path, lines):
+    """
+    Replace a file with new content so that it is never seen half-written.
+
+    The lines are written to a temporary file in the same directory, which is
+    flushed and fsynced before being renamed over the target. The directory
+    is synced afterwards so the rename itself survives a power loss.
+
+    Parameters:
+        path (str): File to replace
+        lines (iterable): Text to write, one string per line including the newline
+
+    Raises:
+        OSError: If the file could not be written; the target is left unchanged
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        match_mode(temp_path, path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    sync_directory(directory)
+
+def sync_directory(directory):
+    """
+    Flush a directory entry to disk after a rename, where the platform allows it.
+
+    Parameters:
+        directory (str): Directory to sync
+    """
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows; the rename is still atomic there
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+@metrics.timed('append_to_log')
+def append_to_log(data, product_ids):
+    """
+    Record changes to the given products in the transaction log.
+
+    Instead of rewriting the whole inventory file, one record per changed
+    product is appended to the log. Products whose quantity dropped below 1
+    are removed from the data and recorded as deleted. When the log grows
+    past LOG_COMPACT_BYTES it is compacted back into the snapshot.
+
+    Parameters:
+        data (dict): Dictionary mapping product ID to Product, already updated in memory
+        product_ids (list): IDs of the products that were changed
+
+    Returns:
+        bool: True if the records were written, False otherwise
+    """
+    try:
+        records = []
+        for key in product_ids:
+            if key in data and data[key].qty < 1:
+                data.pop(key)
+
+            if key in data:
+                records.append('S,' + data[key].to_row() + '\n')
+            else:
+                records.append('D,' + str(key) + '\n')
+
+        # A single synced write keeps the records of one call together in the log
+        text = ''.join(records)
+        with open(LOG_FILE, 'a') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if metrics.enabled:
+            metrics.add('append_to_log', rows=len(records), bytes_written=len(text))
+
+        if os.path.getsize(LOG_FILE) > LOG_COMPACT_BYTES:
+            compact_log(data)
+        else:
+            print("✅ Inventory data updated successfully")
+        return True
     except IOError as e:
-        print("❌ Error writing to file: " + {e})
+        print("❌ Error writing to transaction log: " + str(e))
     except Exception as e:
-        print("❌ An unexpected Error occured while writing to file: " + {e})
+        print("❌ An unexpected Error occured while writing to transaction log: " + str(e))
+    return False
+
+def match_mode(temp_path, path):
+    """
+    Gives a temporary file the permissions of the file it is about to replace.
+
+    mkstemp creates files readable by their owner only. A file replacing an
+    existing one keeps that file's permissions; a new file gets 0666 less
+    the umask, as if open() had created it.
+
+    Parameters:
+        temp_path (str): Temporary file that will be renamed over path
+        path (str): File being replaced or created
 
-def buy_items_invoice(vendor_name, items_list):
+    Raises:
+        OSError: If the permissions could not be set
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(temp_path, mode)
+
+def compact_log(data):
+    """
+    Fold the transaction log back into the inventory snapshot.
+
+    The full inventory is written to the data file first and the log is
+    truncated afterwards. Log records hold absolute values, so replaying a
+    log that survived an interrupted compaction gives the same result.
+
+    Parameters:
+        data (dict): Complete inventory, mapping product ID to Product
+    """
+    if not save_to_inventory(data):
+        # Keep the log; it still holds changes the old snapshot lacks
+        return
+    try:
+        open(LOG_FILE, 'w').close()
+    except IOError as e:
+        print("❌ Error truncating transaction log: " + str(e))
+
+def export_products(products, path):
+    """
+    Export products to a CSV file with a header row.
+
+    The products are written as they are produced, so a streamed inventory
+    is exported without ever being held in memory as a whole.
+
+    Parameters:
+        products (iterable): Product records to export
+        path (str): File to write
+
+    Returns:
+        int: Number of products exported
+    """
+    count = 0
+
+    def lines():
+        nonlocal count
+        yield 'ID,Product Name,Brand,Quantity,Price,Country\n'
+        for product in products:
+            count += 1
+            yield product.to_row() + '\n'
+
+    try:
+        write_atomically(path, lines())
+        print("✅ Exported " + str(count) + " products to " + path)
+    except IOError as e:
+        print("❌ Error writing export file: " + str(e))
+    return count
+
+def buy_items_invoice(vendor_name, items_list, invoice_number=None):
     """
     Generates a professional purchase invoice for inventory transactions.
     
@@ -63,85 +257,19 @@ def buy_items_invoice(vendor_name, items_list):
         vendor_name (str): The name of the vendor supplying the items
         items_list (list): A list of dictionaries containing item details
                           Each dict contains 'id', 'name', 'qty', and 'cost'
+        invoice_number (str): Invoice number to use; defaults to the next one from the invoice counter
         
     Returns:
         None: The function writes the invoice to a file but does not return a value
     """
     try:
-        # Calculate total cost with tax for all items
-        buy_price = 0
-        for item in items_list:
-            qty = int(item['qty'])
-            cost = float(item['cost'])
-            buy_price += qty * cost
-
-        tax_amount = buy_price * 0.13  # Fixed: calculate tax based on buy_price
-        total_cost = buy_price + tax_amount
-        
-       # Get current date and time for invoice
-        now = datetime.now()
-
-        current_date = str(now.year) + "-" + str(now.month) + "-" + str(now.day)
-        current_time = str(now.hour) + ":" + str(now.minute) + ":" + str(now.second)
-        invoice_number = str(now.year) + str(now.month) + str(now.day) + "-" + str(now.hour) + str(now.minute) + str(now.second)
-        
-        invoice_content = f"""
-╔═════════════════════════════════════════════════════════════════════════════╗
-║                                                                              ║
-║                           ✦ WⒺ CARE Vendor ✦                               ║
-║                         OFFICIAL PURCHASE INVOICE                            ║
-║                                                                              ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-║                                                                              ║
-║  📄 Invoice #: {invoice_number}                                              ║ 
-║  📅 Date: {current_date}                           🕒 Time: {current_time}     ║ 
-║  🏢 Vendor: {vendor_name}                                                   ║  
-║                                                                              ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-║                             PRODUCT DETAILS                                  ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-"""
-        
-        index = 0
-        length = len(items_list)
-        while index < length:
-            item = items_list[index]
-            item_cost = int(item['qty']) * float(item['cost'])
-            invoice_content += f"""║                                                                              ║\n║  Item {index+1}                                                                     ║\n║  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━  ║\n║  Product ID: #{item['id']}                                                  ║  \n║  Product Name: {item['name']}                                                ║ \n║                                                                              ║\n║  Quantity: {item['qty']} units    ×    Unit Cost: ${float(item['cost']):.2f}           \n║                                                Subtotal: ${item_cost:.2f}     \n║                                                                              ║\n"""
-            if index < length - 1:
-                invoice_content += "╠══════════════════════════════════════════════════════════════════════════════╣\n"
-            index += 1
-        
-        invoice_content += f"""╠══════════════════════════════════════════════════════════════════════════════╣
-║                                                                              ║
-║  💰 Items Worth:                                         ${buy_price:.2f}    
-║  💰 Tax Amount:                                          ${tax_amount:.2f}    
-║  💰 TOTAL COST:                                          ${total_cost:.2f}    
-║                                                                              ║
-╠══════════════════════════════════════════════════════════════════════════════╣
-║                                                                              ║
-║  Payment Terms: Due on receipt                                               ║
-║  For questions regarding this invoice, please contact:                       ║
-║  📧 accounting@wecare.com | 📞 (555) 123-4567                               ║
-║                                                                              ║
-║                     THANK YOU FOR YOUR BUSINESS!                             ║
-║                                                                              ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-"""
-        
-            
-        # Write to file with UTF-8 encoding
-        with open('purchase_' + invoice_number +'.txt', 'w', encoding='utf-8') as f:
-            f.write(invoice_content)
-            
-        print("✅ Invoice generated Successfully: purchase_" + invoice_number + ".txt")
-        
+        files = write_invoices('purchase', [(vendor_name, items_list, invoice_number)])
+        if files:
+            print("✅ Invoice generated Successfully: " + files[0])
     except Exception as e:
         print("❌ Error generating invoice: " + str(e))
-        
-
 
-def sell_item_invoice(customer_name, items_for_invoice):
+def sell_item_invoice(customer_name, items_for_invoice, invoice_number=None):
     """
     Generates a professional sales invoice for customer purchases.
 
@@ -149,85 +277,16 @@ def sell_item_invoice(customer_name, items_for_invoice):
         customer_name (str): The name of the customer making the purchase
         items_for_invoice (list): A list of lists containing item details
                                  Each list contains [product_id, product_name,
-                                 quantity, free_product, total_cost, unit_cost]
+                                 quantity, free_product, total_cost, unit_cost, brand,
+                                 tax, promotion], as made by pricing.LineQuote.invoice_row()
+        invoice_number (str): Invoice number to use; defaults to the next one from the invoice counter
 
     Returns:
         None
     """
     try:
-        # Calculate total cost for all items
-        total_cost = 0
-        for item in items_for_invoice:
-            total_cost += item[4]
-        tax_amount = total_cost * 0.13  
-        total_amount = total_cost + tax_amount 
-        # Get current date and time for invoice
-        now = datetime.now()
-
-        current_date = str(now.year) + "-" + str(now.month) + "-" + str(now.day)
-        current_time = str(now.hour) + ":" + str(now.minute) + ":" + str(now.second)
-        invoice_number = str(now.year) + str(now.month) + str(now.day) + "-" + str(now.hour) + str(now.minute) + str(now.second)
-
-        # Build the invoice content
-        invoice_content = f"""
-╔═════════════════════════════════════════════════════════════════════════════╗
-║                                                                             ║
-║                           ✦ WⒺ CARE  vendor✦                               ║
-║                          OFFICIAL SALES INVOICE                             ║
-║                                                                             ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-║                                                                             ║
-║  📄 Invoice #: {invoice_number}                                                ║ 
-║  📅 Date: {current_date}                           🕒 Time: {current_time}             ║  
-║  👤 Customer: {customer_name}                                                  
-║                                                                             ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-║                             PRODUCT DETAILS                                 ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-"""
-
-        index = 0
-        length = len(items_for_invoice)
-        while index < length:
-            item = items_for_invoice[index]
-            invoice_content += f"""║                                                                             ║
-║  Item {index + 1}                                                                     ║
-║  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━║
-║  Product ID: #{item[0]}                                                                     
-║  Product Name: {item[1]}                                         
-║  Brand Name: {item[6]}                                         
-║                                                                              
-║  Quantity: {item[2]} units    ×    Unit Cost: ${item[5]:.2f}      
-║                                                Subtotal: ${item[4]:.2f}     
-║  🎁 Free Products: {item[3]} units (Buy 3 Get 1 Free)             
-║                                                                              
-"""
-            if index < length - 1:
-                invoice_content += "╠═════════════════════════════════════════════════════════════════════════════╣\n"
-            index += 1
-
-        invoice_content += f"""╠═════════════════════════════════════════════════════════════════════════════╣
-║                                                                             ║
-║  💰 TOTAL COST:                                          ${total_cost:.2f} 
-║  💰 Tax Amount:                                          ${tax_amount:.2f} 
-║  💰 TOTAL Amount:                                          ${total_amount:.2f} 
-║                                                                             ║
-╠═════════════════════════════════════════════════════════════════════════════╣
-║                                                                             ║
-║  Payment Terms: Due on receipt                                              ║
-║  For questions regarding this invoice, please contact:                      ║
-║  📧 support@wecare.com | 📞 (555) 987-6543                                 ║
-║                                                                             ║
-║                THANK YOU FOR CHOOSING WE CARE MEDICAL!                      ║
-║                                                                             ║
-╚═════════════════════════════════════════════════════════════════════════════╝
-"""
-
-        # Write to file with UTF-8 encoding
-        with open('sell_'+invoice_number + '.txt', 'w', encoding='utf-8') as f:
-            f.write(invoice_content)
-
-        print("✅ Invoice generated Successfully: sell_" + invoice_number + ".txt")
-
+        files = write_invoices('sell', [(customer_name, items_for_invoice, invoice_number)])
+        if files:
+            print("✅ Invoice generated Successfully: " + files[0])
     except Exception as e:
         print("❌ Error generating invoice: " + str(e))